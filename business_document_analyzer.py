@@ -1,87 +1,767 @@
-import pandas as pd
 from datetime import datetime
 import re
+import os
+import json
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from config import GeminiConfig
+from context_cache import create_context_cache, document_key, CACHED_DOCUMENT_REFERENCE
+from prompt_templates import PROMPTS
+
+# Lines that open a new section: markdown headings, short numbered titles
+# ("1. Financial Performance:", "2.3 Risks") and short ALL-CAPS titles
+MARKDOWN_HEADING_PATTERN = re.compile(r"^#{1,6}\s+\S")
+NUMBERED_HEADING_PATTERN = re.compile(r"^(?:section\s+)?\d+(?:\.\d+)*[.)]?\s+\S", re.IGNORECASE)
+ACTION_ITEM_LINE_PATTERN = re.compile(r"^\s*(?:\d+[.)]|[-*•])?\s*(.+?)\s*$")
+PRIORITY_RANK = {"high": 3, "medium": 2, "low": 1}
+
+# Local pre-extraction of owners, deadlines and amounts
+MONTHS = r"(?:Jan(?:uary)?|Feb(?:ruary)?|Mar(?:ch)?|Apr(?:il)?|May|June?|July?|Aug(?:ust)?|Sep(?:t(?:ember)?)?|Oct(?:ober)?|Nov(?:ember)?|Dec(?:ember)?)"
+DATE_PATTERN = re.compile(
+    rf"\b{MONTHS}\.?\s+\d{{1,2}}(?:st|nd|rd|th)?(?:,?\s+\d{{4}})?\b"
+    r"|\b\d{4}-\d{2}-\d{2}\b"
+    r"|\b\d{1,2}/\d{1,2}/\d{2,4}\b"
+    r"|\bQ[1-4]\s+\d{4}\b"
+    r"|\b(?:month|quarter|year)-end\b"
+    r"|\bend of (?:the )?(?:month|quarter|year|week)\b"
+    r"|\bnext (?:week|month|quarter)\b"
+)
+DEADLINE_PATTERN = re.compile(
+    rf"\b(?:by|before|due|until|no later than)\s+(?:the\s+)?((?:{DATE_PATTERN.pattern}))",
+    re.IGNORECASE
+)
+AMOUNT_PATTERN = re.compile(
+    r"[$€£]\s?\d[\d,]*(?:\.\d+)?\s?(?:[KMB]\b|(?:thousand|million|billion)\b)?",
+    re.IGNORECASE
+)
+PERSON_PATTERN = r"[A-Z][a-z]+(?:\s[A-Z][a-z]+)?"
+# "Name will ..." also matches forecasts ("Revenue will grow"), so a modal only
+# names an owner when the name is a known person or a full name
+MODAL_OWNER_PATTERN = re.compile(rf"^(?:[-*•]\s*)?({PERSON_PATTERN})\s+(?:will|shall|must|should|needs to)\s+(\w.*)")
+OWNER_PATTERNS = [
+    re.compile(rf"^(?:[-*•]\s*)?({PERSON_PATTERN})\s+(?:to|agreed to|is responsible for)\s+(\w.*)"),
+    MODAL_OWNER_PATTERN,
+    re.compile(rf"\b(?:assigned to|owner:?|owned by|responsible:?|led by)\s+({PERSON_PATTERN})", re.IGNORECASE)
+]
+NAME_ROLE_PATTERN = re.compile(rf"({PERSON_PATTERN})\s*\(([^)]{{1,40}})\)")
+ACTION_CUE_PATTERN = re.compile(
+    r"\b(?:action items?|next steps?|to do|todo|follow[- ]up|needed|required|requires|approval|"
+    r"to (?:provide|implement|prepare|review|send|schedule|deliver|complete|finali[sz]e|submit|update|hire))\b"
+    # Modals only with a person or team as the subject ("we will hire", not "revenue will grow")
+    r"|\b(?:we|team|[A-Z][a-z]+ (?:team|group))\s+(?:will|shall|must|should|needs? to|has to|have to)\s+(?!be\b|remain\b|continue\b)\w+",
+    re.IGNORECASE
+)
+# Progress reports, which are not actions unless someone is assigned
+STATUS_PATTERN = re.compile(
+    r"\b(?:progressing|on track|underway|in progress|completed|delayed|reached|increased|decreased|improved|expected)\b",
+    re.IGNORECASE
+)
+URGENT_PATTERN = re.compile(r"\b(?:urgent|immediately|asap|critical|blocker|board approval|overdue)\b", re.IGNORECASE)
+SENTENCE_SPLIT_PATTERN = re.compile(r"(?<=[.!?])\s+(?=[A-Z])")
+NOT_OWNERS = {"Board", "Next", "Team", "Company", "The", "We", "Our", "This", "All", "Action", "Budget"}
+
+def _is_section_heading(line):
+    """Return True if a line looks like a section heading rather than body text."""
+    stripped = line.strip()
+    if not stripped or len(stripped) > 100:
+        return False
+    if MARKDOWN_HEADING_PATTERN.match(stripped):
+        return True
+    if NUMBERED_HEADING_PATTERN.match(stripped):
+        # Numbered headings are short titles, not numbered sentences
+        return len(stripped.split()) <= 8 and not stripped.endswith(".")
+    return stripped.isupper() and len(stripped.split()) <= 8
+
+def split_into_sections(document_text, max_chars=24000, pack=True):
+    """
+    Split a document into sections on headings and numbered sections.
+    
+    Oversized sections are split on paragraph boundaries so that every chunk
+    stays under max_chars, and small neighbouring sections are packed together.
+    
+    Args:
+        document_text (str): The document content
+        max_chars (int): Maximum characters per returned section
+        pack (bool): Whether to pack small neighbouring sections together
+    
+    Returns:
+        list: Dicts with 'title' and 'text' keys, in document order
+    """
+    
+    raw_sections = []
+    title, lines = "Preamble", []
+    for line in document_text.splitlines():
+        if _is_section_heading(line):
+            if any(l.strip() for l in lines):
+                raw_sections.append({'title': title, 'text': "\n".join(lines).strip()})
+            title, lines = line.strip().lstrip("#").strip(), [line]
+        else:
+            lines.append(line)
+    if any(l.strip() for l in lines):
+        raw_sections.append({'title': title, 'text': "\n".join(lines).strip()})
+    
+    # Break up sections that are too large on their own
+    sized_sections = []
+    for section in raw_sections:
+        if len(section['text']) <= max_chars:
+            sized_sections.append(section)
+            continue
+        part, part_num = [], 1
+        for paragraph in re.split(r"\n\s*\n", section['text']):
+            while len(paragraph) > max_chars:
+                sized_sections.append({'title': f"{section['title']} (part {part_num})", 'text': paragraph[:max_chars]})
+                paragraph = paragraph[max_chars:]
+                part_num += 1
+            if part and len("\n\n".join(part)) + len(paragraph) + 2 > max_chars:
+                sized_sections.append({'title': f"{section['title']} (part {part_num})", 'text': "\n\n".join(part)})
+                part, part_num = [], part_num + 1
+            part.append(paragraph)
+        if part:
+            sized_sections.append({'title': f"{section['title']} (part {part_num})", 'text': "\n\n".join(part)})
+    
+    if not pack:
+        return sized_sections
+    
+    # Pack small neighbouring sections together to keep the number of calls low
+    packed = []
+    for section in sized_sections:
+        if packed and len(packed[-1]['text']) + len(section['text']) + 2 <= max_chars:
+            packed[-1] = {
+                'title': f"{packed[-1]['title']} / {section['title']}",
+                'text': f"{packed[-1]['text']}\n\n{section['text']}"
+            }
+        else:
+            packed.append(dict(section))
+    
+    return packed
+
+def parse_action_items(text):
+    """Parse 'Action | Owner | Deadline | Priority' lines into dicts."""
+    
+    items = []
+    for line in text.splitlines():
+        match = ACTION_ITEM_LINE_PATTERN.match(line)
+        if not match or "|" not in line:
+            continue
+        fields = [field.strip() for field in match.group(1).split("|")]
+        fields += [""] * (4 - len(fields))
+        action, owner, deadline, priority = fields[:4]
+        # Skip the "Action Item | Owner | Deadline | Priority" header and table rules
+        if not action.strip("-: ") or (action.lower() in ("action", "action item") and owner.lower() == "owner"):
+            continue
+        items.append({
+            'action': action,
+            'owner': "" if owner.lower() in ("", "n/a", "none", "unknown") else owner,
+            'deadline': "" if deadline.lower() in ("", "n/a", "none", "unknown") else deadline,
+            'priority': priority.capitalize() if priority.lower() in PRIORITY_RANK else "Medium"
+        })
+    return items
+
+def merge_action_items(item_lists):
+    """
+    Merge action items from several sections, dropping duplicates.
+    
+    Items are matched on their normalized action text; when duplicates disagree
+    the highest priority wins and missing owners or deadlines are filled in.
+    """
+    
+    merged = {}
+    for items in item_lists:
+        for item in items:
+            key = re.sub(r"[^a-z0-9 ]", "", item['action'].lower())
+            key = re.sub(r"\s+", " ", key).strip()
+            if key not in merged:
+                merged[key] = dict(item)
+                continue
+            existing = merged[key]
+            existing['owner'] = existing['owner'] or item['owner']
+            existing['deadline'] = existing['deadline'] or item['deadline']
+            if PRIORITY_RANK.get(item['priority'].lower(), 0) > PRIORITY_RANK.get(existing['priority'].lower(), 0):
+                existing['priority'] = item['priority']
+    return list(merged.values())
+
+def format_action_items(items):
+    """Format merged action items in the same numbered layout as extract_action_items."""
+    
+    if not items:
+        return "No specific action items identified."
+    
+    lines = []
+    for i, item in enumerate(items, 1):
+        lines.append(f"{i}. Action Item: {item['action']}")
+        lines.append(f"   Owner: {item['owner'] or 'Not specified'}")
+        lines.append(f"   Deadline: {item['deadline'] or 'Not specified'}")
+        lines.append(f"   Priority: {item['priority']}")
+        if item.get('amounts'):
+            lines.append(f"   Amounts: {', '.join(item['amounts'])}")
+    return "\n".join(lines)
+
+def pre_extract_action_items(document_text):
+    """
+    Find action item candidates locally with compiled regexes and simple rules.
+    
+    Sentences with an owner, or with an action cue and no progress wording
+    ("progressing", "completed", "expected"), become candidates with
+    the owner, deadline and currency amounts they mention. First names are
+    resolved against "Name (Role)" mentions such as an attendee list.
+    
+    Args:
+        document_text (str): The document content
+    
+    Returns:
+        list: Dicts with 'action', 'owner', 'deadline', 'amounts', 'priority' and 'sentence'
+    """
+    
+    people = {}
+    for name, role in NAME_ROLE_PATTERN.findall(document_text):
+        people.setdefault(name.split()[0], f"{name} ({role})")
+    
+    candidates = []
+    for line in document_text.splitlines():
+        line = line.strip().lstrip("-*•").strip()
+        # Skip headings and attendee-style "Label: Name (Role), ..." lines
+        if not line or _is_section_heading(line) or (NAME_ROLE_PATTERN.search(line) and ":" in line[:20]):
+            continue
+        for sentence in SENTENCE_SPLIT_PATTERN.split(line):
+            sentence = sentence.strip()
+            deadline_match = DEADLINE_PATTERN.search(sentence)
+            owner, action = "", sentence
+            for pattern in OWNER_PATTERNS:
+                owner_match = pattern.search(sentence)
+                if not owner_match or owner_match.group(1).split()[0] in NOT_OWNERS:
+                    continue
+                if pattern is MODAL_OWNER_PATTERN and " " not in owner_match.group(1) \
+                        and owner_match.group(1) not in people:
+                    continue
+                owner = owner_match.group(1)
+                if owner_match.lastindex and owner_match.lastindex > 1:
+                    action = owner_match.group(2)
+                break
+            # A deadline alone ("signing expected by month-end") is not an action
+            if not owner and (not ACTION_CUE_PATTERN.search(sentence) or STATUS_PATTERN.search(sentence)):
+                continue
+            
+            if deadline_match:
+                action = action.replace(deadline_match.group(0), "")
+            action = re.sub(r"\s+", " ", action).strip(" .,;:")
+            if owner:
+                owner = people.get(owner.split()[0], owner) if " " not in owner else owner
+            
+            if URGENT_PATTERN.search(sentence):
+                priority = "High"
+            elif owner and deadline_match:
+                priority = "Medium"
+            else:
+                priority = "Low"
+            
+            candidates.append({
+                'action': action[:1].upper() + action[1:],
+                'owner': owner,
+                'deadline': deadline_match.group(1) if deadline_match else "",
+                'amounts': [amount.strip() for amount in AMOUNT_PATTERN.findall(sentence)],
+                'priority': priority,
+                'sentence': sentence
+            })
+    
+    return candidates
+
+def section_hash(section_text):
+    """Whitespace-insensitive content hash of a section."""
+    normalized = re.sub(r"\s+", " ", section_text).strip()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+class DocumentVersionStore:
+    """
+    Section-level version history of documents, with cached analysis results.
+    
+    Results are keyed by analysis type and content hash, so unchanged sections
+    of a revised document reuse their earlier analysis. The store is kept in
+    memory and persisted to a JSON file when a path is given.
+    """
+    
+    def __init__(self, path=None, max_results=5000):
+        self.path = path
+        self.max_results = max_results
+        self.documents = {}
+        self.results = {}
+        self._lock = threading.Lock()
+        
+        if path and os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.documents = data.get('documents', {})
+            self.results = data.get('results', {})
+    
+    def diff(self, document_id, hashes):
+        """Compare section hashes with the latest stored version of a document."""
+        
+        previous = self.documents.get(document_id, {}).get('section_hashes', [])
+        previous_set, current_set = set(previous), set(hashes)
+        return {
+            'added': [i for i, h in enumerate(hashes) if h not in previous_set],
+            'unchanged': [i for i, h in enumerate(hashes) if h in previous_set],
+            'removed': len([h for h in previous if h not in current_set])
+        }
+    
+    def update(self, document_id, sections, hashes):
+        """Record a new version of a document and return its version number."""
+        
+        with self._lock:
+            previous = self.documents.get(document_id)
+            if previous and previous['section_hashes'] == hashes:
+                return previous['version']
+            
+            version = previous['version'] + 1 if previous else 1
+            self.documents[document_id] = {
+                'version': version,
+                'section_titles': [section['title'] for section in sections],
+                'section_hashes': hashes,
+                'updated': datetime.now().isoformat()
+            }
+            return version
+    
+    def get_result(self, analysis_type, content_hash):
+        return self.results.get(f"{analysis_type}:{content_hash}")
+    
+    def set_result(self, analysis_type, content_hash, result):
+        with self._lock:
+            self.results[f"{analysis_type}:{content_hash}"] = result
+            # Drop the oldest results once the store is full
+            while len(self.results) > self.max_results:
+                del self.results[next(iter(self.results))]
+    
+    def save(self):
+        """Persist the store to its JSON file, if one was configured."""
+        
+        if not self.path:
+            return
+        # Write a temporary file and swap it in, so a crash never leaves a truncated store
+        temp_path = self.path + ".tmp"
+        with self._lock:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({'documents': self.documents, 'results': self.results}, f, ensure_ascii=False)
+            os.replace(temp_path, self.path)
+
+# Focus/format of each analysis type
+ANALYSIS_TEMPLATES = {
+    "comprehensive": {
+        "focus": "overall business impact, key decisions, action items",
+        "format": "executive summary, key findings, recommendations, next steps"
+    },
+    "financial": {
+        "focus": "revenue, costs, profitability, financial risks and opportunities",
+        "format": "financial highlights, trend analysis, budget implications"
+    },
+    "strategic": {
+        "focus": "competitive position, market opportunities, strategic initiatives",
+        "format": "strategic insights, competitive analysis, strategic recommendations"
+    },
+    "operational": {
+        "focus": "process efficiency, resource allocation, operational challenges",
+        "format": "operational summary, efficiency metrics, improvement opportunities"
+    }
+}
+
+DOCUMENT_ANALYSIS_PROMPT = PROMPTS.register("document_analysis", """
+    You are a senior business analyst reviewing an important business document.
+    
+    Analysis Focus: {focus}
+    
+    Document Content:
+    {document}
+    
+    Provide analysis in the following format:
+    {format}
+    
+    Requirements:
+    - Extract quantitative data where available
+    - Identify key business implications
+    - Highlight urgent items requiring immediate attention
+    - Provide specific, actionable recommendations
+    - Use business terminology appropriate for executive audience
+    
+    Keep the analysis concise but comprehensive.
+    """)
+
+SECTION_NOTES_PROMPT = PROMPTS.register("document_section_notes", """
+    You are a senior business analyst reviewing one section of a longer business document.
+    
+    Analysis Focus: {focus}
+    
+    Section: {title}
+    {text}
+    
+    Write concise analyst notes for this section only:
+    - Quantitative data (figures, percentages, amounts, dates)
+    - Key decisions and business implications
+    - Urgent items and risks
+    - Action items with owners and deadlines where mentioned
+    
+    Do not speculate about other sections.
+    """)
+
+CONDENSE_NOTES_PROMPT = PROMPTS.register("document_notes_condense", """
+    Condense these analyst notes from consecutive sections of a business document.
+    Keep every figure, decision, risk, owner and deadline; remove repetition.
+    
+    {notes}
+    """)
+
+REDUCE_NOTES_PROMPT = PROMPTS.register("document_notes_reduce", """
+    You are a senior business analyst. The document below was analyzed section by section.
+    Combine the section notes into one analysis.
+    
+    Analysis Focus: {focus}
+    
+    Section Notes:
+    {notes}
+    
+    Provide analysis in the following format:
+    {format}
+    
+    Requirements:
+    - Extract quantitative data where available
+    - Identify key business implications
+    - Highlight urgent items requiring immediate attention
+    - Provide specific, actionable recommendations
+    - Use business terminology appropriate for executive audience
+    - Resolve repetition across sections
+    
+    Keep the analysis concise but comprehensive.
+    """)
+
+ACTION_ITEMS_PROMPT = PROMPTS.register("action_items", """
+    Extract all action items, decisions, and next steps from this business document.
+    
+    Document:
+    {document}
+    
+    For each item, provide:
+    1. Action Item: [specific task]
+    2. Owner: [person/team responsible if mentioned]
+    3. Deadline: [if mentioned]
+    4. Priority: [High/Medium/Low based on context]
+    
+    Format as a numbered list. If no clear action items exist, state "No specific action items identified."
+    """)
+
+HINTED_ACTION_ITEMS_PROMPT = PROMPTS.register("action_items_hinted", """
+    These sentences were extracted from a business document as likely action items,
+    with owners, deadlines and amounts detected automatically in brackets:
+    
+    {hints}
+    
+    Turn them into a clean list of action items. Drop sentences that are not actually
+    actions, merge duplicates, and correct detected fields only if clearly wrong.
+    
+    For each item, provide:
+    1. Action Item: [specific task]
+    2. Owner: [person/team responsible if mentioned]
+    3. Deadline: [if mentioned]
+    4. Priority: [High/Medium/Low based on context]
+    
+    Format as a numbered list. If no clear action items exist, state "No specific action items identified."
+    """)
+
+SECTION_ACTION_ITEMS_PROMPT = PROMPTS.register("action_items_section", """
+    Extract all action items, decisions, and next steps from this section of a business document.
+    
+    Section: {title}
+    {text}
+    
+    Output one item per line in exactly this format, with no header:
+    Action Item | Owner | Deadline | Priority
+    
+    Use "N/A" for an owner or deadline that is not mentioned.
+    Priority must be High, Medium or Low based on context.
+    If the section has no action items, output nothing.
+    """)
 
 class BusinessDocumentAnalyzer:
-    def __init__(self):
+    def __init__(self, max_section_chars=24000, max_workers=4, use_context_cache=True,
+                 cache_ttl_minutes=60, min_cache_tokens=4096, version_store=None):
         self.config = GeminiConfig()
         self.model = self.config.get_generative_model()
+        # Documents longer than this are analyzed section by section (map-reduce)
+        self.max_section_chars = max_section_chars
+        self.max_workers = max_workers
+        # Large documents can be registered once and referenced by later calls
+        self.context_cache = (
+            create_context_cache(self.config, cache_ttl_minutes, min_cache_tokens)
+            if use_context_cache else None
+        )
+        # Section-level history used by analyze_document_revision
+        self.version_store = version_store or DocumentVersionStore()
+        self.last_revision_stats = {}
     
-    def analyze_document(self, document_text, analysis_type="comprehensive"):
+    def register_document(self, document_text):
+        """
+        Register a large document as cached context for repeated analysis.
+        
+        Later calls to analyze_document / extract_action_items with the same text
+        reference the cached context instead of re-sending the document.
+        
+        Returns:
+            str: Cache key, or None if caching is disabled or the document is too small
+        """
+        
+        if self.context_cache is None:
+            return None
+        return self.context_cache.register(document_text)
+    
+    def get_cache_metrics(self):
+        """Return context cache metrics (hits, cached calls, tokens saved)."""
+        
+        if self.context_cache is None:
+            return {}
+        return self.context_cache.get_metrics()
+    
+    def _lookup_cached_document(self, document_text):
+        if self.context_cache is None:
+            return None
+        return self.context_cache.lookup(document_text)
+    
+    def _generate(self, prompt, cache_key=None):
+        """Generate a response, referencing the cached document when a key is given."""
+        
+        if cache_key:
+            return self.context_cache.generate(cache_key, prompt)
+        return self.model.generate_content(prompt)
+    
+    def _map_sections(self, sections, build_prompt):
+        """Run one prompt per section concurrently and return the responses in order."""
+        
+        def run(section):
+            return self.model.generate_content(build_prompt(section)).text
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(run, sections))
+    
+    def analyze_document(self, document_text, analysis_type="comprehensive", sections=None):
         """
         Analyze business documents with various focus areas.
         
+        Documents registered with register_document are referenced from the
+        context cache instead of being re-sent. Other documents longer than
+        max_section_chars are split into sections that are analyzed concurrently
+        and then reduced into the requested format.
+        
         Args:
             document_text (str): The document content
             analysis_type (str): 'comprehensive', 'financial', 'strategic', 'operational'
+            sections (list): Optional pre-split sections (see split_into_sections)
         """
         
-        analysis_templates = {
-            "comprehensive": {
-                "focus": "overall business impact, key decisions, action items",
-                "format": "executive summary, key findings, recommendations, next steps"
-            },
-            "financial": {
-                "focus": "revenue, costs, profitability, financial risks and opportunities",
-                "format": "financial highlights, trend analysis, budget implications"
-            },
-            "strategic": {
-                "focus": "competitive position, market opportunities, strategic initiatives",
-                "format": "strategic insights, competitive analysis, strategic recommendations"
-            },
-            "operational": {
-                "focus": "process efficiency, resource allocation, operational challenges",
-                "format": "operational summary, efficiency metrics, improvement opportunities"
-            }
-        }
+        template = self._get_analysis_template(analysis_type)
+        cache_key = self._lookup_cached_document(document_text)
+        
+        if cache_key is None and len(document_text) > self.max_section_chars:
+            return self._analyze_long_document(document_text, template, sections)
         
-        template = analysis_templates.get(analysis_type, analysis_templates["comprehensive"])
+        prompt = DOCUMENT_ANALYSIS_PROMPT.render(
+            focus=template['focus'],
+            format=template['format'],
+            document=CACHED_DOCUMENT_REFERENCE if cache_key else document_text
+        )
         
-        prompt = f"""
-        You are a senior business analyst reviewing an important business document.
+        response = self._generate(prompt, cache_key)
+        return response.text
+    
+    def _get_analysis_template(self, analysis_type):
+        """Return the focus/format template for an analysis type."""
         
-        Analysis Focus: {template['focus']}
+        return ANALYSIS_TEMPLATES.get(analysis_type, ANALYSIS_TEMPLATES["comprehensive"])
+    
+    def _analyze_long_document(self, document_text, template, sections=None):
+        """Map-reduce analysis: analyze sections concurrently, then combine the notes."""
         
-        Document Content:
-        {document_text}
+        if sections is None:
+            sections = split_into_sections(document_text, self.max_section_chars)
+        section_notes = self._map_sections(
+            sections, lambda section: self._section_notes_prompt(section, template)
+        )
+        return self._reduce_section_notes(sections, section_notes, template)
+    
+    def _section_notes_prompt(self, section, template):
+        return SECTION_NOTES_PROMPT.render(focus=template['focus'], title=section['title'], text=section['text'])
+    
+    def _reduce_section_notes(self, sections, section_notes, template):
+        """Combine per-section notes into one analysis in the template's format."""
         
-        Provide analysis in the following format:
-        {template['format']}
+        notes = [
+            f"Section: {section['title']}\n{note}"
+            for section, note in zip(sections, section_notes)
+        ]
         
-        Requirements:
-        - Extract quantitative data where available
-        - Identify key business implications
-        - Highlight urgent items requiring immediate attention
-        - Provide specific, actionable recommendations
-        - Use business terminology appropriate for executive audience
+        # Reduce in groups until all notes fit into a single prompt
+        while len("\n\n".join(notes)) > self.max_section_chars and len(notes) > 1:
+            groups, group = [], []
+            for note in notes:
+                if group and len("\n\n".join(group)) + len(note) > self.max_section_chars:
+                    groups.append(group)
+                    group = []
+                group.append(note)
+            groups.append(group)
+            if len(groups) == len(notes):
+                break
+            notes = self._map_sections(
+                groups, lambda group: CONDENSE_NOTES_PROMPT.render(notes="\n".join(group))
+            )
         
-        Keep the analysis concise but comprehensive.
-        """
+        reduce_prompt = REDUCE_NOTES_PROMPT.render(
+            focus=template['focus'],
+            format=template['format'],
+            notes="\n\n".join(notes)
+        )
         
-        response = self.model.generate_content(prompt)
+        response = self.model.generate_content(reduce_prompt)
         return response.text
     
-    def extract_action_items(self, document_text):
-        """Extract specific action items from business documents."""
+    def analyze_document_revision(self, document_id, document_text, analysis_type="comprehensive"):
+        """
+        Analyze a new revision of a document, re-analyzing only changed sections.
+        
+        The document is split into sections which are diffed by content hash
+        against the previous version in the version store. Cached notes are
+        reused for unchanged sections and only new or edited sections are sent
+        to the model before the notes are reduced into the final analysis.
         
-        prompt = f"""
-        Extract all action items, decisions, and next steps from this business document.
+        Args:
+            document_id (str): Stable identifier of the document across revisions
+            document_text (str): The document content of this revision
+            analysis_type (str): 'comprehensive', 'financial', 'strategic', 'operational'
+        
+        Returns:
+            str: The analysis; statistics are stored in self.last_revision_stats
+        """
+        
+        template = self._get_analysis_template(analysis_type)
+        sections = split_into_sections(document_text, self.max_section_chars, pack=False)
+        hashes = [section_hash(section['text']) for section in sections]
+        diff = self.version_store.diff(document_id, hashes)
+        version = self.version_store.update(document_id, sections, hashes)
         
-        Document:
-        {document_text}
+        # Sections without cached notes for this analysis type need a model call
+        final = self.version_store.get_result(analysis_type, document_key(document_text))
+        changed = [] if final is not None else [
+            i for i, h in enumerate(hashes)
+            if self.version_store.get_result(analysis_type, h) is None
+        ]
         
-        For each item, provide:
-        1. Action Item: [specific task]
-        2. Owner: [person/team responsible if mentioned]
-        3. Deadline: [if mentioned]
-        4. Priority: [High/Medium/Low based on context]
+        if final is None:
+            new_notes = self._map_sections(
+                [sections[i] for i in changed],
+                lambda section: self._section_notes_prompt(section, template)
+            )
+            for i, note in zip(changed, new_notes):
+                self.version_store.set_result(analysis_type, hashes[i], note)
+            
+            section_notes = [self.version_store.get_result(analysis_type, h) for h in hashes]
+            final = self._reduce_section_notes(sections, section_notes, template)
+            self.version_store.set_result(analysis_type, document_key(document_text), final)
+        # Also persists the version history when the whole result was cached
+        self.version_store.save()
         
-        Format as a numbered list. If no clear action items exist, state "No specific action items identified."
+        self.last_revision_stats = {
+            'document_id': document_id,
+            'version': version,
+            'sections': len(sections),
+            'added_sections': len(diff['added']),
+            'removed_sections': diff['removed'],
+            'reanalyzed_sections': len(changed),
+            'reused_sections': len(sections) - len(changed)
+        }
+        return final
+    
+    def extract_action_items(self, document_text, mode="llm", candidates=None):
         """
+        Extract specific action items from business documents.
+        
+        Registered documents are referenced from the context cache. Other documents
+        longer than max_section_chars are processed section by section
+        concurrently, and the resulting items are merged and deduplicated.
+        
+        Args:
+            document_text (str): The document content
+            mode (str): 'llm' sends the document to the model, 'fast' returns the
+                local regex candidates without a model call, 'hinted' sends only
+                the candidate sentences and their extracted fields
+            candidates (list): Optional precomputed pre_extract_action_items output
+        """
+        
+        if mode in ("fast", "hinted"):
+            if candidates is None:
+                candidates = pre_extract_action_items(document_text)
+            if mode == "fast":
+                return format_action_items(merge_action_items([candidates]))
+            if candidates:
+                return self._extract_action_items_hinted(candidates)
+        
+        cache_key = self._lookup_cached_document(document_text)
+        
+        if cache_key is None and len(document_text) > self.max_section_chars:
+            return self._extract_action_items_long(document_text)
+        
+        prompt = ACTION_ITEMS_PROMPT.render(document=CACHED_DOCUMENT_REFERENCE if cache_key else document_text)
+        
+        response = self._generate(prompt, cache_key)
+        return response.text
+    
+    def _extract_action_items_hinted(self, candidates):
+        """Refine locally extracted candidates using only their source sentences."""
+        
+        hints = "\n".join(
+            f"- {c['sentence']} [owner: {c['owner'] or 'N/A'}; deadline: {c['deadline'] or 'N/A'}"
+            f"{'; amounts: ' + ', '.join(c['amounts']) if c['amounts'] else ''}]"
+            for c in candidates
+        )
+        
+        prompt = HINTED_ACTION_ITEMS_PROMPT.render(hints=hints)
         
         response = self.model.generate_content(prompt)
         return response.text
+    
+    def analyze_document_multi(self, document_text, types=("comprehensive",), include_actions=True):
+        """
+        Run several analyses of the same document concurrently.
+        
+        Each analysis is an independent call, so total latency is that of the
+        slowest call rather than the sum of all of them. Large documents are
+        registered as cached context first so the calls share one upload.
+        
+        Args:
+            document_text (str): The document content
+            types (list): Analysis types, see analyze_document
+            include_actions (bool): Whether to also extract action items
+        
+        Returns:
+            dict: Analysis text keyed by analysis type, plus 'action_items' if requested
+        """
+        
+        self.register_document(document_text)
+        
+        with ThreadPoolExecutor(max_workers=len(types) + 1) as executor:
+            futures = {
+                analysis_type: executor.submit(self.analyze_document, document_text, analysis_type)
+                for analysis_type in types
+            }
+            if include_actions:
+                futures['action_items'] = executor.submit(self.extract_action_items, document_text)
+            
+            return {name: future.result() for name, future in futures.items()}
+    
+    def _extract_action_items_long(self, document_text):
+        """Extract action items per section concurrently, then merge and deduplicate."""
+        
+        sections = split_into_sections(document_text, self.max_section_chars)
+        
+        def section_prompt(section):
+            return SECTION_ACTION_ITEMS_PROMPT.render(title=section['title'], text=section['text'])
+        
+        section_outputs = self._map_sections(sections, section_prompt)
+        items = merge_action_items(parse_action_items(output) for output in section_outputs)
+        return format_action_items(items)
 
 # Example usage
 if __name__ == "__main__":
@@ -121,15 +801,18 @@ if __name__ == "__main__":
     Next Meeting: August 15, 2025
     """
     
-    # Comprehensive analysis
+    # Comprehensive and financial analysis plus action items, run concurrently
+    results = analyzer.analyze_document_multi(
+        sample_report,
+        types=["comprehensive", "financial"],
+        include_actions=True
+    )
+    
     print("=== COMPREHENSIVE ANALYSIS ===")
-    comprehensive = analyzer.analyze_document(sample_report, "comprehensive")
-    print(comprehensive)
+    print(results["comprehensive"])
     
     print("\n=== FINANCIAL ANALYSIS ===")
-    financial = analyzer.analyze_document(sample_report, "financial")
-    print(financial)
+    print(results["financial"])
     
     print("\n=== ACTION ITEMS ===")
-    actions = analyzer.extract_action_items(sample_report)
-    print(actions)
+    print(results["action_items"])
@@ -0,0 +1,232 @@
+import argparse
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from intelligent_business_chatbot import (
+    IntelligentBusinessChatbot, BATCH_FEATURES, KNOWLEDGE_BASE_FEATURES, FeatureArgumentError
+)
+
+# POST /v1/<endpoint> -> run_feature(<feature>, body)
+ENDPOINTS = {f"/v1/{feature.replace('_', '-')}": feature for feature in BATCH_FEATURES}
+
+STATUS_TEXT = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+    503: "Service Unavailable"
+}
+
+class EndpointLimiter:
+    """Per-endpoint concurrency limit with a bounded number of waiting requests."""
+    
+    def __init__(self, concurrency, queue_size):
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.queue_size = queue_size
+        self.waiting = 0
+        self.active = 0
+        self.rejected = 0
+        self.completed = 0
+    
+    def is_full(self):
+        return self.semaphore.locked() and self.waiting >= self.queue_size
+
+class ChatbotServer:
+    """
+    Asyncio HTTP server exposing chatbot features as JSON endpoints.
+    
+    One chatbot (knowledge base, context cache and model client) is shared by
+    all requests. Blocking model calls run on a thread pool; each endpoint has
+    its own concurrency limit and a bounded wait queue, and requests beyond
+    that are rejected with 503 and Retry-After so clients back off.
+    """
+    
+    def __init__(self, chatbot=None, concurrency=4, queue_size=16, max_body_bytes=1_000_000):
+        self.chatbot = chatbot
+        self.concurrency = concurrency
+        self.queue_size = queue_size
+        self.max_body_bytes = max_body_bytes
+        self.limiters = {}
+        self.executor = ThreadPoolExecutor(max_workers=concurrency * len(ENDPOINTS))
+        self.started = time.time()
+        self.server = None
+    
+    async def start(self, host="127.0.0.1", port=8080):
+        self.limiters = {path: EndpointLimiter(self.concurrency, self.queue_size) for path in ENDPOINTS}
+        self.server = await asyncio.start_server(self.handle_connection, host, port)
+        if self.chatbot is None:
+            # Create the shared client off the event loop (the knowledge base then warms
+            # up in the background); /healthz answers immediately and /readyz reports
+            # 503 until the client exists
+            loop = asyncio.get_running_loop()
+            warmup = loop.run_in_executor(self.executor, IntelligentBusinessChatbot)
+            warmup.add_done_callback(self._on_warmed_up)
+        return self.server
+    
+    def _on_warmed_up(self, future):
+        try:
+            self.chatbot = future.result()
+        except Exception as e:
+            print(f"❌ Could not initialize chatbot: {e}")
+    
+    async def serve_forever(self, host="127.0.0.1", port=8080):
+        server = await self.start(host, port)
+        address = server.sockets[0].getsockname()
+        print(f"🌐 Chatbot server listening on http://{address[0]}:{address[1]}")
+        print(f"   Endpoints: {', '.join(sorted(ENDPOINTS))}, /healthz, /readyz, /stats")
+        async with server:
+            await server.serve_forever()
+    
+    def is_ready(self):
+        """Ready once the shared chatbot exists; the knowledge base only gates kb_qa."""
+        return self.chatbot is not None
+    
+    def knowledge_base_unavailable(self):
+        """Return why knowledge base features cannot run yet, or None if they can."""
+        
+        if not self.chatbot.knowledge_base_ready.is_set():
+            return "Knowledge base is loading"
+        if not self.chatbot.knowledge_base:
+            return f"Knowledge base is unavailable ({self.chatbot.knowledge_base_state})"
+        return None
+    
+    async def handle_connection(self, reader, writer):
+        try:
+            status, payload = await self.handle_request(reader)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            writer.close()
+            return
+        except Exception as e:
+            status, payload = 500, {'error': f"{type(e).__name__}: {e}"}
+        
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        headers = [
+            f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}",
+            "Content-Type: application/json; charset=utf-8",
+            f"Content-Length: {len(body)}",
+            "Connection: close"
+        ]
+        if status == 503:
+            headers.append("Retry-After: 1")
+        writer.write(("\r\n".join(headers) + "\r\n\r\n").encode("latin-1") + body)
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+    
+    async def handle_request(self, reader):
+        request_line = (await reader.readline()).decode("latin-1").strip()
+        if not request_line:
+            raise ConnectionError("empty request")
+        parts = request_line.split()
+        if len(parts) < 2:
+            return 400, {'error': "Malformed request line"}
+        method, path = parts[0], parts[1].split("?", 1)[0]
+        
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode("latin-1").strip()
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        
+        if method == "GET" and path == "/healthz":
+            return 200, {'status': 'ok', 'uptime_seconds': round(time.time() - self.started, 1)}
+        if method == "GET" and path == "/readyz":
+            ready = self.is_ready()
+            payload = {'ready': ready}
+            if self.chatbot is not None:
+                payload['knowledge_base'] = self.chatbot.knowledge_base_status()
+            return (200 if ready else 503), payload
+        if method == "GET" and path == "/stats":
+            return 200, {
+                path: {
+                    'active': limiter.active,
+                    'waiting': limiter.waiting,
+                    'completed': limiter.completed,
+                    'rejected': limiter.rejected
+                }
+                for path, limiter in self.limiters.items()
+            }
+        
+        if path not in ENDPOINTS:
+            return 404, {'error': f"Unknown endpoint {path}"}
+        if method != "POST":
+            return 405, {'error': "Use POST with a JSON body"}
+        
+        try:
+            length = int(headers.get('content-length', 0))
+        except ValueError:
+            return 400, {'error': "Invalid Content-Length"}
+        if length < 0:
+            return 400, {'error': "Invalid Content-Length"}
+        if length > self.max_body_bytes:
+            return 413, {'error': f"Body larger than {self.max_body_bytes} bytes"}
+        try:
+            args = json.loads((await reader.readexactly(length)).decode("utf-8") or "{}")
+        except UnicodeDecodeError:
+            return 400, {'error': "Body must be UTF-8 encoded JSON"}
+        except json.JSONDecodeError as e:
+            return 400, {'error': f"Invalid JSON: {e}"}
+        if not isinstance(args, dict):
+            return 400, {'error': "Body must be a JSON object"}
+        
+        if not self.is_ready():
+            return 503, {'error': "Server is warming up"}
+        if ENDPOINTS[path] in KNOWLEDGE_BASE_FEATURES:
+            reason = self.knowledge_base_unavailable()
+            if reason:
+                return 503, {'error': reason}
+        
+        limiter = self.limiters[path]
+        if limiter.is_full():
+            limiter.rejected += 1
+            return 503, {'error': "Too many requests for this endpoint, retry later"}
+        
+        return await self.run_feature(limiter, ENDPOINTS[path], args)
+    
+    async def run_feature(self, limiter, feature, args):
+        started = time.perf_counter()
+        limiter.waiting += 1
+        try:
+            await limiter.semaphore.acquire()
+        finally:
+            limiter.waiting -= 1
+        
+        limiter.active += 1
+        try:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self.executor, self.chatbot.run_feature, feature, args)
+        except FeatureArgumentError as e:
+            return 400, {'error': str(e)}
+        except Exception as e:
+            return 500, {'error': f"{type(e).__name__}: {e}"}
+        finally:
+            limiter.active -= 1
+            limiter.completed += 1
+            limiter.semaphore.release()
+        
+        result['feature'] = feature
+        result['latency_seconds'] = round(time.perf_counter() - started, 3)
+        return 200, result
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve chatbot features as JSON HTTP endpoints.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--concurrency", type=int, default=4, help="Concurrent requests per endpoint")
+    parser.add_argument("--queue-size", type=int, default=16, help="Waiting requests per endpoint before 503")
+    args = parser.parse_args()
+    
+    server = ChatbotServer(concurrency=args.concurrency, queue_size=args.queue_size)
+    try:
+        asyncio.run(server.serve_forever(args.host, args.port))
+    except KeyboardInterrupt:
+        print("\n👋 Server stopped.")
+
+if __name__ == "__main__":
+    main()
@@ -1,34 +1,706 @@
-import requests
 import json
-from datetime import datetime
+import math
+import os
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, as_completed, wait
+from datetime import datetime, timezone
 import re
 from config import GeminiConfig
+from fake_backend import estimate_tokens
+
+ITEM_FIELD_PATTERN = re.compile(r"^\s*[-*]?\s*(Competitor|Category|Urgency|Finding|Implication)\s*:\s*(.+)$", re.IGNORECASE)
+URGENCY_RANK = {'high': 0, 'medium': 1, 'low': 2}
+METRIC_VALUE_PATTERN = re.compile(r"^([-+]?\d+(?:\.\d+)?)\s*([kmb])?\s*(?:%|/\s*\d+(?:\.\d+)?)?$", re.IGNORECASE)
+METRIC_SUFFIXES = {'k': 1e3, 'm': 1e6, 'b': 1e9}
+
+def item_content_hash(item):
+    """Hash of an item's whitespace- and case-normalized content."""
+    content = " ".join(str(item.get('content', '')).lower().split())
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+def item_id_for(item):
+    """
+    Store id of an item: its content hash, or a hash of source, title and url
+    for items without content (which would otherwise all share one id).
+    """
+    
+    if " ".join(str(item.get('content', '')).split()):
+        return item_content_hash(item)[:16]
+    key = "|".join(" ".join(str(item.get(field) or '').lower().split()) for field in ('source', 'title', 'url'))
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+
+def item_source_key(item):
+    """
+    Normalized source/title key, to catch re-published copies of the same item.
+    
+    Untitled items (feeds fill in 'N/A') are keyed by their link instead, and
+    items with neither get no key, so they are only deduplicated by id.
+    """
+    
+    source = " ".join(str(item.get('source', '')).lower().split())
+    title = " ".join(str(item.get('title') or '').lower().split())
+    if title and title != "n/a":
+        return f"{source}|{title}"
+    url = str(item.get('url') or '').strip()
+    return f"{source}|url:{url}" if url else None
+
+def write_json_atomic(path, text):
+    """Write text to a temporary file and swap it in, so a crash never leaves a truncated file."""
+    
+    temp_path = path + ".tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(temp_path, path)
+
+def parse_item_analysis(text):
+    """Parse 'Field: value' lines of a per-item analysis into a dict."""
+    
+    analysis = {}
+    for line in text.splitlines():
+        match = ITEM_FIELD_PATTERN.match(line)
+        if match:
+            analysis[match.group(1).lower()] = match.group(2).strip()
+    
+    urgency = analysis.get('urgency', '').split()[0].lower() if analysis.get('urgency') else ''
+    analysis['urgency'] = urgency.capitalize() if urgency in URGENCY_RANK else "Medium"
+    if not analysis.get('finding'):
+        analysis['finding'] = " ".join(text.split())[:300]
+    return analysis
+
+class IntelligenceStore:
+    """
+    Persistent store of competitive intelligence items and their analyses.
+    
+    Items are deduplicated by content hash and by source/title, so the same
+    announcement arriving twice (or re-published with minor edits under the
+    same title) is stored once. Each item keeps its structured analysis, so
+    only newly arrived items need a model call. The store is kept in memory
+    and persisted to a JSON file when a path is given.
+    """
+    
+    def __init__(self, path=None):
+        self.path = path
+        self.items = {}
+        self.source_index = {}
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        
+        if path and os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.items = json.load(f).get('items', {})
+            for item_id, item in self.items.items():
+                source_key = item_source_key(item)
+                if source_key is not None:
+                    self.source_index[source_key] = item_id
+    
+    def add(self, item):
+        """
+        Add an item unless it is a duplicate.
+        
+        Returns:
+            tuple: (item id, True if the item is new)
+        """
+        
+        item_id = item_id_for(item)
+        source_key = item_source_key(item)
+        with self._lock:
+            if item_id in self.items:
+                return item_id, False
+            if source_key is not None and source_key in self.source_index:
+                return self.source_index[source_key], False
+            
+            self.items[item_id] = {
+                'id': item_id,
+                'source': item.get('source', 'Unknown'),
+                'title': item.get('title', 'N/A'),
+                'date': item.get('date', 'N/A'),
+                'content': item.get('content', ''),
+                'url': item.get('url'),
+                'first_seen': datetime.now().isoformat(),
+                'analysis': None
+            }
+            if source_key is not None:
+                self.source_index[source_key] = item_id
+            return item_id, True
+    
+    def add_items(self, items):
+        """Add several items and return the ids of the new ones."""
+        return [item_id for item_id, is_new in (self.add(item) for item in items) if is_new]
+    
+    def get(self, item_id):
+        return self.items.get(item_id)
+    
+    def all_items(self):
+        with self._lock:
+            return list(self.items.values())
+    
+    def unanalyzed(self):
+        with self._lock:
+            return [item for item in self.items.values() if item['analysis'] is None]
+    
+    def set_analysis(self, item_id, analysis):
+        with self._lock:
+            self.items[item_id]['analysis'] = analysis
+    
+    def set_embedding(self, item_id, embedding):
+        with self._lock:
+            if item_id in self.items:
+                self.items[item_id]['embedding'] = list(embedding)
+    
+    def embeddings(self, exclude=()):
+        """Embeddings of stored items (those that have one), except the excluded ids."""
+        
+        with self._lock:
+            return [item['embedding'] for item_id, item in self.items.items()
+                    if item.get('embedding') is not None and item_id not in exclude]
+    
+    def save(self):
+        """Persist the store to its JSON file, if one was configured."""
+        
+        if not self.path:
+            return
+        # Serialize under the lock (a snapshot), write outside it; saves run one at a time
+        with self._save_lock:
+            with self._lock:
+                text = json.dumps({'items': self.items}, ensure_ascii=False)
+            write_json_atomic(self.path, text)
+
+def parse_metric_value(value):
+    """
+    Numeric value of a metric such as 380000, "12%", "$2.4M", "1,200" or "4.2/5".
+    
+    Percentages keep their number (12.0) and ratings their score (4.2).
+    
+    Returns:
+        float: The value, or None if it is not numeric
+    """
+    
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if not isinstance(value, str):
+        return None
+    match = METRIC_VALUE_PATTERN.match(value.strip().lstrip("$€£").replace(",", "").strip())
+    if not match:
+        return None
+    return float(match.group(1)) * METRIC_SUFFIXES.get((match.group(2) or '').lower(), 1)
+
+def normalize_timestamp(timestamp=None):
+    """
+    A snapshot timestamp as naive ISO 8601 with seconds (UTC if it had a
+    timezone), so dates and date-times from different callers sort together.
+    """
+    
+    if timestamp is None:
+        return datetime.now().isoformat(timespec='seconds')
+    if not isinstance(timestamp, datetime):
+        timestamp = datetime.fromisoformat(str(timestamp).strip())
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return timestamp.isoformat(timespec='seconds')
+
+class MetricsStore:
+    """
+    Columnar time series of competitor metric snapshots.
+    
+    Each competitor has a 'timestamp' column plus one column per metric, kept
+    as parallel lists (metrics missing from a snapshot are stored as None).
+    The store is kept in memory and persisted to a JSON file when a path is
+    given; frame() returns a pandas DataFrame for vectorized analysis.
+    """
+    
+    def __init__(self, path=None):
+        self.path = path
+        self.series = {}
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        
+        if path and os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.series = json.load(f).get('series', {})
+    
+    def record(self, competitor, metrics, timestamp=None):
+        """
+        Append a snapshot of numeric metrics.
+        
+        Values like "12%", "$2M" or "4.2/5" are parsed with parse_metric_value;
+        values that are not numeric at all are not stored.
+        
+        Returns:
+            dict: The metrics that were not stored, with their raw values
+        """
+        
+        timestamp = normalize_timestamp(timestamp)
+        numeric = {}
+        skipped = {}
+        for name, value in metrics.items():
+            number = parse_metric_value(value)
+            if number is None:
+                skipped[name] = value
+            else:
+                numeric[name] = number
+        with self._lock:
+            columns = self.series.setdefault(competitor, {'timestamp': []})
+            rows = len(columns['timestamp'])
+            for name in numeric:
+                columns.setdefault(name, [None] * rows)
+            for name, values in columns.items():
+                if name == 'timestamp':
+                    values.append(timestamp)
+                else:
+                    values.append(numeric.get(name))
+        return skipped
+    
+    def competitors(self):
+        return list(self.series)
+    
+    def frame(self, competitor):
+        """Snapshots of one competitor as a DataFrame indexed by timestamp."""
+        
+        import pandas as pd
+        
+        with self._lock:
+            columns = {name: list(values) for name, values in self.series.get(competitor, {'timestamp': []}).items()}
+        # Stores written before timestamps were normalized may mix dates and date-times
+        index = pd.to_datetime(columns.pop('timestamp'), format='ISO8601')
+        return pd.DataFrame(columns, index=index, dtype=float).sort_index()
+    
+    def save(self):
+        """Persist the store to its JSON file, if one was configured."""
+        
+        if not self.path:
+            return
+        with self._save_lock:
+            with self._lock:
+                text = json.dumps({'series': self.series}, ensure_ascii=False)
+            write_json_atomic(self.path, text)
+
+def compute_metric_trends(frame, window=3, anomaly_z=2.0, min_anomaly_pct=5.0):
+    """
+    Vectorized trend statistics for every metric column of a snapshot frame.
+    
+    Returns:
+        dict: metric -> latest, previous, change_pct (last period), mean_growth_pct
+            (mean period-over-period growth), moving_average (over window
+            snapshots), slope (least-squares change per snapshot) and anomalies
+            (timestamps whose period change is more than anomaly_z standard
+            deviations, and at least min_anomaly_pct points, from the mean change)
+    """
+    
+    import numpy as np
+    
+    trends = {}
+    for metric in frame.columns:
+        values = frame[metric].dropna()
+        if values.empty:
+            continue
+        
+        growth = values.pct_change().replace([np.inf, -np.inf], np.nan).dropna() * 100
+        trend = {
+            'snapshots': int(len(values)),
+            'latest': float(values.iloc[-1]),
+            'previous': float(values.iloc[-2]) if len(values) > 1 else None,
+            'change_pct': float(growth.iloc[-1]) if len(growth) else None,
+            'mean_growth_pct': float(growth.mean()) if len(growth) else None,
+            'moving_average': float(values.rolling(window, min_periods=1).mean().iloc[-1]),
+            'slope': float(np.polyfit(np.arange(len(values)), values.to_numpy(), 1)[0]) if len(values) > 1 else None,
+            'anomalies': []
+        }
+        
+        if len(growth) >= 3:
+            deviation = growth.std()
+            if deviation > 0:
+                distance = (growth - growth.mean()).abs()
+                outliers = distance[(distance / deviation > anomaly_z) & (distance >= min_anomaly_pct)]
+                trend['anomalies'] = [index.strftime('%Y-%m-%d') for index in outliers.index]
+        
+        trends[metric] = trend
+    return trends
+
+def compare_competitors(store, metrics=None):
+    """
+    Compare the latest value of each metric across all tracked competitors.
+    
+    Returns:
+        dict: metric -> {'values': {competitor: latest}, 'median': median across competitors}
+    """
+    
+    import pandas as pd
+    
+    latest = {}
+    for competitor in store.competitors():
+        frame = store.frame(competitor)
+        if not frame.empty:
+            latest[competitor] = frame.ffill().iloc[-1]
+    if not latest:
+        return {}
+    
+    table = pd.DataFrame(latest).T
+    comparison = {}
+    for metric in metrics or table.columns:
+        if metric not in table.columns:
+            continue
+        column = table[metric].dropna()
+        if len(column) < 2:
+            continue
+        comparison[metric] = {
+            'values': {competitor: float(value) for competitor, value in column.items()},
+            'median': float(column.median())
+        }
+    return comparison
+
+def format_metric_trends(trends, comparison, competitor_name):
+    """Render computed trends and peer comparisons as compact prompt lines."""
+    
+    lines = []
+    for metric, trend in trends.items():
+        line = f"- {metric}: {trend['latest']:,.2f}"
+        if trend['previous'] is not None:
+            line += f" (previous {trend['previous']:,.2f}"
+            if trend['change_pct'] is not None:
+                line += f", {trend['change_pct']:+.1f}% last period"
+            if trend['mean_growth_pct'] is not None:
+                line += f", mean {trend['mean_growth_pct']:+.1f}%/period over {trend['snapshots']} snapshots"
+            line += f", moving average {trend['moving_average']:,.2f}, slope {trend['slope']:+,.2f}/snapshot)"
+        else:
+            line += " (first snapshot, no trend yet)"
+        if trend['anomalies']:
+            line += f" ANOMALOUS CHANGE on {', '.join(trend['anomalies'])}"
+        
+        peers = comparison.get(metric)
+        if peers and competitor_name in peers['values']:
+            others = ", ".join(f"{name} {value:,.2f}" for name, value in peers['values'].items() if name != competitor_name)
+            line += f"; median of tracked competitors {peers['median']:,.2f} ({others})"
+        lines.append(line)
+    return "\n".join(lines)
+
+def format_item(item, max_chars=None):
+    """Render an intelligence item as a prompt block, optionally truncating its content."""
+    
+    content = str(item.get('content', 'N/A'))
+    if max_chars and len(content) > max_chars:
+        content = content[:max_chars].rsplit(" ", 1)[0] + " ..."
+    block = (
+        f"Source: {item.get('source', 'Unknown')}\n"
+        f"Title: {item.get('title', 'N/A')}\n"
+        f"Date: {item.get('date', 'N/A')}\n"
+        f"Content: {content}"
+    )
+    if item.get('also_reported_by'):
+        block += f"\nAlso reported by: {', '.join(item['also_reported_by'])}"
+    return block
+
+ITEM_SEPARATOR = "\n\n---\n\n"
+
+def fit_items_to_budget(items, token_budget, max_item_chars=None):
+    """
+    Leading items whose prompt block fits the token budget.
+    
+    If not even the first item fits, its content is cut down to fit.
+    
+    Returns:
+        tuple: (kept items, their prompt block); no items if nothing fits
+    """
+    
+    blocks = []
+    for item in items:
+        if estimate_tokens(ITEM_SEPARATOR.join(blocks + [format_item(item, max_item_chars)])) > token_budget:
+            break
+        blocks.append(format_item(item, max_item_chars))
+    if blocks:
+        return items[:len(blocks)], ITEM_SEPARATOR.join(blocks)
+    
+    # Room left for content after the item's headers, minus the " ..." marker
+    max_chars = token_budget * 4 - len(format_item({**items[0], 'content': ''})) - 4
+    block = format_item(items[0], max_chars) if max_chars > 0 else ""
+    if not block or estimate_tokens(block) > token_budget:
+        return [], ""
+    return items[:1], block
+
+def cluster_items(embeddings, threshold=0.75):
+    """
+    Greedy single-pass clustering of embeddings by cosine similarity.
+    
+    Each vector joins the cluster with the most similar centroid if that
+    similarity reaches the threshold, otherwise it starts a new cluster.
+    
+    Returns:
+        tuple: (list of clusters as lists of indices, unit-normalized vectors)
+    """
+    
+    import numpy as np
+    
+    vectors = np.asarray(embeddings, dtype=float)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    vectors = vectors / np.where(norms == 0, 1, norms)
+    
+    clusters = []
+    centroids = np.empty((0, vectors.shape[1]))
+    for i, vector in enumerate(vectors):
+        if len(clusters):
+            similarities = centroids @ vector
+            best = int(np.argmax(similarities))
+            if similarities[best] >= threshold:
+                clusters[best].append(i)
+                centroid = vectors[clusters[best]].mean(axis=0)
+                centroids[best] = centroid / (np.linalg.norm(centroid) or 1)
+                continue
+        clusters.append([i])
+        centroids = np.vstack([centroids, vector])
+    return clusters, vectors
+
+def collapse_duplicates(items, indices, vectors, threshold=0.92):
+    """
+    Merge near-identical coverage of the same announcement within a cluster.
+    
+    Returns:
+        list: One item per announcement, the longest version, with the sources
+            of the other copies in 'also_reported_by'
+    """
+    
+    groups = []
+    for i in sorted(indices, key=lambda i: len(str(items[i].get('content', ''))), reverse=True):
+        for group in groups:
+            if float(vectors[group[0]] @ vectors[i]) >= threshold:
+                group.append(i)
+                break
+        else:
+            groups.append([i])
+    
+    collapsed = []
+    for group in groups:
+        item = dict(items[group[0]])
+        duplicates = [items[i].get('source', 'Unknown') for i in group[1:]]
+        if duplicates:
+            item['also_reported_by'] = duplicates
+        collapsed.append(item)
+    return collapsed
+
+def _item_age_days(item, now):
+    try:
+        return max((now - datetime.fromisoformat(str(item.get('date', ''))[:10])).days, 0)
+    except ValueError:
+        return None
+
+def rank_clusters(items, clusters, vectors, seen_vectors=None, half_life_days=14, now=None):
+    """
+    Score clusters by recency, novelty and size, highest first.
+    
+    Recency halves every half_life_days from the cluster's newest item (undated
+    clusters count as one half-life old). Novelty is one minus the centroid's
+    highest similarity to previously seen items. Larger clusters get a
+    logarithmic boost for broader coverage.
+    
+    Returns:
+        list: Dicts with 'indices', 'score', 'recency' and 'novelty'
+    """
+    
+    import numpy as np
+    
+    now = now or datetime.now()
+    seen = None
+    if seen_vectors is not None and len(seen_vectors):
+        seen = np.asarray(seen_vectors, dtype=float)
+        seen = seen / np.where(np.linalg.norm(seen, axis=1, keepdims=True) == 0, 1,
+                               np.linalg.norm(seen, axis=1, keepdims=True))
+    
+    ranked = []
+    for indices in clusters:
+        ages = [age for age in (_item_age_days(items[i], now) for i in indices) if age is not None]
+        recency = 0.5 ** ((min(ages) if ages else half_life_days) / half_life_days)
+        
+        centroid = vectors[indices].mean(axis=0)
+        centroid = centroid / (np.linalg.norm(centroid) or 1)
+        novelty = 1.0 if seen is None else float(np.clip(1 - (seen @ centroid).max(), 0, 1))
+        
+        ranked.append({
+            'indices': indices,
+            'score': recency * max(novelty, 0.05) * (1 + math.log(len(indices))),
+            'recency': round(recency, 3),
+            'novelty': round(novelty, 3)
+        })
+    ranked.sort(key=lambda cluster: cluster['score'], reverse=True)
+    return ranked
+
+def run_stage_graph(stages, max_workers=4):
+    """
+    Run a DAG of stages, starting each one as soon as its dependencies finish.
+    
+    Args:
+        stages (dict): name -> (dependencies, fn); fn receives a dict of the
+            results of its dependencies
+        max_workers (int): Maximum stages running at once
+    
+    Returns:
+        tuple: (results by stage name, seconds taken by each stage)
+    """
+    
+    for name, (dependencies, _) in stages.items():
+        missing = [dep for dep in dependencies if dep not in stages]
+        if missing:
+            raise ValueError(f"Stage '{name}' depends on unknown stage(s): {', '.join(missing)}")
+    
+    results = {}
+    timings = {}
+    
+    def run(name):
+        dependencies, fn = stages[name]
+        start = time.perf_counter()
+        result = fn({dep: results[dep] for dep in dependencies})
+        timings[name] = round(time.perf_counter() - start, 3)
+        return result
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        running = {}
+        pending = dict(stages)
+        while pending or running:
+            ready = [name for name, (dependencies, _) in pending.items()
+                     if all(dep in results for dep in dependencies)]
+            for name in ready:
+                running[executor.submit(run, name)] = name
+                del pending[name]
+            if not running:
+                raise ValueError(f"Stage dependency cycle among: {', '.join(pending)}")
+            
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                results[running.pop(future)] = future.result()
+    
+    return results, timings
 
 class CompetitiveIntelligenceAnalyzer:
-    def __init__(self):
+    def __init__(self, store=None, max_workers=4, metrics_store=None, cluster_min_items=12, token_budget=24000):
         self.config = GeminiConfig()
         self.model = self.config.get_generative_model()
-        self.intelligence_data = []
+        # Persistent, deduplicated intelligence items with per-item analyses
+        self.store = store or IntelligenceStore()
+        # Metric snapshots per competitor, for locally computed trends
+        self.metrics_store = metrics_store or MetricsStore()
+        self.last_metric_trends = {}
+        # Larger item sets are clustered and analyzed cluster by cluster within the token budget
+        self.cluster_min_items = cluster_min_items
+        self.token_budget = token_budget
+        self.last_cluster_stats = {}
+        self.max_workers = max_workers
+        self.last_stage_timings = {}
+        self.last_report_stats = {}
+        self.last_analysis_failures = []
     
     def analyze_competitor_content(self, content_items):
-        """Analyze competitor-related content for strategic insights."""
+        """
+        Analyze competitor-related content for strategic insights.
+        
+        Item sets of cluster_min_items or more are clustered by topic first
+        (see analyze_clustered_content) instead of being sent in one prompt.
+        """
+        
+        if len(content_items) >= self.cluster_min_items:
+            return self.analyze_clustered_content(content_items)
         
         # Combine all content for analysis
-        combined_content = ""
-        for item in content_items:
-            combined_content += f"""
-            Source: {item.get('source', 'Unknown')}
-            Title: {item.get('title', 'N/A')}
-            Date: {item.get('date', 'N/A')}
-            Content: {item.get('content', 'N/A')}
+        combined_content = "\n\n---\n\n".join(format_item(item) for item in content_items)
+        
+        response = self.model.generate_content(self._competitive_analysis_prompt(combined_content))
+        return response.text
+    
+    def analyze_clustered_content(self, content_items, token_budget=None, max_item_chars=1500):
+        """
+        Analyze many items by topic cluster within a token budget.
+        
+        Items are embedded and clustered, near-duplicate coverage of the same
+        announcement is collapsed into one item, and clusters are ranked by
+        recency and novelty against previously stored items. The top clusters
+        that fit the token budget are analyzed concurrently and their notes are
+        combined into the strategic analysis.
+        
+        Args:
+            content_items (list): Intelligence item dicts
+            token_budget (int): Estimated prompt tokens for the cluster analyses
+            max_item_chars (int): Content characters kept per item
+        """
+        
+        token_budget = token_budget or self.token_budget
+        embeddings = self.config.embed_content(
+            [f"{item.get('title', '')}\n{item.get('content', '')}" for item in content_items],
+            task_type="CLUSTERING"
+        )['embedding']
+        
+        item_ids = [item_id_for(item) for item in content_items]
+        clusters, vectors = cluster_items(embeddings)
+        ranked = rank_clusters(content_items, clusters, vectors, self.store.embeddings(exclude=set(item_ids)))
+        
+        # Remember embeddings of stored items so later batches can judge novelty
+        for item_id, vector in zip(item_ids, vectors):
+            self.store.set_embedding(item_id, vector)
+        
+        selected = []
+        used_tokens = 0
+        truncated = 0
+        collapsed = 0
+        for cluster in ranked:
+            items = collapse_duplicates(content_items, cluster['indices'], vectors)
+            duplicates = len(cluster['indices']) - len(items)
+            block = ITEM_SEPARATOR.join(format_item(item, max_item_chars) for item in items)
+            tokens = estimate_tokens(block)
+            if used_tokens + tokens > token_budget:
+                if selected:
+                    continue
+                # The top-ranked cluster alone is over budget: analyze as much of it as fits
+                items, block = fit_items_to_budget(items, token_budget, max_item_chars)
+                if not items:
+                    continue
+                tokens = estimate_tokens(block)
+                truncated += 1
+            selected.append((cluster, items, block))
+            used_tokens += tokens
+            collapsed += duplicates
+        
+        def analyze_cluster(entry):
+            cluster, items, block = entry
+            prompt = f"""
+            Analyze this group of {len(items)} related competitive intelligence item(s):
+            
+            {block}
             
-            ---
+            Summarize concisely:
+            - What happened and which competitors are involved
+            - Threats and opportunities for our business
+            - Urgency (High/Medium/Low) and recommended response
             """
+            return self.model.generate_content(prompt).text
         
-        analysis_prompt = f"""
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            notes = list(executor.map(analyze_cluster, selected))
+        
+        cluster_notes = "\n\n".join(
+            f"Topic {i} ({len(items)} item(s), recency {cluster['recency']}, novelty {cluster['novelty']}; "
+            f"titles: {'; '.join(item.get('title', 'N/A') for item in items)}):\n{note}"
+            for i, ((cluster, items, _), note) in enumerate(zip(selected, notes), 1)
+        )
+        
+        self.last_cluster_stats = {
+            'items': len(content_items),
+            'clusters': len(clusters),
+            'analyzed_clusters': len(selected),
+            'skipped_clusters': len(clusters) - len(selected),
+            'truncated_clusters': truncated,
+            'duplicates_collapsed': collapsed,
+            'prompt_tokens': used_tokens
+        }
+        
+        response = self.model.generate_content(self._competitive_analysis_prompt(cluster_notes))
+        return response.text
+    
+    def _competitive_analysis_prompt(self, intelligence_text):
+        """Build the strategic analysis prompt for raw items or per-item findings."""
+        
+        return f"""
         Analyze the following competitive intelligence for strategic business insights:
         
-        {combined_content}
+        {intelligence_text}
         
         Provide analysis in these categories:
         
@@ -65,9 +737,121 @@ class CompetitiveIntelligenceAnalyzer:
         Focus on actionable insights that can inform business decisions.
         Highlight urgent items requiring immediate attention.
         """
+    
+    def ingest_items(self, items):
+        """Add items to the store, skipping duplicates; returns the ids of new items."""
         
-        response = self.model.generate_content(analysis_prompt)
-        return response.text
+        new_ids = self.store.add_items(items)
+        if new_ids:
+            self.store.save()
+        return new_ids
+    
+    def analyze_item(self, item):
+        """Analyze a single intelligence item into a small structured finding."""
+        
+        prompt = f"""
+        Analyze this competitive intelligence item for our business.
+        
+        Source: {item.get('source', 'Unknown')}
+        Title: {item.get('title', 'N/A')}
+        Date: {item.get('date', 'N/A')}
+        Content: {item.get('content', 'N/A')}
+        
+        Respond with exactly these lines:
+        Competitor: [company the item is about]
+        Category: [Threat/Opportunity/Financial/Customer/Product]
+        Urgency: [High/Medium/Low]
+        Finding: [one sentence on what happened]
+        Implication: [one sentence on what it means for us]
+        """
+        
+        response = self.model.generate_content(prompt)
+        return parse_item_analysis(response.text)
+    
+    def analyze_new_items(self):
+        """
+        Analyze stored items that have no analysis yet, concurrently.
+        
+        An item whose analysis fails stays unanalyzed, so it is retried on the
+        next call; the failures are kept in self.last_analysis_failures.
+        
+        Returns:
+            int: Number of items analyzed successfully
+        """
+        
+        self.last_analysis_failures = []
+        pending = self.store.unanalyzed()
+        if not pending:
+            return 0
+        analyzed = 0
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(self.analyze_item, item): item for item in pending}
+            for future in as_completed(futures):
+                item = futures[future]
+                try:
+                    self.store.set_analysis(item['id'], future.result())
+                    analyzed += 1
+                except Exception as e:
+                    self.last_analysis_failures.append({'id': item['id'], 'title': item['title'], 'error': f"{type(e).__name__}: {e}"})
+        if analyzed:
+            self.store.save()
+        return analyzed
+    
+    def format_findings(self, items):
+        """Compact digest of per-item findings, most urgent and most recent first."""
+        
+        # Undated items ('N/A') sort after dated ones
+        ordered = sorted(items, key=lambda item: str(item.get('date', '')).replace('N/A', ''), reverse=True)
+        ordered.sort(key=lambda item: URGENCY_RANK.get(item['analysis']['urgency'].lower(), 1))
+        lines = []
+        for item in ordered:
+            analysis = item['analysis']
+            lines.append(
+                f"- [{analysis['urgency']}] {analysis.get('competitor', 'Unknown')} "
+                f"({analysis.get('category', 'General')}): {analysis['finding']}"
+                + (f" Implication: {analysis['implication']}" if analysis.get('implication') else "")
+                + f" (Source: {item['source']} - {item['title']}, {item['date']})"
+            )
+        return "\n".join(lines)
+    
+    def generate_incremental_report(self, new_items=(), report_focus="comprehensive"):
+        """
+        Generate a report over every stored item, analyzing only new ones.
+        
+        New items are deduplicated into the store and analyzed individually;
+        cached findings of earlier items are reused, and the report is built
+        from the compact findings rather than the full item text.
+        
+        Args:
+            new_items (list): Newly arrived items (may include already-seen ones)
+            report_focus (str): Report focus, as for generate_competitive_report
+        
+        Returns:
+            str: The report; statistics are stored in self.last_report_stats
+        """
+        
+        new_items = list(new_items)
+        new_ids = self.ingest_items(new_items)
+        analyzed = self.analyze_new_items()
+        items = self.store.all_items()
+        # Items whose analysis failed are retried next time and left out of the findings
+        analyzed_items = [item for item in items if item['analysis'] is not None]
+        
+        stages = self._report_stages(items)
+        stages['analysis'] = ((), lambda deps: self.model.generate_content(
+            self._competitive_analysis_prompt(self.format_findings(analyzed_items))
+        ).text)
+        report = self._compile_report(stages, items)
+        
+        self.last_report_stats = {
+            'items': len(items),
+            'new_items': len(new_ids),
+            'duplicates_skipped': len(new_items) - len(new_ids),
+            'analyzed_items': analyzed,
+            'failed_items': len(self.last_analysis_failures),
+            'reused_analyses': len(analyzed_items) - analyzed
+        }
+        return report
     
     def extract_key_insights(self, analysis_text):
         """Extract key insights and action items from competitive analysis."""
@@ -94,20 +878,13 @@ class CompetitiveIntelligenceAnalyzer:
         response = self.model.generate_content(insights_prompt)
         return response.text
     
-    def generate_competitive_report(self, intelligence_items, report_focus="comprehensive"):
-        """Generate a comprehensive competitive intelligence report."""
-        
-        # Analyze the intelligence
-        analysis = self.analyze_competitor_content(intelligence_items)
-        
-        # Extract key insights
-        insights = self.extract_key_insights(analysis)
+    def generate_executive_summary(self, analysis_text):
+        """Write a short executive summary of a competitive analysis."""
         
-        # Generate executive summary
         summary_prompt = f"""
         Create an executive summary of this competitive intelligence analysis:
         
-        {analysis}
+        {analysis_text}
         
         The executive summary should be 3-4 sentences that highlight:
         - The most significant competitive developments
@@ -117,7 +894,36 @@ class CompetitiveIntelligenceAnalyzer:
         Write for senior executives who need to understand the competitive landscape quickly.
         """
         
-        summary = self.model.generate_content(summary_prompt)
+        response = self.model.generate_content(summary_prompt)
+        return response.text
+    
+    def _report_stages(self, intelligence_items):
+        """
+        Stages of the report pipeline as name -> (dependencies, fn).
+        
+        Insights and the executive summary depend only on the analysis, so they
+        run concurrently. New report sections are added here as new stages.
+        """
+        
+        return {
+            'analysis': ((), lambda deps: self.analyze_competitor_content(intelligence_items)),
+            'insights': (('analysis',), lambda deps: self.extract_key_insights(deps['analysis'])),
+            'summary': (('analysis',), lambda deps: self.generate_executive_summary(deps['analysis']))
+        }
+    
+    def generate_competitive_report(self, intelligence_items, report_focus="comprehensive"):
+        """
+        Generate a comprehensive competitive intelligence report.
+        
+        Per-stage timings of the last report are kept in last_stage_timings.
+        """
+        
+        return self._compile_report(self._report_stages(intelligence_items), intelligence_items)
+    
+    def _compile_report(self, stages, intelligence_items):
+        start = time.perf_counter()
+        results, self.last_stage_timings = run_stage_graph(stages, self.max_workers)
+        self.last_stage_timings['total'] = round(time.perf_counter() - start, 3)
         
         # Compile final report
         report = f"""
@@ -125,13 +931,13 @@ class CompetitiveIntelligenceAnalyzer:
         ## Generated: {datetime.now().strftime('%Y-%m-%d %H:%M')}
         
         ## Executive Summary
-        {summary.text}
+        {results['summary']}
         
         ## Detailed Analysis
-        {analysis}
+        {results['analysis']}
         
         ## Key Strategic Insights
-        {insights}
+        {results['insights']}
         
         ## Intelligence Sources
         """
@@ -141,14 +947,41 @@ class CompetitiveIntelligenceAnalyzer:
         
         return report
     
-    def track_competitor_metrics(self, competitor_name, metrics_data):
-        """Track and analyze competitor performance metrics over time."""
+    def track_competitor_metrics(self, competitor_name, metrics_data, timestamp=None):
+        """
+        Track and analyze competitor performance metrics over time.
+        
+        The snapshot is appended to the metrics store; growth rates, moving
+        averages, anomalies and peer comparisons are computed locally and only
+        those figures are sent to the model for the narrative.
         
+        Args:
+            competitor_name (str): Competitor the metrics belong to
+            metrics_data (dict): Metric name -> value for this snapshot (numbers or
+                strings such as "12%", "$2M" or "4.2/5")
+            timestamp (str): ISO date/time of the snapshot (default: now)
+        """
+        
+        skipped = self.metrics_store.record(competitor_name, metrics_data, timestamp)
+        self.metrics_store.save()
+        
+        trends = compute_metric_trends(self.metrics_store.frame(competitor_name))
+        comparison = compare_competitors(self.metrics_store, trends.keys())
+        self.last_metric_trends = {'trends': trends, 'comparison': comparison, 'skipped': skipped}
+        
+        # Metrics without a computable trend are still passed on as reported
+        reported = ""
+        if skipped:
+            reported = "Reported values (not numeric, no trend computed):\n" + "\n".join(
+                f"- {name}: {value}" for name, value in skipped.items()
+            )
+        snapshots = max((trend['snapshots'] for trend in trends.values()), default=0)
         tracking_prompt = f"""
         Analyze performance metrics for competitor: {competitor_name}
         
-        Metrics Data:
-        {json.dumps(metrics_data, indent=2)}
+        Computed metric trends ({snapshots} snapshot(s); all figures are pre-computed, do not recalculate):
+        {format_metric_trends(trends, comparison, competitor_name) or "- none"}
+        {reported}
         
         Provide analysis on:
         1. Performance Trends (growth/decline patterns)
@@ -200,6 +1033,7 @@ if __name__ == "__main__":
     
     competitive_report = analyzer.generate_competitive_report(sample_intelligence)
     print(competitive_report)
+    print(f"Stage timings (s): {analyzer.last_stage_timings}")
     
     # Track specific competitor metrics
     print("\n=== COMPETITOR METRICS TRACKING ===")
@@ -213,9 +1047,33 @@ if __name__ == "__main__":
         'average_deal_size': 2400
     }
     
-    metrics_analysis = analyzer.track_competitor_metrics("RivalCorp", rival_metrics)
+    # Earlier snapshots (and a peer) give the tracker real trends to compute
+    for month, (users, revenue, churn) in enumerate([(38000, 310000, 3.9), (41000, 342000, 3.6), (43000, 361000, 3.4)], 4):
+        analyzer.metrics_store.record("RivalCorp", {
+            'monthly_active_users': users,
+            'monthly_recurring_revenue': revenue,
+            'churn_rate': churn
+        }, f"2025-{month:02d}-01")
+    analyzer.metrics_store.record("CompetitorY", {
+        'monthly_active_users': 52000,
+        'churn_rate': 2.1,
+        'net_promoter_score': 61
+    }, "2025-07-01")
+    
+    metrics_analysis = analyzer.track_competitor_metrics("RivalCorp", rival_metrics, "2025-07-01")
     print(metrics_analysis)
     
+    # Incremental reports only analyze items the store hasn't seen before
+    print("\n=== INCREMENTAL REPORT ===")
+    analyzer.generate_incremental_report(sample_intelligence)
+    analyzer.generate_incremental_report(sample_intelligence + [{
+        'source': 'Press Release',
+        'title': 'CompetitorX cuts prices by 20%',
+        'date': '2025-07-18',
+        'content': 'CompetitorX announced a 20% price cut across all SMB plans, effective immediately.'
+    }])
+    print(f"Report stats: {analyzer.last_report_stats}")
+    
     # Save intelligence report
     with open(f"competitive_intelligence_{datetime.now().strftime('%Y%m%d_%H%M')}.md", "w") as f:
         f.write(competitive_report)
@@ -0,0 +1,244 @@
+import argparse
+import json
+import os
+import re
+import sys
+import time
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from competitive_intelligence_analyzer import CompetitiveIntelligenceAnalyzer, IntelligenceStore, URGENCY_RANK
+from feed_ingestion import FeedFetcher, ingest_feeds, read_feed_list
+
+WORD_PATTERN = re.compile(r"[a-z0-9$%]+")
+# Words that make an otherwise familiar item worth a closer look
+MATERIAL_SIGNAL_PATTERN = re.compile(
+    r"\b(acqui\w*|merger|funding|raises?|series [a-e]|ipo|layoffs?|price (cut|increase)|pricing|"
+    r"launch\w*|partnership|breach|outage|lawsuit|recall|bankrupt\w*)\b",
+    re.IGNORECASE
+)
+
+def shingles(text, size=3):
+    """Hashed word n-grams of a text (a cheap local fingerprint, no model calls)."""
+    
+    words = WORD_PATTERN.findall(text.lower())
+    if len(words) < size:
+        return {zlib.crc32(" ".join(words).encode("utf-8"))} if words else set()
+    return {zlib.crc32(" ".join(words[i:i + size]).encode("utf-8")) for i in range(len(words) - size + 1)}
+
+class NoveltyIndex:
+    """
+    Inverted index of shingles of previously seen items.
+    
+    novelty() is one minus the largest fraction of a text's shingles that
+    any single seen item already contains, so a re-worded copy of a known
+    story scores near 0 and an unrelated story scores near 1.
+    """
+    
+    def __init__(self):
+        self.postings = {}
+        self.size = 0
+    
+    def add(self, text):
+        item_number = self.size
+        self.size += 1
+        for shingle in shingles(text):
+            self.postings.setdefault(shingle, []).append(item_number)
+    
+    def novelty(self, text):
+        fingerprint = shingles(text)
+        if not fingerprint:
+            return 0.0
+        overlap = {}
+        for shingle in fingerprint:
+            for item_number in self.postings.get(shingle, ()):
+                overlap[item_number] = overlap.get(item_number, 0) + 1
+        return 1.0 - (max(overlap.values()) / len(fingerprint) if overlap else 0.0)
+
+def item_text(item):
+    return f"{item.get('title', '')} {item.get('content', '')}"
+
+class CompetitiveWatch:
+    """
+    Long-running competitive watch.
+    
+    Each cycle ingests feeds into the analyzer's store (unchanged feeds cost
+    a 304), scores new items locally for novelty against everything seen
+    before, and only when an item is materially new analyzes it with the
+    model and raises an alert. Quiet cycles make no model calls. Material
+    items whose analysis fails are retried in the next cycle.
+    """
+    
+    def __init__(self, analyzer, feed_urls, fetcher=None, novelty_threshold=0.6,
+                 alerts_path="competitive_alerts.jsonl", on_alert=None, max_cycle_history=100):
+        """
+        Args:
+            analyzer (CompetitiveIntelligenceAnalyzer): Analyzer whose store receives items
+            feed_urls (list): Feeds to poll
+            fetcher (FeedFetcher): Feed fetcher (default: one without persisted state)
+            novelty_threshold (float): Minimum score (0-1) for an item to be analyzed
+            alerts_path (str): JSONL file alerts are appended to (None to disable)
+            on_alert (callable): Optional callback receiving each alert dict
+            max_cycle_history (int): Cycle summaries kept in self.cycles
+        """
+        
+        self.analyzer = analyzer
+        self.feed_urls = feed_urls
+        self.fetcher = fetcher or FeedFetcher()
+        self.novelty_threshold = novelty_threshold
+        self.alerts_path = alerts_path
+        self.on_alert = on_alert
+        self.cycles = deque(maxlen=max_cycle_history)
+        # Material items whose analysis failed, by id, with their novelty score
+        self.retry = {}
+        
+        # Everything already in the store counts as seen
+        self.index = NoveltyIndex()
+        for item in analyzer.store.all_items():
+            self.index.add(item_text(item))
+    
+    def score(self, item):
+        """Local materiality score: novelty, boosted when the item mentions a material event."""
+        
+        novelty = self.index.novelty(item_text(item))
+        if MATERIAL_SIGNAL_PATTERN.search(item_text(item)):
+            novelty = min(1.0, novelty * 1.25)
+        return round(novelty, 3)
+    
+    def run_once(self):
+        """Run one ingest/score/alert cycle and return its summary."""
+        
+        start = time.perf_counter()
+        ingestion = ingest_feeds(self.analyzer, self.feed_urls, self.fetcher)
+        
+        # Items whose analysis failed last cycle were already scored and indexed
+        retries = [(self.analyzer.store.get(item_id), score) for item_id, score in self.retry.items()]
+        material = [(item, score) for item, score in retries if item and item['analysis'] is None]
+        self.retry = {}
+        for item_id in ingestion['new_item_ids']:
+            item = self.analyzer.store.get(item_id)
+            score = self.score(item)
+            # Index each new item right away so repeats within a cycle are not novel
+            self.index.add(item_text(item))
+            if score >= self.novelty_threshold:
+                material.append((item, score))
+        
+        analyzed = []
+        analyses = []
+        if material:
+            with ThreadPoolExecutor(max_workers=self.analyzer.max_workers) as executor:
+                futures = {executor.submit(self.analyzer.analyze_item, item): (item, score) for item, score in material}
+                for future in as_completed(futures):
+                    item, score = futures[future]
+                    try:
+                        analysis = future.result()
+                    except Exception as e:
+                        print(f"⚠️ Analysis of '{item['title']}' failed, retrying next cycle: {type(e).__name__}: {e}")
+                        self.retry[item['id']] = score
+                        continue
+                    self.analyzer.store.set_analysis(item['id'], analysis)
+                    analyzed.append((item, score))
+                    analyses.append(analysis)
+            if analyzed:
+                self.analyzer.store.save()
+        alert = self._alert(analyzed, analyses) if analyzed else None
+        
+        summary = {
+            'cycle_started': datetime.now().isoformat(timespec='seconds'),
+            'feeds_fetched': ingestion['fetched'],
+            'feeds_not_modified': ingestion['not_modified'],
+            'feed_errors': len(ingestion['errors']),
+            'new_items': len(ingestion['new_item_ids']),
+            'material_items': len(material),
+            'model_calls': len(material),
+            'failed_analyses': len(self.retry),
+            'alerted': alert is not None,
+            'seconds': round(time.perf_counter() - start, 3)
+        }
+        self.cycles.append(summary)
+        return summary
+    
+    def _alert(self, material, analyses):
+        entries = sorted(
+            (
+                {
+                    'title': item['title'],
+                    'source': item['source'],
+                    'date': item['date'],
+                    'url': item.get('url'),
+                    'novelty': score,
+                    'urgency': analysis.get('urgency', 'Medium'),
+                    'competitor': analysis.get('competitor', 'Unknown'),
+                    'finding': analysis.get('finding', ''),
+                    'implication': analysis.get('implication', '')
+                }
+                for (item, score), analysis in zip(material, analyses)
+            ),
+            key=lambda entry: (URGENCY_RANK.get(entry['urgency'].lower(), 1), -entry['novelty'])
+        )
+        alert = {'timestamp': datetime.now().isoformat(timespec='seconds'), 'items': entries}
+        
+        print(f"\n🚨 COMPETITIVE ALERT: {len(entries)} new development(s)")
+        for entry in entries:
+            print(f"  [{entry['urgency']}] {entry['competitor']}: {entry['title']} (novelty {entry['novelty']:.2f})")
+            print(f"      {entry['finding']}")
+        
+        if self.alerts_path:
+            with open(self.alerts_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(alert, ensure_ascii=False) + "\n")
+        if self.on_alert:
+            self.on_alert(alert)
+        return alert
+    
+    def run_forever(self, interval_seconds=3600, max_cycles=None):
+        """Poll every interval_seconds until interrupted (or max_cycles cycles have run)."""
+        
+        cycle = 0
+        while max_cycles is None or cycle < max_cycles:
+            cycle += 1
+            try:
+                summary = self.run_once()
+            except Exception as e:
+                # A bad cycle (store, network, alert sink) must not stop the watch
+                print(f"[{datetime.now().isoformat(timespec='seconds')}] cycle {cycle} failed: {type(e).__name__}: {e}")
+            else:
+                status = "🚨 alert sent" if summary['alerted'] else "quiet"
+                print(f"[{summary['cycle_started']}] cycle {cycle}: {summary['new_items']} new, "
+                      f"{summary['material_items']} material, {summary['feeds_not_modified']} feeds unchanged - {status}")
+            if max_cycles is None or cycle < max_cycles:
+                time.sleep(interval_seconds)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Watch competitor feeds and alert on materially new developments.")
+    parser.add_argument("feeds", nargs="+", help="Feed URLs, or files listing one URL per line")
+    parser.add_argument("--store", default="intel_store.json", help="Intelligence item store (JSON)")
+    parser.add_argument("--state", default="feed_state.json", help="ETag/Last-Modified state (JSON)")
+    parser.add_argument("--alerts", default="competitive_alerts.jsonl", help="Where alerts are appended (JSONL)")
+    parser.add_argument("--interval", type=float, default=3600, help="Seconds between polls")
+    parser.add_argument("--threshold", type=float, default=0.6, help="Novelty score (0-1) that triggers analysis")
+    parser.add_argument("--once", action="store_true", help="Run a single cycle and exit")
+    args = parser.parse_args(argv)
+    
+    urls = []
+    for entry in args.feeds:
+        urls.extend(read_feed_list(entry) if os.path.isfile(entry) else [entry])
+    
+    watch = CompetitiveWatch(
+        CompetitiveIntelligenceAnalyzer(store=IntelligenceStore(args.store)),
+        urls,
+        FeedFetcher(args.state),
+        novelty_threshold=args.threshold,
+        alerts_path=args.alerts
+    )
+    print(f"👀 Watching {len(urls)} feed(s) every {args.interval:g}s (novelty threshold {args.threshold})")
+    try:
+        watch.run_forever(args.interval, max_cycles=1 if args.once else None)
+    except KeyboardInterrupt:
+        print("\n👋 Watch stopped.")
+    finally:
+        watch.fetcher.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,3 @@
-import google.generativeai as genai
 import os
 from dotenv import load_dotenv
 
@@ -7,22 +6,48 @@ load_dotenv()
 
 class GeminiConfig:
     def __init__(self):
+        # 'gemini' (default) talks to the API, 'fake' uses the offline stand-in
+        self.backend = os.getenv("GEMINI_BACKEND", "gemini").lower()
+        self.model_name = 'gemini-2.0-flash'
+        # Context caching requires an explicit model version
+        self.cache_model_name = 'models/gemini-2.0-flash-001'
+        self.embeddings_model = "models/text-embedding-004"
+        
+        if self.backend == "fake":
+            from fake_backend import FakeGenerativeModel
+            self.api_key = None
+            self.generative_model = FakeGenerativeModel(self.model_name)
+            return
+        
         self.api_key = os.getenv("GEMINI_API_KEY")
         if not self.api_key:
             raise ValueError("GEMINI_API_KEY not found in environment variables")
         
+        # Imported here so that startup (and the fake backend) doesn't pay for the SDK import
+        import google.generativeai as genai
+        
         # Configure the API
         genai.configure(api_key=self.api_key)
         
         # Initialize models
-        self.generative_model = genai.GenerativeModel('gemini-2.0-flash')
-        self.embeddings_model = "models/text-embedding-004"
+        self.generative_model = genai.GenerativeModel(self.model_name)
     
     def get_generative_model(self):
         return self.generative_model
     
     def get_embeddings_model(self):
         return self.embeddings_model
+    
+    def is_fake(self):
+        return self.backend == "fake"
+    
+    def embed_content(self, content, task_type="RETRIEVAL_DOCUMENT"):
+        """Embed text (or a list of texts) with the configured backend."""
+        if self.is_fake():
+            from fake_backend import fake_embed_content
+            return fake_embed_content(content)
+        import google.generativeai as genai
+        return genai.embed_content(model=self.embeddings_model, content=content, task_type=task_type)
 
 # Test the configuration
 if __name__ == "__main__":
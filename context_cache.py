@@ -0,0 +1,192 @@
+import hashlib
+import threading
+from datetime import datetime, timedelta
+from fake_backend import estimate_tokens
+
+CACHED_DOCUMENT_REFERENCE = "[The full document is provided in the cached context above.]"
+
+def document_key(document_text):
+    """Content hash used to key cached documents."""
+    return hashlib.sha256(document_text.encode("utf-8")).hexdigest()
+
+class LocalContextCache:
+    """
+    Local stand-in for Gemini context caching, for offline testing.
+    
+    Documents are registered once and referenced by key in later calls. The
+    document is prepended to the prompt locally, so responses match what the
+    model would see with a server-side cache, while the metrics report the
+    tokens that a real cache would have avoided re-sending.
+    """
+    
+    def __init__(self, model, ttl_minutes=60, min_tokens=4096):
+        self.model = model
+        self.ttl = timedelta(minutes=ttl_minutes)
+        self.min_tokens = min_tokens
+        self.entries = {}
+        self.metrics = {
+            'registrations': 0,
+            'reused_registrations': 0,
+            'failed_registrations': 0,
+            'expirations': 0,
+            'cached_calls': 0,
+            'tokens_uploaded': 0,
+            'tokens_read_from_cache': 0
+        }
+        # Keys whose cache entry is being created, so concurrent registrations wait for it
+        self.in_flight = {}
+        self._lock = threading.Lock()
+    
+    def register(self, document_text):
+        """
+        Register a document as cached context.
+        
+        Concurrent registrations of the same document create one cache entry.
+        If the entry cannot be created (quota, unsupported model, network) a
+        warning is printed and None is returned, so callers send the document
+        inline instead.
+        
+        Returns:
+            str: Cache key, or None if the document is too small to be worth caching
+                or caching failed
+        """
+        
+        tokens = estimate_tokens(document_text)
+        if tokens < self.min_tokens:
+            return None
+        
+        key = document_key(document_text)
+        while True:
+            with self._lock:
+                entry = self.entries.get(key)
+                if entry and entry['expires_at'] > datetime.now():
+                    self.metrics['reused_registrations'] += 1
+                    return key
+                creating = self.in_flight.get(key)
+                if creating is None:
+                    expired = self.entries.pop(key, None)
+                    if expired:
+                        self.metrics['expirations'] += 1
+                    self.in_flight[key] = threading.Event()
+                    break
+            # Another thread is creating this entry; use its result
+            creating.wait()
+        
+        if expired:
+            self._delete(expired['handle'])
+        try:
+            handle = self._create(document_text)
+        except Exception as e:
+            print(f"Warning: Could not create cached context, sending the document inline: {e}")
+            handle = None
+        
+        with self._lock:
+            if handle is None:
+                self.metrics['failed_registrations'] += 1
+            else:
+                self.entries[key] = {
+                    'handle': handle,
+                    'tokens': tokens,
+                    'expires_at': datetime.now() + self.ttl
+                }
+                self.metrics['registrations'] += 1
+                self.metrics['tokens_uploaded'] += tokens
+            self.in_flight.pop(key).set()
+        return key if handle is not None else None
+    
+    def lookup(self, document_text):
+        """Return the key of a registered, unexpired document or None."""
+        
+        key = document_key(document_text)
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry and entry['expires_at'] > datetime.now():
+                return key
+        return None
+    
+    def generate(self, key, prompt, **kwargs):
+        """Generate a response for a prompt that references the cached document."""
+        
+        with self._lock:
+            entry = self.entries[key]
+        response = self._generate(entry['handle'], prompt, **kwargs)
+        
+        usage = getattr(response, 'usage_metadata', None)
+        cached_tokens = getattr(usage, 'cached_content_token_count', 0) or entry['tokens']
+        with self._lock:
+            self.metrics['cached_calls'] += 1
+            self.metrics['tokens_read_from_cache'] += cached_tokens
+        return response
+    
+    def evict_expired(self):
+        """Drop expired entries and return how many were removed."""
+        
+        now = datetime.now()
+        with self._lock:
+            expired = [key for key, entry in self.entries.items() if entry['expires_at'] <= now]
+            for key in expired:
+                self._delete(self.entries.pop(key)['handle'])
+            self.metrics['expirations'] += len(expired)
+        return len(expired)
+    
+    def get_metrics(self):
+        """
+        Return cache metrics, including the estimated tokens saved.
+        
+        tokens_saved counts the document tokens that cached calls did not
+        re-send, minus the tokens uploaded to create the cache entries.
+        """
+        
+        with self._lock:
+            metrics = dict(self.metrics)
+            metrics['cached_documents'] = len(self.entries)
+        metrics['tokens_saved'] = metrics['tokens_read_from_cache'] - metrics['tokens_uploaded']
+        return metrics
+    
+    def _create(self, document_text):
+        return document_text
+    
+    def _generate(self, handle, prompt, **kwargs):
+        return self.model.generate_content(f"Document:\n{handle}\n\n{prompt}", **kwargs)
+    
+    def _delete(self, handle):
+        pass
+
+class GeminiContextCache(LocalContextCache):
+    """Context cache backed by Gemini's CachedContent API."""
+    
+    def __init__(self, model_name, ttl_minutes=60, min_tokens=4096):
+        super().__init__(None, ttl_minutes, min_tokens)
+        self.model_name = model_name
+    
+    def _create(self, document_text):
+        import google.generativeai as genai
+        from google.generativeai import caching
+        
+        cached_content = caching.CachedContent.create(
+            model=self.model_name,
+            display_name=f"business-document-{document_key(document_text)[:16]}",
+            system_instruction="You are a senior business analyst. The cached content is the business document under review.",
+            contents=[document_text],
+            ttl=self.ttl
+        )
+        return {
+            'cached_content': cached_content,
+            'model': genai.GenerativeModel.from_cached_content(cached_content=cached_content)
+        }
+    
+    def _generate(self, handle, prompt, **kwargs):
+        return handle['model'].generate_content(prompt, **kwargs)
+    
+    def _delete(self, handle):
+        try:
+            handle['cached_content'].delete()
+        except Exception as e:
+            print(f"Warning: Could not delete cached content: {e}")
+
+def create_context_cache(config, ttl_minutes=60, min_tokens=4096):
+    """Return the Gemini context cache, or the local stand-in for the fake backend."""
+    
+    if config.is_fake():
+        return LocalContextCache(config.get_generative_model(), ttl_minutes, min_tokens)
+    return GeminiContextCache(config.cache_model_name, ttl_minutes, min_tokens)
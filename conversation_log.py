@@ -0,0 +1,145 @@
+import gzip
+import json
+import os
+import threading
+import uuid
+from collections import deque
+from datetime import datetime
+
+class ConversationLog:
+    """
+    Conversation history with a bounded in-memory window and an on-disk log.
+    
+    Every entry is appended to a JSONL log file as it is added; only the most
+    recent entries are also kept in memory. Full-history readers such as export
+    iterate the log lazily instead of holding every output in RAM. An optional
+    on_append callback lets callers maintain counters on insert; it is also
+    called for each entry of an existing log that is continued, so the
+    counters cover the whole log.
+    """
+    
+    def __init__(self, path=None, max_in_memory=50, on_append=None):
+        if path is None:
+            os.makedirs("conversation_logs", exist_ok=True)
+            # pid and a random suffix keep sessions started in the same second apart
+            path = os.path.join(
+                "conversation_logs",
+                f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{os.getpid()}_{uuid.uuid4().hex[:6]}.jsonl"
+            )
+        self.path = path
+        self.on_append = on_append
+        self.recent_entries = deque(maxlen=max_in_memory)
+        self.total_entries = 0
+        self._lock = threading.Lock()
+        self._file = None
+        
+        # Continue an existing log: count its entries and reload the recent ones
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.total_entries = sum(1 for line in f)
+            if on_append:
+                # One pass rebuilds the caller's counters and the recent window
+                for entry in self.iter_entries():
+                    on_append(entry)
+                    self.recent_entries.append(entry)
+            else:
+                self.recent_entries.extend(self.iter_entries(max(0, self.total_entries - max_in_memory)))
+        
+        self._file = open(path, 'a', encoding='utf-8')
+    
+    def append(self, entry):
+        """Add an entry; 'timestamp' may be a datetime or an ISO string."""
+        
+        record = dict(entry)
+        if isinstance(record.get('timestamp'), datetime):
+            record['timestamp'] = record['timestamp'].isoformat()
+        line = json.dumps(record, ensure_ascii=False)
+        
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+            self.recent_entries.append(entry)
+            self.total_entries += 1
+        
+        if self.on_append:
+            self.on_append(entry)
+    
+    def recent(self, count=None):
+        """Return up to count of the most recent entries from memory."""
+        
+        with self._lock:
+            entries = list(self.recent_entries)
+        return entries if count is None else entries[-count:]
+    
+    def iter_lines(self, start=0):
+        """Lazily yield the raw JSON line of every logged entry from the given index onwards."""
+        
+        with self._lock:
+            if self._file:
+                self._file.flush()
+            total = self.total_entries
+        
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for index, line in enumerate(f):
+                if index >= total:
+                    break
+                if index >= start and line.strip():
+                    yield line.rstrip("\n")
+    
+    def iter_entries(self, start=0):
+        """
+        Lazily yield every logged entry from the given index onwards.
+        
+        Timestamps are converted back to datetime objects.
+        """
+        
+        for line in self.iter_lines(start):
+            entry = json.loads(line)
+            if entry.get('timestamp'):
+                entry['timestamp'] = datetime.fromisoformat(entry['timestamp'])
+            yield entry
+    
+    def export(self, path, fmt="jsonl", start=0, append=False, session_info=None):
+        """
+        Stream entries to a file without building the export in memory.
+        
+        Args:
+            path (str): Output file; gzip-compressed if it ends with '.gz'
+            fmt (str): 'jsonl' (one entry per line) or 'json' (session_info + list)
+            start (int): Index of the first entry to export (a checkpoint)
+            append (bool): Append to an existing JSONL file instead of overwriting it
+            session_info (dict): Header for the 'json' format
+        
+        Returns:
+            int: Index after the last exported entry, to use as the next checkpoint
+        """
+        
+        end = start
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, 'at' if append else 'wt', encoding='utf-8') as f:
+            if fmt == "json":
+                f.write('{\n  "session_info": ')
+                f.write(json.dumps(session_info or {}, ensure_ascii=False))
+                f.write(',\n  "conversation_history": [')
+                for i, line in enumerate(self.iter_lines(start)):
+                    f.write(("," if i else "") + "\n    " + line)
+                    end += 1
+                f.write("\n  ]\n}\n")
+            else:
+                for line in self.iter_lines(start):
+                    f.write(line + "\n")
+                    end += 1
+        return end
+    
+    def close(self):
+        with self._lock:
+            self._file.close()
+    
+    def __len__(self):
+        return self.total_entries
+    
+    def __bool__(self):
+        return self.total_entries > 0
+    
+    def __iter__(self):
+        return self.iter_entries()
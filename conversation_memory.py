@@ -0,0 +1,221 @@
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from fake_backend import estimate_tokens
+
+SUMMARY_HEADER = "Summary of earlier conversation:\n"
+RETRIEVED_HEADER = "Relevant earlier exchanges:\n"
+RECENT_HEADER = "Most recent exchanges:\n"
+SEPARATOR = "\n\n"
+
+def _cost(text):
+    """Tokens text adds to the joined context (estimates round down, so one more)."""
+    return estimate_tokens(text) + 1
+
+class ConversationMemory:
+    """
+    Token-budgeted memory for multi-turn conversations.
+    
+    The most recent turns are kept verbatim. Older turns are embedded for
+    retrieval and folded, a few at a time, into a rolling summary. Each request
+    gets the summary, the recent turns and the earlier turns most similar to
+    the new question, trimmed to a fixed token budget, so the per-request cost
+    stays flat however long the session runs. Embedding and summarizing run on
+    a background worker, so add_turn never waits for the model, and only the
+    newest max_archived_turns turns are kept for retrieval.
+    """
+    
+    def __init__(self, config, generate, token_budget=1500, recent_turns=4, summary_tokens=300,
+                 retrieved_turns=2, fold_every=4, max_archived_turns=200):
+        """
+        Args:
+            config (GeminiConfig): Used for embeddings
+            generate (callable): generate(prompt) -> text, used to update the summary
+            token_budget (int): Maximum tokens of context added to a request
+            recent_turns (int): Turns kept verbatim
+            summary_tokens (int): Target size of the rolling summary
+            retrieved_turns (int): Earlier turns retrieved by similarity
+            fold_every (int): Older turns folded into the summary per update
+            max_archived_turns (int): Older turns kept (embedded) for retrieval
+        """
+        
+        self.config = config
+        self.generate = generate
+        self.token_budget = token_budget
+        self.recent_turns = recent_turns
+        self.summary_tokens = summary_tokens
+        self.retrieved_turns = retrieved_turns
+        self.fold_every = fold_every
+        
+        self.turns = []
+        self.archive = deque(maxlen=max_archived_turns)
+        self.pending_fold = []
+        self.summary = ""
+        self._lock = threading.Lock()
+        # One worker keeps archiving and summary updates in order
+        self._worker = ThreadPoolExecutor(max_workers=1)
+        # Bumped by clear() so that background work started before it is discarded
+        self._generation = 0
+    
+    def add_turn(self, question, answer):
+        """Record a question/answer pair, compacting older turns when needed."""
+        
+        with self._lock:
+            self.turns.append({'question': question, 'answer': answer})
+            evicted = self.turns[:-self.recent_turns] if len(self.turns) > self.recent_turns else []
+            self.turns = self.turns[len(evicted):]
+            self.pending_fold.extend(evicted)
+            to_fold = []
+            if len(self.pending_fold) >= self.fold_every:
+                to_fold, self.pending_fold = self.pending_fold, []
+            generation = self._generation
+        
+        if evicted:
+            self._worker.submit(self._compact, evicted, to_fold, generation)
+    
+    def flush(self):
+        """Wait until background archiving and summary updates have finished."""
+        self._worker.submit(lambda: None).result()
+    
+    def _compact(self, evicted, to_fold, generation):
+        self._archive(evicted, generation)
+        if to_fold:
+            self._fold_into_summary(to_fold, generation)
+    
+    def _archive(self, turns, generation):
+        # Embed turns as they leave the verbatim window so they can be retrieved later
+        try:
+            embeddings = self.config.embed_content(
+                [self._format_turn(turn) for turn in turns],
+                task_type="RETRIEVAL_DOCUMENT"
+            )['embedding']
+        except Exception as e:
+            print(f"Warning: Could not embed conversation turns: {e}")
+            embeddings = [None] * len(turns)
+        
+        with self._lock:
+            if generation != self._generation:
+                return
+            for turn, embedding in zip(turns, embeddings):
+                self.archive.append({**turn, 'embedding': embedding})
+    
+    def _fold_into_summary(self, turns, generation):
+        exchanges = "\n\n".join(self._format_turn(turn) for turn in turns)
+        prompt = f"""
+        Update the running summary of a business consulting conversation with the new exchanges.
+        Keep facts, figures, decisions, the user's goals and open questions; drop pleasantries.
+        Respond with the updated summary only, in at most {self.summary_tokens * 3 // 4} words.
+        
+        Current summary:
+        {self.summary or "(none yet)"}
+        
+        New exchanges:
+        {exchanges}
+        """
+        try:
+            summary = self.generate(prompt).strip()
+        except Exception as e:
+            print(f"Warning: Could not update conversation summary: {e}")
+            return
+        
+        with self._lock:
+            if generation == self._generation:
+                self.summary = self._truncate(summary, self.summary_tokens)
+    
+    def build_context(self, query):
+        """
+        Return the conversation context for a new question, within the token budget.
+        
+        The rolling summary is added first (up to summary_tokens), then recent
+        turns newest first, while a quarter of the budget is held back for
+        earlier turns retrieved by similarity to the question.
+        """
+        
+        with self._lock:
+            recent = list(self.turns)
+            summary = self.summary
+            archive = [turn for turn in self.archive if turn['embedding'] is not None]
+        
+        # Section headers and separators are paid for out of the same budget
+        budget = self.token_budget
+        summary_block = ""
+        if summary:
+            room = min(self.summary_tokens, budget - _cost(SUMMARY_HEADER + SEPARATOR)) - 1
+            if room > 0:
+                summary_block = self._truncate(summary, room)
+                budget -= _cost(SUMMARY_HEADER + SEPARATOR) + _cost(summary_block)
+        
+        retrieval_reserve = budget // 4 if archive and self.retrieved_turns else 0
+        recent_budget = budget - retrieval_reserve - _cost(RECENT_HEADER + SEPARATOR)
+        recent_blocks = []
+        for turn in reversed(recent):
+            block = self._format_turn(turn)
+            if _cost(block + SEPARATOR) > recent_budget:
+                # Only the newest turn is ever cut short; older ones are dropped whole
+                if recent_blocks or recent_budget <= 2:
+                    break
+                block = self._truncate(block, recent_budget - 2)
+            recent_blocks.insert(0, block)
+            recent_budget -= _cost(block + SEPARATOR)
+        if not recent_blocks:
+            recent_budget += _cost(RECENT_HEADER + SEPARATOR)
+        budget = retrieval_reserve + max(recent_budget, 0) - _cost(RETRIEVED_HEADER + SEPARATOR)
+        
+        retrieved_blocks = []
+        if archive and budget > 0 and self.retrieved_turns:
+            for turn in self._retrieve(query, archive):
+                block = self._format_turn(turn)
+                if _cost(block + SEPARATOR) > budget:
+                    break
+                retrieved_blocks.append(block)
+                budget -= _cost(block + SEPARATOR)
+        
+        sections = []
+        if summary_block:
+            sections.append(SUMMARY_HEADER + summary_block)
+        if retrieved_blocks:
+            sections.append(RETRIEVED_HEADER + SEPARATOR.join(retrieved_blocks))
+        if recent_blocks:
+            sections.append(RECENT_HEADER + SEPARATOR.join(recent_blocks))
+        return SEPARATOR.join(sections)
+    
+    def _retrieve(self, query, archive):
+        try:
+            query_embedding = self.config.embed_content(query, task_type="RETRIEVAL_QUERY")['embedding']
+        except Exception as e:
+            print(f"Warning: Could not embed question for memory retrieval: {e}")
+            return []
+        
+        scored = [
+            (sum(a * b for a, b in zip(turn['embedding'], query_embedding)), turn)
+            for turn in archive
+        ]
+        scored.sort(key=lambda x: x[0], reverse=True)
+        return [turn for score, turn in scored[:self.retrieved_turns] if score > 0]
+    
+    def get_stats(self):
+        with self._lock:
+            return {
+                'recent_turns': len(self.turns),
+                'archived_turns': len(self.archive),
+                'summary_tokens': estimate_tokens(self.summary),
+                'token_budget': self.token_budget
+            }
+    
+    def clear(self):
+        with self._lock:
+            self.turns = []
+            self.archive.clear()
+            self.pending_fold = []
+            self.summary = ""
+            self._generation += 1
+    
+    @staticmethod
+    def _format_turn(turn):
+        return f"User: {turn['question']}\nAssistant: {turn['answer']}"
+    
+    @staticmethod
+    def _truncate(text, max_tokens):
+        # estimate_tokens counts about 4 characters per token; the marker fits inside the limit
+        max_chars = max_tokens * 4
+        return text if len(text) <= max_chars else text[:max_chars - 4].rsplit(" ", 1)[0] + " ..."
@@ -1,4 +1,3 @@
-import numpy as np
 from datetime import datetime
 import json
 from config import GeminiConfig
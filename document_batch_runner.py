@@ -0,0 +1,231 @@
+import argparse
+import fnmatch
+import glob
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+from business_document_analyzer import BusinessDocumentAnalyzer, split_into_sections, pre_extract_action_items
+
+DEFAULT_PATTERNS = ("*.txt", "*.md", "*.markdown")
+
+def iter_document_paths(inputs, patterns=DEFAULT_PATTERNS):
+    """
+    Yield (path, relative_name) for every matching file, lazily.
+    
+    Args:
+        inputs (list): Directories (walked recursively), files or glob patterns
+        patterns (tuple): Filename patterns to include when walking directories
+    """
+    
+    for item in inputs:
+        if os.path.isdir(item):
+            for root, dirs, files in os.walk(item):
+                dirs.sort()
+                for name in sorted(files):
+                    if any(fnmatch.fnmatch(name, pattern) for pattern in patterns):
+                        path = os.path.join(root, name)
+                        yield path, os.path.relpath(path, item)
+        elif os.path.isfile(item):
+            yield item, os.path.basename(item)
+        else:
+            for path in sorted(glob.iglob(item, recursive=True)):
+                if os.path.isfile(path):
+                    yield path, os.path.relpath(path)
+
+def prepare_document(path, max_section_chars=24000):
+    """Read a document and do the local CPU work (splitting, regex extraction)."""
+    
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        text = f.read()
+    
+    return {
+        'text': text,
+        'sections': split_into_sections(text, max_section_chars),
+        'candidates': pre_extract_action_items(text)
+    }
+
+def result_filename(relative_name, path):
+    """
+    Flatten a document path into a result file name.
+    
+    A short hash of the absolute path keeps names unique when several input
+    roots contain the same relative path (a/q1.txt and b/q1.txt).
+    """
+    
+    flat = relative_name.replace(os.sep, "__").replace("/", "__").replace("..", "_")
+    digest = hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()[:8]
+    return f"{flat}.{digest}.json"
+
+def run_bulk_analysis(inputs, output_dir, analysis_types=("comprehensive",), action_mode="llm",
+                      workers=4, processes=None, patterns=DEFAULT_PATTERNS, analyzer=None):
+    """
+    Analyze a corpus of documents and write one result file per document.
+    
+    Local work (reading, splitting, regex extraction) runs in a process pool and
+    model calls run in a thread pool. The number of documents in flight is
+    bounded so that large corpora are streamed rather than loaded up front.
+    
+    Args:
+        inputs (list): Directories, files or glob patterns
+        output_dir (str): Directory for per-document results and manifest.json
+        analysis_types (tuple): Analysis types passed to analyze_document
+        action_mode (str): 'llm', 'fast', 'hinted' or 'none' for action items
+        workers (int): Concurrent documents being analyzed by the model
+        processes (int): Process pool size for local work (default: CPU count)
+        patterns (tuple): Filename patterns to include when walking directories
+        analyzer (BusinessDocumentAnalyzer): Optional shared analyzer instance
+    
+    Returns:
+        dict: Run summary with throughput and failure counts
+    """
+    
+    os.makedirs(output_dir, exist_ok=True)
+    analyzer = analyzer or BusinessDocumentAnalyzer()
+    
+    documents = []
+    lock = threading.Condition()
+    in_flight = threading.BoundedSemaphore(workers * 2)
+    start_time = time.time()
+    
+    def record(entry):
+        with lock:
+            documents.append(entry)
+            done = len(documents)
+            lock.notify_all()
+        in_flight.release()
+        status = "✅" if entry['status'] == 'ok' else "❌"
+        print(f"{status} [{done}] {entry['document']} ({entry['duration_seconds']:.1f}s)")
+    
+    def analyze(path, relative_name, prepared, queued_at):
+        doc_start = time.time()
+        entry = {'document': relative_name, 'path': path}
+        try:
+            result = {
+                'document': relative_name,
+                'analyzed_at': datetime.now().isoformat(),
+                'characters': len(prepared['text']),
+                'sections': len(prepared['sections']),
+                'analyses': {}
+            }
+            for analysis_type in analysis_types:
+                result['analyses'][analysis_type] = analyzer.analyze_document(
+                    prepared['text'], analysis_type, sections=prepared['sections']
+                )
+            if action_mode != "none":
+                result['action_items'] = analyzer.extract_action_items(
+                    prepared['text'], mode=action_mode, candidates=prepared['candidates']
+                )
+            
+            output_path = os.path.join(output_dir, result_filename(relative_name, path))
+            with open(output_path, 'w', encoding='utf-8') as f:
+                json.dump(result, f, indent=2, ensure_ascii=False)
+            
+            entry.update({'status': 'ok', 'output': os.path.basename(output_path)})
+        except Exception as e:
+            entry.update({'status': 'failed', 'error': f"{type(e).__name__}: {e}"})
+        entry['duration_seconds'] = round(time.time() - doc_start, 3)
+        entry['queue_seconds'] = round(doc_start - queued_at, 3)
+        record(entry)
+    
+    with ProcessPoolExecutor(max_workers=processes) as process_pool, \
+            ThreadPoolExecutor(max_workers=workers) as thread_pool:
+        
+        def on_prepared(future, path, relative_name, queued_at):
+            try:
+                prepared = future.result()
+            except Exception as e:
+                record({
+                    'document': relative_name,
+                    'path': path,
+                    'status': 'failed',
+                    'error': f"{type(e).__name__}: {e}",
+                    'duration_seconds': 0.0,
+                    'queue_seconds': round(time.time() - queued_at, 3)
+                })
+                return
+            thread_pool.submit(analyze, path, relative_name, prepared, queued_at)
+        
+        submitted = 0
+        for path, relative_name in iter_document_paths(inputs, patterns):
+            in_flight.acquire()
+            queued_at = time.time()
+            future = process_pool.submit(prepare_document, path, analyzer.max_section_chars)
+            future.add_done_callback(
+                lambda f, p=path, r=relative_name, q=queued_at: on_prepared(f, p, r, q)
+            )
+            submitted += 1
+        
+        # Wait until every document has been recorded before the pools shut down
+        with lock:
+            lock.wait_for(lambda: len(documents) >= submitted)
+    
+    elapsed = time.time() - start_time
+    succeeded = [d for d in documents if d['status'] == 'ok']
+    failed = [d for d in documents if d['status'] != 'ok']
+    durations = sorted(d['duration_seconds'] for d in succeeded)
+    
+    summary = {
+        'started': datetime.fromtimestamp(start_time).isoformat(),
+        'elapsed_seconds': round(elapsed, 2),
+        'documents': len(documents),
+        'succeeded': len(succeeded),
+        'failed': len(failed),
+        'documents_per_minute': round(len(documents) / elapsed * 60, 2) if elapsed else 0.0,
+        'median_document_seconds': durations[len(durations) // 2] if durations else 0.0,
+        'analysis_types': list(analysis_types),
+        'action_mode': action_mode,
+        'workers': workers,
+        'processes': processes or os.cpu_count()
+    }
+    
+    with open(os.path.join(output_dir, "manifest.json"), 'w', encoding='utf-8') as f:
+        json.dump({
+            'summary': summary,
+            'documents': sorted(documents, key=lambda d: d['document'])
+        }, f, indent=2, ensure_ascii=False)
+    
+    return summary
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analyze a directory or glob of business documents.")
+    parser.add_argument("inputs", nargs="+", help="Directories, files or glob patterns")
+    parser.add_argument("-o", "--output-dir", default="analysis_results", help="Where to write results")
+    parser.add_argument("-t", "--types", nargs="+", default=["comprehensive"],
+                        choices=["comprehensive", "financial", "strategic", "operational"],
+                        help="Analysis types to run for every document")
+    parser.add_argument("--actions", default="llm", choices=["llm", "fast", "hinted", "none"],
+                        help="Action item extraction mode")
+    parser.add_argument("-w", "--workers", type=int, default=4, help="Concurrent documents in model calls")
+    parser.add_argument("-p", "--processes", type=int, default=None, help="Process pool size for local work")
+    parser.add_argument("--pattern", action="append", default=None,
+                        help="Filename pattern to include (repeatable, default: *.txt, *.md, *.markdown)")
+    args = parser.parse_args(argv)
+    
+    print(f"📂 Analyzing documents from: {', '.join(args.inputs)}")
+    summary = run_bulk_analysis(
+        args.inputs,
+        args.output_dir,
+        analysis_types=args.types,
+        action_mode=args.actions,
+        workers=args.workers,
+        processes=args.processes,
+        patterns=tuple(args.pattern) if args.pattern else DEFAULT_PATTERNS
+    )
+    
+    print("\n📊 BULK ANALYSIS SUMMARY")
+    print("-" * 40)
+    print(f"Documents: {summary['documents']} ({summary['succeeded']} succeeded, {summary['failed']} failed)")
+    print(f"Elapsed: {summary['elapsed_seconds']}s")
+    print(f"Throughput: {summary['documents_per_minute']} documents/min")
+    print(f"Median document time: {summary['median_document_seconds']}s")
+    print(f"Manifest: {os.path.join(args.output_dir, 'manifest.json')}")
+    
+    return 1 if summary['failed'] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
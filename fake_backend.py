@@ -0,0 +1,94 @@
+import hashlib
+import json
+import math
+import re
+
+def estimate_tokens(text):
+    """Rough token estimate (about 4 characters per token for English text)."""
+    return max(1, len(text) // 4) if text else 0
+
+class FakeUsageMetadata:
+    def __init__(self, prompt_token_count, candidates_token_count, cached_content_token_count=0):
+        self.prompt_token_count = prompt_token_count
+        self.candidates_token_count = candidates_token_count
+        self.cached_content_token_count = cached_content_token_count
+        self.total_token_count = prompt_token_count + candidates_token_count
+
+class FakePart:
+    def __init__(self, text):
+        self.text = text
+
+class FakeContent:
+    def __init__(self, text):
+        self.parts = [FakePart(text)]
+
+class FakeCandidate:
+    def __init__(self, text):
+        self.content = FakeContent(text)
+
+class FakeResponse:
+    def __init__(self, text, usage_metadata, candidate_texts=None):
+        self.text = text
+        self.usage_metadata = usage_metadata
+        self.candidates = [FakeCandidate(t) for t in (candidate_texts or [text])]
+
+class FakeStreamResponse(FakeResponse):
+    """Iterable response returned for stream=True, yielding the text word by word."""
+    
+    def __iter__(self):
+        words = self.text.split(" ")
+        for i, word in enumerate(words):
+            yield FakeResponse(word if i == 0 else " " + word, self.usage_metadata)
+
+class FakeGenerativeModel:
+    """
+    Offline stand-in for genai.GenerativeModel.
+    
+    Returns deterministic text derived from the prompt so that pipelines can be
+    exercised locally without an API key or network access.
+    """
+    
+    def __init__(self, model_name="fake-model"):
+        self.model_name = model_name
+    
+    def generate_content(self, prompt, stream=False, **kwargs):
+        lines = [line.strip() for line in str(prompt).splitlines() if line.strip()]
+        digest = hashlib.sha256(str(prompt).encode("utf-8")).hexdigest()[:8]
+        text = f"[{self.model_name} {digest}] {lines[0] if lines else ''}"
+        schema = (kwargs.get('generation_config') or {}).get('response_schema')
+        if schema and schema.get('properties'):
+            # Structured output: one string per requested property
+            text = json.dumps({name: f"{text} ({name})" for name in schema['properties']})
+        usage = FakeUsageMetadata(estimate_tokens(str(prompt)), estimate_tokens(text))
+        if stream:
+            return FakeStreamResponse(text, usage)
+        candidate_count = (kwargs.get('generation_config') or {}).get('candidate_count') or 1
+        if candidate_count > 1:
+            candidate_texts = [text] + [f"{text} (candidate {i + 1})" for i in range(1, candidate_count)]
+            return FakeResponse(text, usage, candidate_texts)
+        return FakeResponse(text, usage)
+    
+    def count_tokens(self, contents):
+        class TokenCount:
+            total_tokens = estimate_tokens(str(contents))
+        return TokenCount()
+
+def fake_embed_content(content, dimensions=256):
+    """
+    Deterministic bag-of-words embedding, normalized to unit length.
+    
+    Texts that share words get a positive dot product, which is enough for
+    semantic search code paths to behave sensibly offline.
+    """
+    
+    def embed(text):
+        vector = [0.0] * dimensions
+        for word in re.findall(r"[a-z0-9$]+", text.lower()):
+            index = int(hashlib.md5(word.encode("utf-8")).hexdigest(), 16) % dimensions
+            vector[index] += 1.0
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+    
+    if isinstance(content, (list, tuple)):
+        return {'embedding': [embed(text) for text in content]}
+    return {'embedding': embed(content)}
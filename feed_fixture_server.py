@@ -0,0 +1,206 @@
+import argparse
+import hashlib
+import json
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from xml.sax.saxutils import escape
+
+# Sample competitor items served by the fixture feeds
+FIXTURE_ITEMS = {
+    '/rivalcorp/rss.xml': [
+        {
+            'title': 'RivalCorp raises $25M Series B for AI expansion',
+            'date': '2025-07-15',
+            'content': 'RivalCorp announced a $25M Series B led by Venture Capital Partners to expand its AI capabilities and enter the European market.',
+            'url': 'https://rivalcorp.example/news/series-b'
+        },
+        {
+            'title': 'RivalCorp opens London office',
+            'date': '2025-07-08',
+            'content': 'RivalCorp opened its first European office in London and plans to hire 40 sales and support staff this year.',
+            'url': 'https://rivalcorp.example/news/london'
+        }
+    ],
+    '/competitorx/feed.json': [
+        {
+            'title': 'CompetitorX dashboard update',
+            'date': '2025-07-10',
+            'content': 'CompetitorX shipped a redesigned dashboard; early reviews praise the design but report slower performance.',
+            'url': 'https://competitorx.example/blog/dashboard'
+        }
+    ],
+    '/startupz/atom.xml': [
+        {
+            'title': 'StartupZ launches mobile-first platform',
+            'date': '2025-07-12',
+            'content': 'StartupZ launched a mobile-first platform for small business owners with voice controls and a 6-month free trial.',
+            'url': 'https://startupz.example/launch'
+        }
+    ]
+}
+
+def _rfc822(date_text):
+    return format_datetime(datetime.strptime(date_text, "%Y-%m-%d").replace(tzinfo=timezone.utc), usegmt=True)
+
+def render_feed(path, items):
+    """Render items as RSS, Atom or JSON Feed depending on the path's extension."""
+    
+    name = path.strip("/").split("/")[0]
+    if path.endswith(".json"):
+        return "application/feed+json", json.dumps({
+            'version': "https://jsonfeed.org/version/1.1",
+            'title': name,
+            'items': [
+                {
+                    'id': item['url'],
+                    'url': item['url'],
+                    'title': item['title'],
+                    'content_text': item['content'],
+                    'date_published': f"{item['date']}T00:00:00Z"
+                }
+                for item in items
+            ]
+        })
+    
+    if path.endswith("atom.xml"):
+        entries = "".join(
+            f"<entry><title>{escape(item['title'])}</title><link href=\"{escape(item['url'])}\"/>"
+            f"<id>{escape(item['url'])}</id><updated>{item['date']}T00:00:00Z</updated>"
+            f"<summary>{escape(item['content'])}</summary></entry>"
+            for item in items
+        )
+        return "application/atom+xml", (
+            f"<?xml version=\"1.0\" encoding=\"utf-8\"?>"
+            f"<feed xmlns=\"http://www.w3.org/2005/Atom\"><title>{escape(name)}</title>{entries}</feed>"
+        )
+    
+    entries = "".join(
+        f"<item><title>{escape(item['title'])}</title><link>{escape(item['url'])}</link>"
+        f"<pubDate>{_rfc822(item['date'])}</pubDate><description>{escape(item['content'])}</description></item>"
+        for item in items
+    )
+    return "application/rss+xml", (
+        f"<?xml version=\"1.0\" encoding=\"utf-8\"?>"
+        f"<rss version=\"2.0\"><channel><title>{escape(name)}</title>{entries}</channel></rss>"
+    )
+
+class FixtureFeeds:
+    """
+    Mutable set of feeds with ETag/Last-Modified bookkeeping and request counters.
+    
+    Responses can be slowed down by delay seconds, so that the peak number of
+    requests in flight at once ('max_in_flight') shows the client's concurrency.
+    """
+    
+    def __init__(self, items=None, delay=0.0):
+        self.items = {path: list(feed) for path, feed in (items or FIXTURE_ITEMS).items()}
+        self.modified = {path: datetime.now(timezone.utc).replace(microsecond=0) for path in self.items}
+        self.delay = delay
+        self.requests = {'total': 0, 'not_modified': 0, 'in_flight': 0, 'max_in_flight': 0}
+        self._lock = threading.Lock()
+    
+    def add_item(self, path, item):
+        """Publish a new item, which changes the feed's ETag and Last-Modified."""
+        
+        with self._lock:
+            self.items.setdefault(path, []).insert(0, item)
+            self.modified[path] = datetime.now(timezone.utc).replace(microsecond=0)
+    
+    def render(self, path):
+        with self._lock:
+            if path not in self.items:
+                return None
+            content_type, body = render_feed(path, self.items[path])
+            modified = self.modified[path]
+        body = body.encode("utf-8")
+        return content_type, body, f"\"{hashlib.sha1(body).hexdigest()}\"", modified
+
+def make_handler(feeds):
+    class FixtureFeedHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            with feeds._lock:
+                feeds.requests['total'] += 1
+                feeds.requests['in_flight'] += 1
+                feeds.requests['max_in_flight'] = max(feeds.requests['max_in_flight'], feeds.requests['in_flight'])
+            try:
+                if feeds.delay:
+                    time.sleep(feeds.delay)
+                self._respond()
+            finally:
+                with feeds._lock:
+                    feeds.requests['in_flight'] -= 1
+        
+        def _respond(self):
+            rendered = feeds.render(self.path.split("?", 1)[0])
+            if rendered is None:
+                self.send_error(404)
+                return
+            content_type, body, etag, modified = rendered
+            
+            # Conditional GET: If-None-Match takes precedence over If-Modified-Since
+            if_none_match = self.headers.get("If-None-Match")
+            if_modified_since = self.headers.get("If-Modified-Since")
+            not_modified = False
+            if if_none_match:
+                not_modified = etag in [tag.strip() for tag in if_none_match.split(",")]
+            elif if_modified_since:
+                try:
+                    not_modified = modified <= parsedate_to_datetime(if_modified_since)
+                except (TypeError, ValueError):
+                    pass
+            
+            if not_modified:
+                with feeds._lock:
+                    feeds.requests['not_modified'] += 1
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            
+            self.send_response(200)
+            self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", format_datetime(modified, usegmt=True))
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def log_message(self, format, *args):
+            pass
+    
+    return FixtureFeedHandler
+
+def start_fixture_server(host="127.0.0.1", port=0, feeds=None):
+    """
+    Serve fixture feeds from a background thread.
+    
+    Returns:
+        tuple: (server, feeds, base URL); call server.shutdown() to stop it
+    """
+    
+    feeds = feeds or FixtureFeeds()
+    server = ThreadingHTTPServer((host, port), make_handler(feeds))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, feeds, f"http://{host}:{server.server_address[1]}"
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve sample competitor RSS/Atom/JSON feeds locally.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    
+    server, feeds, base_url = start_fixture_server(args.host, args.port)
+    print(f"📡 Fixture feeds on {base_url}:")
+    for path in feeds.items:
+        print(f"   {base_url}{path}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+        print("\n👋 Fixture server stopped.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+import argparse
+import asyncio
+import json
+import os
+import re
+import sys
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+ATOM_NS = "{http://www.w3.org/2005/Atom}"
+HTML_TAG_PATTERN = re.compile(r"<[^>]+>")
+
+def _clean(text):
+    return " ".join(HTML_TAG_PATTERN.sub(" ", text or "").split())
+
+def _date(text):
+    """Normalize RFC 822 or ISO 8601 dates to YYYY-MM-DD, keeping unknown formats as-is."""
+    
+    text = (text or "").strip()
+    if not text:
+        return "N/A"
+    try:
+        return parsedate_to_datetime(text).date().isoformat()
+    except (TypeError, ValueError):
+        pass
+    try:
+        return datetime.fromisoformat(text.replace("Z", "+00:00")).date().isoformat()
+    except ValueError:
+        return text
+
+def parse_feed(body, url):
+    """
+    Parse an RSS 2.0, Atom or JSON feed into intelligence items.
+    
+    Args:
+        body (str): Feed document
+        url (str): Feed URL, used as the source name when the feed has no title
+    
+    Returns:
+        list: Dicts with 'source', 'title', 'date', 'content' and 'url'
+    """
+    
+    host = urlparse(url).netloc
+    stripped = body.lstrip()
+    
+    if stripped.startswith("{") or stripped.startswith("["):
+        data = json.loads(stripped)
+        # JSON Feed ({"title", "items": [...]}) or a plain list of items
+        entries = data.get('items', []) if isinstance(data, dict) else data
+        source = data.get('title', host) if isinstance(data, dict) else host
+        return [
+            {
+                'source': entry.get('source', source),
+                'title': entry.get('title', 'N/A'),
+                'date': _date(entry.get('date_published') or entry.get('date')),
+                'content': _clean(entry.get('content_text') or entry.get('content_html')
+                                  or entry.get('summary') or entry.get('content')),
+                'url': entry.get('url')
+            }
+            for entry in entries if isinstance(entry, dict)
+        ]
+    
+    root = ET.fromstring(stripped)
+    if root.tag == f"{ATOM_NS}feed":
+        source = root.findtext(f"{ATOM_NS}title") or host
+        items = []
+        for entry in root.iter(f"{ATOM_NS}entry"):
+            link = entry.find(f"{ATOM_NS}link")
+            items.append({
+                'source': source,
+                'title': _clean(entry.findtext(f"{ATOM_NS}title")) or 'N/A',
+                'date': _date(entry.findtext(f"{ATOM_NS}published") or entry.findtext(f"{ATOM_NS}updated")),
+                'content': _clean(entry.findtext(f"{ATOM_NS}summary") or entry.findtext(f"{ATOM_NS}content")),
+                'url': link.get("href") if link is not None else None
+            })
+        return items
+    
+    channel = root.find("channel")
+    source = (channel.findtext("title") if channel is not None else None) or host
+    return [
+        {
+            'source': source,
+            'title': _clean(item.findtext("title")) or 'N/A',
+            'date': _date(item.findtext("pubDate")),
+            'content': _clean(item.findtext("description")),
+            'url': item.findtext("link")
+        }
+        for item in root.iter("item")
+    ]
+
+class FeedFetcher:
+    """
+    Concurrent RSS/Atom/JSON feed fetcher with conditional GETs.
+    
+    Feeds are fetched from asyncio with a per-host concurrency limit. The
+    blocking HTTP calls run on a thread pool through one pooled requests
+    Session, so connections are reused across feeds on the same host. ETag and
+    Last-Modified validators are remembered per feed (and persisted when a
+    state path is given), so unchanged feeds cost a 304 with no body.
+    """
+    
+    def __init__(self, state_path=None, per_host_limit=2, max_connections=16, timeout=10):
+        self.state_path = state_path
+        self.per_host_limit = per_host_limit
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.state = {}
+        self.session = None
+        self.executor = ThreadPoolExecutor(max_workers=max_connections)
+        
+        if state_path and os.path.exists(state_path):
+            with open(state_path, 'r', encoding='utf-8') as f:
+                self.state = json.load(f)
+    
+    def _get_session(self):
+        if self.session is None:
+            # Imported here so that modules using the analyzer don't pay for it
+            import requests
+            from requests.adapters import HTTPAdapter
+            
+            self.session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=self.max_connections, pool_maxsize=self.per_host_limit)
+            self.session.mount("http://", adapter)
+            self.session.mount("https://", adapter)
+            self.session.headers["User-Agent"] = "business-nlp-feed-fetcher/1.0"
+        return self.session
+    
+    def _get(self, url, headers):
+        response = self._get_session().get(url, headers=headers, timeout=self.timeout)
+        return response.status_code, response.headers, response.content
+    
+    async def fetch(self, url, host_limits):
+        """Fetch and parse one feed; returns a result dict with 'status' and 'items'."""
+        
+        validators = self.state.get(url, {})
+        headers = {}
+        if validators.get('etag'):
+            headers["If-None-Match"] = validators['etag']
+        if validators.get('last_modified'):
+            headers["If-Modified-Since"] = validators['last_modified']
+        
+        start = time.perf_counter()
+        async with host_limits[urlparse(url).netloc]:
+            loop = asyncio.get_running_loop()
+            try:
+                status, response_headers, content = await loop.run_in_executor(
+                    self.executor, self._get, url, headers
+                )
+            except Exception as e:
+                return {'url': url, 'status': 'error', 'error': f"{type(e).__name__}: {e}", 'items': []}
+        result = {'url': url, 'http_status': status, 'seconds': round(time.perf_counter() - start, 3), 'items': []}
+        
+        if status == 304:
+            result['status'] = 'not_modified'
+            return result
+        if status != 200:
+            result.update({'status': 'error', 'error': f"HTTP {status}"})
+            return result
+        
+        try:
+            result['items'] = parse_feed(content.decode("utf-8", errors="replace"), url)
+        except (ET.ParseError, ValueError) as e:
+            result.update({'status': 'error', 'error': f"Unparseable feed: {e}"})
+            return result
+        
+        # Remembered by commit_state() once the items are safely stored
+        result['validators'] = {
+            'etag': response_headers.get("ETag"),
+            'last_modified': response_headers.get("Last-Modified"),
+            'fetched_at': datetime.now().isoformat()
+        }
+        result['status'] = 'ok'
+        return result
+    
+    async def fetch_all(self, urls):
+        """Fetch all feeds concurrently, at most per_host_limit at a time per host."""
+        
+        host_limits = {urlparse(url).netloc: asyncio.Semaphore(self.per_host_limit) for url in urls}
+        return await asyncio.gather(*(self.fetch(url, host_limits) for url in urls))
+    
+    def commit_state(self, results):
+        """
+        Remember the validators of successfully fetched feeds and persist them.
+        
+        Call this only after the fetched items are stored: once the validators
+        are saved, the next poll gets a 304 and the items are not served again.
+        """
+        
+        for result in results:
+            if result.get('validators'):
+                self.state[result['url']] = result['validators']
+        self.save_state()
+    
+    def save_state(self):
+        """Persist ETag/Last-Modified validators, if a state path was configured."""
+        
+        if not self.state_path:
+            return
+        # Write a temporary file and swap it in, so a crash never leaves truncated state
+        temp_path = self.state_path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(dict(self.state), f, indent=2)
+        os.replace(temp_path, self.state_path)
+    
+    def close(self):
+        if self.session is not None:
+            self.session.close()
+        self.executor.shutdown(wait=False)
+
+def ingest_feeds(analyzer, urls, fetcher):
+    """
+    Fetch feeds and add their items to the analyzer's item store.
+    
+    Returns:
+        dict: Summary with per-feed results and the ids of newly stored items
+    """
+    
+    start = time.perf_counter()
+    results = asyncio.run(fetcher.fetch_all(urls))
+    
+    items = [item for result in results for item in result['items']]
+    new_ids = analyzer.ingest_items(items)
+    # Only now that the items are stored may the feeds be skipped as unchanged
+    fetcher.commit_state(results)
+    
+    return {
+        'feeds': len(results),
+        'fetched': sum(1 for r in results if r['status'] == 'ok'),
+        'not_modified': sum(1 for r in results if r['status'] == 'not_modified'),
+        'errors': [{'url': r['url'], 'error': r['error']} for r in results if r['status'] == 'error'],
+        'items_seen': len(items),
+        'new_item_ids': new_ids,
+        'elapsed_seconds': round(time.perf_counter() - start, 3)
+    }
+
+def read_feed_list(path):
+    """Read feed URLs from a file, one per line; blank lines and '#' comments are skipped."""
+    
+    with open(path, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.strip().startswith("#")]
+
+def main(argv=None):
+    from competitive_intelligence_analyzer import CompetitiveIntelligenceAnalyzer, IntelligenceStore
+    
+    parser = argparse.ArgumentParser(description="Ingest competitor RSS/Atom/JSON feeds into the intelligence store.")
+    parser.add_argument("feeds", nargs="+", help="Feed URLs, or files listing one URL per line")
+    parser.add_argument("--store", default="intel_store.json", help="Intelligence item store (JSON)")
+    parser.add_argument("--state", default="feed_state.json", help="ETag/Last-Modified state (JSON)")
+    parser.add_argument("--per-host", type=int, default=2, help="Concurrent requests per host")
+    parser.add_argument("--analyze", action="store_true", help="Analyze newly stored items")
+    args = parser.parse_args(argv)
+    
+    urls = []
+    for entry in args.feeds:
+        urls.extend(read_feed_list(entry) if os.path.isfile(entry) else [entry])
+    
+    analyzer = CompetitiveIntelligenceAnalyzer(store=IntelligenceStore(args.store))
+    fetcher = FeedFetcher(args.state, per_host_limit=args.per_host)
+    try:
+        summary = ingest_feeds(analyzer, urls, fetcher)
+    finally:
+        fetcher.close()
+    
+    print(f"📡 Feeds: {summary['feeds']} ({summary['fetched']} fetched, {summary['not_modified']} not modified, "
+          f"{len(summary['errors'])} errors) in {summary['elapsed_seconds']}s")
+    print(f"🆕 New items: {len(summary['new_item_ids'])} of {summary['items_seen']} seen")
+    for error in summary['errors']:
+        print(f"❌ {error['url']}: {error['error']}")
+    
+    if args.analyze and summary['new_item_ids']:
+        print(f"🔍 Analyzed {analyzer.analyze_new_items()} new items")
+        for failure in analyzer.last_analysis_failures:
+            print(f"❌ {failure['title']}: {failure['error']} (will retry)")
+    
+    return 1 if summary['errors'] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,24 +1,97 @@
 import os
 import sys
 import json
+import time
+import hashlib
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from config import GeminiConfig
+from context_cache import create_context_cache, CACHED_DOCUMENT_REFERENCE
+from conversation_log import ConversationLog
+from conversation_memory import ConversationMemory
+from session_metrics import SessionMetrics
 from typing import Dict, List, Any
 import re
 from config import GeminiConfig
 
+# Features available to run_feature / run_batch
+BATCH_FEATURES = [
+    'marketing_copy',
+    'document_analysis',
+    'sentiment',
+    'kb_qa',
+    'business_report',
+    'competitive_intelligence',
+    'feature_comparison',
+    'business_assistant'
+]
+
+# Arguments each feature cannot run without ('sentiment' needs 'feedback' or 'feedback_items')
+REQUIRED_ARGS = {
+    'marketing_copy': ['product_name'],
+    'document_analysis': ['document_text'],
+    'sentiment': [],
+    'kb_qa': ['question'],
+    'business_report': ['metrics'],
+    'competitive_intelligence': ['items'],
+    'feature_comparison': ['our_product', 'competitor_product', 'features'],
+    'business_assistant': ['query']
+}
+
+# Features that search the knowledge base and so must wait for it
+KNOWLEDGE_BASE_FEATURES = {'kb_qa'}
+
+class FeatureArgumentError(ValueError):
+    """Raised by run_feature for an unknown feature or missing/invalid arguments (a client error)."""
+
 class IntelligentBusinessChatbot:
-    def __init__(self):
-        """Initialize the comprehensive business chatbot."""
+    def __init__(self, history_path=None, history_in_memory=50, autosave_path=None, autosave_every=5,
+                 kb_snapshot_path="knowledge_base_snapshot.json", memory_token_budget=1500):
+        """
+        Initialize the comprehensive business chatbot.
+        
+        Args:
+            history_path (str): JSONL log for the conversation history (default: a new session file)
+            history_in_memory (int): Number of recent interactions kept in memory
+            autosave_path (str): Optional JSONL(.gz) file that new interactions are appended to
+            autosave_every (int): Autosave after this many new interactions
+            kb_snapshot_path (str): Where knowledge base embeddings are persisted (None to disable)
+            memory_token_budget (int): Tokens of conversation context sent with assistant questions
+        """
         self.config = GeminiConfig()
         self.model = self.config.get_generative_model()
         self.embedding_model = self.config.get_embeddings_model()
         
-        # Initialize components
-        self.knowledge_base = self._initialize_knowledge_base()
-        self.conversation_history = []
+        # Initialize components; the knowledge base is loaded from its snapshot and
+        # refreshed in a background thread so the menu appears immediately
+        self.knowledge_base = []
+        self.knowledge_base_state = 'loading'
+        self.knowledge_base_ready = threading.Event()
+        self.kb_snapshot_path = kb_snapshot_path
+        self.last_kb_refresh = {}
+        self._kb_refresh_lock = threading.Lock()
+        self.refresh_knowledge_base()
+        self.context_cache = create_context_cache(self.config)
+        self.metrics = SessionMetrics()
+        self.conversation_history = ConversationLog(
+            history_path, history_in_memory,
+            on_append=lambda entry: self.metrics.record_interaction(entry['feature'])
+        )
+        self.assistant_memory = ConversationMemory(
+            self.config,
+            lambda prompt: self._generate('Conversation Memory', prompt),
+            token_budget=memory_token_budget
+        )
+        self.export_checkpoint = 0
+        self.autosave_path = autosave_path
+        self.autosave_every = autosave_every
+        self.autosave_checkpoint = 0
+        self._autosave_lock = threading.Lock()
         self.user_context = {}
         self.session_start = datetime.now()
+        self.last_response_timing = {}
         
         # Available features
         self.features = {
@@ -38,8 +111,13 @@ class IntelligentBusinessChatbot:
         print("📊 Combining NLP, Knowledge Management, and Business Intelligence")
         print("-" * 60)
     
-    def _initialize_knowledge_base(self):
-        """Initialize the knowledge base with sample business documents."""
+    def _initialize_knowledge_base(self, snapshot=None):
+        """
+        Initialize the knowledge base with sample business documents.
+        
+        Embeddings from a snapshot are reused for documents whose content and
+        embedding model are unchanged; only new or edited documents are embedded.
+        """
         
         # Sample business knowledge base
         business_docs = [
@@ -73,24 +151,215 @@ class IntelligentBusinessChatbot:
             }
         ]
         
-        # Create embeddings for knowledge base
+        reusable = {}
+        if snapshot and snapshot.get('embedding_model') == self.embedding_model:
+            reusable = {doc['id']: doc for doc in snapshot.get('documents', [])}
+        
         kb_data = []
+        pending = []
         for doc in business_docs:
+            doc['content_hash'] = hashlib.sha256(doc['content'].encode('utf-8')).hexdigest()
+            previous = reusable.get(doc['id'])
+            if previous and previous.get('content_hash') == doc['content_hash']:
+                doc['embedding'] = previous['embedding']
+                kb_data.append(doc)
+            else:
+                pending.append(doc)
+        
+        # Create embeddings for new or changed documents in one batched call
+        reused = len(kb_data)
+        if pending:
             try:
-                embedding = genai.embed_content(
-                    model=self.embedding_model,
-                    content=doc['content'],
+                embeddings = self.config.embed_content(
+                    [doc['content'] for doc in pending],
                     task_type="RETRIEVAL_DOCUMENT"
                 )['embedding']
                 
-                doc['embedding'] = embedding
-                kb_data.append(doc)
+                for doc, embedding in zip(pending, embeddings):
+                    doc['embedding'] = embedding
+                    kb_data.append(doc)
                 
             except Exception as e:
-                print(f"Warning: Could not create embedding for {doc['id']}: {e}")
+                print(f"Warning: Could not create embeddings for {', '.join(doc['id'] for doc in pending)}: {e}")
         
+        self.last_kb_refresh = {
+            'reused': reused,
+            'embedded': len(kb_data) - reused,
+            'failed': len(business_docs) - len(kb_data),
+            'finished_at': datetime.now().isoformat()
+        }
         return kb_data
     
+    def _load_knowledge_base_snapshot(self):
+        if not self.kb_snapshot_path or not os.path.exists(self.kb_snapshot_path):
+            return None
+        try:
+            with open(self.kb_snapshot_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Warning: Could not read knowledge base snapshot: {e}")
+            return None
+    
+    def _save_knowledge_base_snapshot(self, kb_data):
+        if not self.kb_snapshot_path:
+            return
+        temp_path = self.kb_snapshot_path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'embedding_model': self.embedding_model,
+                'saved_at': datetime.now().isoformat(),
+                'documents': kb_data
+            }, f, ensure_ascii=False)
+        os.replace(temp_path, self.kb_snapshot_path)
+    
+    def refresh_knowledge_base(self, force=False):
+        """
+        Start a background refresh of the knowledge base.
+        
+        The current documents (or the persisted snapshot, on startup) keep
+        answering questions until the refreshed embeddings are swapped in.
+        
+        Args:
+            force (bool): Re-embed every document instead of reusing the snapshot
+        
+        Returns:
+            bool: False if a refresh is already running
+        """
+        
+        if not self._kb_refresh_lock.acquire(blocking=False):
+            return False
+        threading.Thread(target=self._warm_up_knowledge_base, args=(force,), daemon=True).start()
+        return True
+    
+    def _warm_up_knowledge_base(self, force=False):
+        try:
+            snapshot = self._load_knowledge_base_snapshot()
+            if snapshot and snapshot.get('documents') and not self.knowledge_base_ready.is_set() \
+                    and snapshot.get('embedding_model') == self.embedding_model:
+                # Serve the snapshot right away; the refresh below swaps in any changes
+                self.knowledge_base = snapshot['documents']
+                self.knowledge_base_ready.set()
+            self.knowledge_base_state = 'refreshing' if self.knowledge_base_ready.is_set() else 'loading'
+            
+            kb_data = self._initialize_knowledge_base(None if force else snapshot)
+            if not kb_data:
+                raise RuntimeError("no knowledge base documents could be embedded")
+            self.knowledge_base = kb_data
+            # A partial snapshot would be served as complete on the next start
+            if not self.last_kb_refresh['failed'] and (self.last_kb_refresh['embedded'] or snapshot is None):
+                self._save_knowledge_base_snapshot(kb_data)
+            self.knowledge_base_state = 'ready'
+        except Exception as e:
+            print(f"Warning: Knowledge base warm-up failed: {e}")
+            self.knowledge_base_state = 'ready' if self.knowledge_base else 'failed'
+        finally:
+            self.knowledge_base_ready.set()
+            self._kb_refresh_lock.release()
+    
+    def knowledge_base_status(self):
+        """Return the knowledge base readiness state and last refresh details."""
+        
+        return {
+            'state': self.knowledge_base_state,
+            'documents': len(self.knowledge_base),
+            'snapshot': self.kb_snapshot_path,
+            'last_refresh': self.last_kb_refresh
+        }
+    
+    def wait_for_knowledge_base(self, timeout=None):
+        """Block until knowledge base documents are available (a loaded snapshot counts)."""
+        
+        if not self.knowledge_base_ready.is_set():
+            print("⏳ Waiting for the knowledge base to finish loading...")
+        return self.knowledge_base_ready.wait(timeout)
+    
+    def _call_model(self, prompt, cache_key=None, **kwargs):
+        """Send a prompt to the model, through the context cache when a key is given."""
+        
+        if cache_key:
+            return self.context_cache.generate(cache_key, prompt, **kwargs)
+        return self.model.generate_content(prompt, **kwargs)
+    
+    def _record_call(self, feature, start, response=None, cache_key=None, time_to_first_token=None):
+        """Record latency, token usage, cache use and errors for one model call."""
+        
+        usage = getattr(response, 'usage_metadata', None)
+        self.metrics.record_call(
+            feature,
+            time.perf_counter() - start,
+            usage=usage,
+            cache_hit=bool(cache_key) or bool(getattr(usage, 'cached_content_token_count', 0)),
+            error=response is None,
+            time_to_first_token=time_to_first_token
+        )
+    
+    def _generate(self, feature, prompt, cache_key=None):
+        """Generate a complete response, recording call metrics under the feature name."""
+        
+        start = time.perf_counter()
+        try:
+            response = self._call_model(prompt, cache_key)
+            text = response.text
+        except Exception:
+            self._record_call(feature, start, cache_key=cache_key)
+            raise
+        self._record_call(feature, start, response, cache_key)
+        return text
+    
+    def _stream_response(self, feature, prompt, cache_key=None):
+        """
+        Stream a response to the terminal as it is generated.
+        
+        Prints each chunk as soon as it arrives, reports time to first token,
+        records call metrics and returns the full text for the conversation history.
+        If the stream breaks off (an error or Ctrl-C) after some text arrived,
+        the partial text is returned, marked as interrupted.
+        
+        Args:
+            feature (str): Feature name the call is recorded under
+            prompt (str): The prompt to send
+            cache_key (str): Optional context cache key for a cached document
+        """
+        
+        start = time.perf_counter()
+        chunks = []
+        first_token = None
+        try:
+            response = self._call_model(prompt, cache_key, stream=True)
+            for chunk in response:
+                try:
+                    text = chunk.text
+                except ValueError:
+                    # Chunks without text parts (e.g. the final finish-reason chunk)
+                    continue
+                if first_token is None:
+                    first_token = time.perf_counter() - start
+                print(text, end="", flush=True)
+                chunks.append(text)
+            print()
+        except (Exception, KeyboardInterrupt) as e:
+            self._record_call(feature, start, cache_key=cache_key, time_to_first_token=first_token)
+            if not chunks:
+                raise
+            # The partial answer is already on screen; keep it for the history too
+            print(f"\n⚠️ Response interrupted ({type(e).__name__}), keeping the partial answer")
+            self.last_response_timing = {
+                'time_to_first_token': first_token,
+                'total_time': time.perf_counter() - start,
+                'interrupted': True
+            }
+            return "".join(chunks) + "\n[response interrupted]"
+        
+        total = time.perf_counter() - start
+        self.last_response_timing = {
+            'time_to_first_token': first_token if first_token is not None else total,
+            'total_time': total
+        }
+        self._record_call(feature, start, response, cache_key, self.last_response_timing['time_to_first_token'])
+        print(f"⚡ First token: {self.last_response_timing['time_to_first_token']:.2f}s | Total: {total:.2f}s")
+        
+        return "".join(chunks)
+    
     def display_menu(self):
         """Display the main menu."""
         print("\n" + "="*60)
@@ -101,20 +370,23 @@ class IntelligentBusinessChatbot:
         for key, value in self.features.items():
             print(f"  {key}. {value}")
         
+        if self.knowledge_base_state != 'ready':
+            print(f"\n📚 Knowledge base: {self.knowledge_base_state}...")
+        
         print("\n💡 Tip: Type 'help' anytime for guidance")
         print("-" * 60)
     
     def search_knowledge_base(self, query: str, top_k: int = 3) -> List[Dict]:
         """Search the knowledge base for relevant documents."""
         
+        self.wait_for_knowledge_base()
         if not self.knowledge_base:
             return []
         
         try:
             # Generate query embedding
-            query_embedding = genai.embed_content(
-                model=self.embedding_model,
-                content=query,
+            query_embedding = self.config.embed_content(
+                query,
                 task_type="RETRIEVAL_QUERY"
             )['embedding']
             
@@ -132,6 +404,277 @@ class IntelligentBusinessChatbot:
             print(f"Error searching knowledge base: {e}")
             return []
     
+    def _marketing_copy_prompt(self, product_name, features, target_audience, value_proposition, copy_type):
+        """Build the marketing copy prompt."""
+        
+        return f"""
+        Generate compelling {copy_type} marketing copy for:
+        
+        Product: {product_name}
+        Features: {', '.join(features) if features else 'N/A'}
+        Target Audience: {target_audience or 'General audience'}
+        Value Proposition: {value_proposition or 'N/A'}
+        
+        Requirements:
+        - Professional and engaging tone
+        - Clear call-to-action
+        - Focus on benefits over features
+        - Appropriate length for {copy_type}
+        - Include emotional triggers
+        
+        Generate effective marketing copy:
+        """
+    
+    def _document_analysis_prompt(self, document_block, analysis_type):
+        """Build the document analysis prompt for an analysis type."""
+        
+        # Generate analysis prompt based on type
+        if analysis_type == 'executive_summary':
+            return f"""
+            Create a concise executive summary of this document:
+            
+            {document_block}
+            
+            Focus on:
+            - Key decisions made
+            - Important metrics or results
+            - Strategic implications
+            - Next steps
+            
+            Keep it under 150 words suitable for senior executives.
+            """
+        
+        elif analysis_type == 'action_items':
+            return f"""
+            Extract all action items and next steps from this document:
+            
+            {document_block}
+            
+            For each action item, identify:
+            - Specific task
+            - Responsible party (if mentioned)
+            - Deadline (if mentioned)
+            - Priority level
+            
+            Format as a numbered list.
+            """
+        
+        elif analysis_type == 'financial':
+            return f"""
+            Analyze this document for financial information and implications:
+            
+            {document_block}
+            
+            Focus on:
+            - Revenue and cost metrics
+            - Budget implications
+            - Financial risks and opportunities
+            - ROI considerations
+            
+            Provide specific financial insights.
+            """
+        
+        elif analysis_type == 'strategic':
+            return f"""
+            Analyze this document for strategic business insights:
+            
+            {document_block}
+            
+            Focus on:
+            - Competitive implications
+            - Market opportunities
+            - Strategic risks
+            - Long-term business impact
+            
+            Provide strategic recommendations.
+            """
+        
+        else:  # comprehensive
+            return f"""
+            Provide comprehensive analysis of this business document:
+            
+            {document_block}
+            
+            Include:
+            1. Executive Summary
+            2. Key Findings
+            3. Action Items
+            4. Business Implications
+            5. Recommendations
+            
+            Structure the analysis for business stakeholders.
+            """
+    
+    def _sentiment_prompt(self, feedback):
+        """Build the single-feedback sentiment prompt."""
+        
+        return f"""
+        Analyze the sentiment and business implications of this customer feedback:
+        
+        Feedback: "{feedback}"
+        
+        Provide:
+        1. Overall Sentiment (positive/negative/neutral)
+        2. Emotional Tone
+        3. Specific Issues or Highlights
+        4. Business Impact Assessment
+        5. Recommended Response Strategy
+        6. Urgency Level (low/medium/high)
+        
+        Format for business action.
+        """
+    
+    def _batch_sentiment_prompt(self, feedback_items):
+        """Build the multi-feedback sentiment prompt."""
+        
+        combined_feedback = "\n".join([f"{i+1}. {item}" for i, item in enumerate(feedback_items)])
+        
+        return f"""
+        Analyze sentiment for multiple customer feedback items:
+        
+        {combined_feedback}
+        
+        Provide:
+        1. Individual sentiment analysis for each item
+        2. Overall sentiment distribution
+        3. Common themes and issues
+        4. Priority items requiring immediate attention
+        5. Actionable insights for customer success team
+        
+        Format for business dashboard.
+        """
+    
+    def _knowledge_base_prompt(self, question, relevant_docs):
+        """Build the knowledge base answer prompt from retrieved documents."""
+        
+        context = ""
+        for doc in relevant_docs:
+            context += f"Document: {doc['title']} (ID: {doc['id']})\n{doc['content']}\n\n"
+        
+        return f"""
+        Answer this business question using the provided knowledge base context:
+        
+        Question: {question}
+        
+        Context:
+        {context}
+        
+        Instructions:
+        - Provide a clear, accurate answer based on the context
+        - Reference specific policies or procedures
+        - Include document IDs for verification
+        - If information is incomplete, state what additional details are needed
+        
+        Answer:
+        """
+    
+    def _business_report_prompt(self, report_type, metrics):
+        """Build the business report prompt from collected metrics."""
+        
+        return f"""
+        Generate a comprehensive {report_type} business report using these metrics:
+        
+        {json.dumps(metrics, indent=2)}
+        
+        Structure the report with:
+        1. Executive Summary (2-3 sentences)
+        2. Key Performance Highlights
+        3. Areas of Concern
+        4. Trend Analysis (if applicable)
+        5. Strategic Recommendations
+        6. Action Items for Next Period
+        
+        Use professional business language suitable for stakeholders.
+        Include specific insights and actionable recommendations.
+        """
+    
+    def _competitive_intelligence_prompt(self, competitor_info):
+        """Build the competitive intelligence prompt."""
+        
+        # Combine all intelligence
+        combined_intel = ""
+        for item in competitor_info:
+            combined_intel += f"Source: {item['source']}\nTitle: {item['title']}\nContent: {item['content']}\n\n"
+        
+        return f"""
+        Analyze this competitive intelligence for strategic insights:
+        
+        {combined_intel}
+        
+        Provide analysis on:
+        1. COMPETITIVE THREATS
+        - New capabilities or advantages
+        - Market expansion moves
+        - Strategic partnerships
+        
+        2. MARKET OPPORTUNITIES
+        - Gaps in competitor offerings
+        - Customer pain points
+        - Underserved segments
+        
+        3. STRATEGIC RECOMMENDATIONS
+        - Immediate response actions
+        - Long-term strategic adjustments
+        - Product development priorities
+        
+        4. MONITORING PRIORITIES
+        - Key areas to watch
+        - Metrics to track
+        - Early warning signals
+        
+        Focus on actionable business intelligence.
+        """
+    
+    def _feature_comparison_prompt(self, our_product, competitor_product, features):
+        """Build the competitor feature comparison prompt."""
+        
+        features_text = ""
+        for f in features:
+            features_text += f"Feature: {f['feature']}\nOur capability: {f['our_capability']}\nTheir capability: {f['their_capability']}\n\n"
+        
+        return f"""
+        Compare features between our product and competitor:
+        
+        Our Product: {our_product}
+        Competitor: {competitor_product}
+        
+        Feature Comparison:
+        {features_text}
+        
+        Provide:
+        1. Feature-by-feature analysis
+        2. Our competitive advantages
+        3. Areas where we're behind
+        4. Strategic recommendations
+        5. Product development priorities
+        
+        Focus on competitive positioning and strategy.
+        """
+    
+    def _business_assistant_prompt(self, query, conversation_context=""):
+        """Build the general business assistant prompt, with optional conversation context."""
+        
+        if conversation_context:
+            conversation_context = f"""
+        Conversation so far (use it to resolve references and stay consistent):
+        {conversation_context}
+        """
+        
+        return f"""
+        You are a senior business consultant and strategist. Answer this business question with expert insight:
+        {conversation_context}
+        Question: {query}
+        
+        Provide:
+        - Clear, actionable answer
+        - Relevant business context
+        - Best practices and frameworks
+        - Potential risks and considerations
+        - Next steps or recommendations
+        
+        Use professional business language and provide specific, implementable advice.
+        """
+    
     def generate_marketing_copy(self):
         """Interactive marketing copy generation."""
         
@@ -175,30 +718,12 @@ class IntelligentBusinessChatbot:
         # Generate copy
         print("\n⏳ Generating marketing copy...")
         
-        prompt = f"""
-        Generate compelling {copy_type} marketing copy for:
-        
-        Product: {product_name}
-        Features: {', '.join(features) if features else 'N/A'}
-        Target Audience: {target_audience or 'General audience'}
-        Value Proposition: {value_proposition or 'N/A'}
-        
-        Requirements:
-        - Professional and engaging tone
-        - Clear call-to-action
-        - Focus on benefits over features
-        - Appropriate length for {copy_type}
-        - Include emotional triggers
-        
-        Generate effective marketing copy:
-        """
+        prompt = self._marketing_copy_prompt(product_name, features, target_audience, value_proposition, copy_type)
         
         try:
-            response = self.model.generate_content(prompt)
-            
             print("\n✅ GENERATED MARKETING COPY")
             print("=" * 50)
-            print(response.text)
+            response_text = self._stream_response('Marketing Copy Generation', prompt)
             print("=" * 50)
             
             # Save to conversation history
@@ -206,7 +731,7 @@ class IntelligentBusinessChatbot:
                 'timestamp': datetime.now(),
                 'feature': 'Marketing Copy Generation',
                 'input': f"Product: {product_name}, Type: {copy_type}",
-                'output': response.text
+                'output': response_text
             })
             
         except Exception as e:
@@ -257,89 +782,17 @@ class IntelligentBusinessChatbot:
         
         print(f"\n⏳ Performing {analysis_type} analysis...")
         
-        # Generate analysis prompt based on type
-        if analysis_type == 'executive_summary':
-            prompt = f"""
-            Create a concise executive summary of this document:
-            
-            {document_text}
-            
-            Focus on:
-            - Key decisions made
-            - Important metrics or results
-            - Strategic implications
-            - Next steps
-            
-            Keep it under 150 words suitable for senior executives.
-            """
+        # Large documents are cached by content hash, so re-analyzing the same
+        # document with another analysis type references it instead of re-sending it
+        cache_key = self.context_cache.register(document_text)
+        document_block = CACHED_DOCUMENT_REFERENCE if cache_key else document_text
         
-        elif analysis_type == 'action_items':
-            prompt = f"""
-            Extract all action items and next steps from this document:
-            
-            {document_text}
-            
-            For each action item, identify:
-            - Specific task
-            - Responsible party (if mentioned)
-            - Deadline (if mentioned)
-            - Priority level
-            
-            Format as a numbered list.
-            """
-        
-        elif analysis_type == 'financial':
-            prompt = f"""
-            Analyze this document for financial information and implications:
-            
-            {document_text}
-            
-            Focus on:
-            - Revenue and cost metrics
-            - Budget implications
-            - Financial risks and opportunities
-            - ROI considerations
-            
-            Provide specific financial insights.
-            """
-        
-        elif analysis_type == 'strategic':
-            prompt = f"""
-            Analyze this document for strategic business insights:
-            
-            {document_text}
-            
-            Focus on:
-            - Competitive implications
-            - Market opportunities
-            - Strategic risks
-            - Long-term business impact
-            
-            Provide strategic recommendations.
-            """
-        
-        else:  # comprehensive
-            prompt = f"""
-            Provide comprehensive analysis of this business document:
-            
-            {document_text}
-            
-            Include:
-            1. Executive Summary
-            2. Key Findings
-            3. Action Items
-            4. Business Implications
-            5. Recommendations
-            
-            Structure the analysis for business stakeholders.
-            """
+        prompt = self._document_analysis_prompt(document_block, analysis_type)
         
         try:
-            response = self.model.generate_content(prompt)
-            
             print(f"\n✅ DOCUMENT ANALYSIS - {analysis_type.upper()}")
             print("=" * 60)
-            print(response.text)
+            response_text = self._stream_response('Document Analysis', prompt, cache_key)
             print("=" * 60)
             
             # Save to conversation history
@@ -347,7 +800,7 @@ class IntelligentBusinessChatbot:
                 'timestamp': datetime.now(),
                 'feature': 'Document Analysis',
                 'input': f"Document length: {len(document_text)} chars, Analysis: {analysis_type}",
-                'output': response.text
+                'output': response_text
             })
             
         except Exception as e:
@@ -374,28 +827,12 @@ class IntelligentBusinessChatbot:
             
             print("\n⏳ Analyzing sentiment...")
             
-            prompt = f"""
-            Analyze the sentiment and business implications of this customer feedback:
-            
-            Feedback: "{feedback}"
-            
-            Provide:
-            1. Overall Sentiment (positive/negative/neutral)
-            2. Emotional Tone
-            3. Specific Issues or Highlights
-            4. Business Impact Assessment
-            5. Recommended Response Strategy
-            6. Urgency Level (low/medium/high)
-            
-            Format for business action.
-            """
+            prompt = self._sentiment_prompt(feedback)
             
             try:
-                response = self.model.generate_content(prompt)
-                
                 print("\n✅ SENTIMENT ANALYSIS RESULT")
                 print("=" * 50)
-                print(response.text)
+                response_text = self._stream_response('Sentiment Analysis', prompt)
                 print("=" * 50)
                 
             except Exception as e:
@@ -419,29 +856,12 @@ class IntelligentBusinessChatbot:
             
             print(f"\n⏳ Analyzing {len(feedback_items)} feedback items...")
             
-            combined_feedback = "\n".join([f"{i+1}. {item}" for i, item in enumerate(feedback_items)])
-            
-            prompt = f"""
-            Analyze sentiment for multiple customer feedback items:
-            
-            {combined_feedback}
-            
-            Provide:
-            1. Individual sentiment analysis for each item
-            2. Overall sentiment distribution
-            3. Common themes and issues
-            4. Priority items requiring immediate attention
-            5. Actionable insights for customer success team
-            
-            Format for business dashboard.
-            """
+            prompt = self._batch_sentiment_prompt(feedback_items)
             
             try:
-                response = self.model.generate_content(prompt)
-                
                 print("\n✅ BATCH SENTIMENT ANALYSIS")
                 print("=" * 50)
-                print(response.text)
+                response_text = self._stream_response('Sentiment Analysis', prompt)
                 print("=" * 50)
                 
             except Exception as e:
@@ -452,7 +872,7 @@ class IntelligentBusinessChatbot:
             'timestamp': datetime.now(),
             'feature': 'Sentiment Analysis',
             'input': f"Mode: {mode_choice}, Items: {len(feedback_items) if mode_choice == '2' else 1}",
-            'output': response.text if 'response' in locals() else 'Error occurred'
+            'output': response_text if 'response_text' in locals() else 'Error occurred'
         })
     
     def knowledge_base_qa(self):
@@ -473,42 +893,26 @@ class IntelligentBusinessChatbot:
                 continue
             
             print("⏳ Searching knowledge base...")
+            if self.knowledge_base_state == 'refreshing':
+                print("ℹ️  Answering from the saved snapshot while the knowledge base refreshes")
             
             # Search knowledge base
             relevant_docs = self.search_knowledge_base(question, top_k=3)
             
+            if not self.knowledge_base:
+                print(f"❌ Knowledge base is unavailable ({self.knowledge_base_state}).")
+                break
             if not relevant_docs:
                 print("❌ No relevant information found in knowledge base.")
                 continue
             
             # Generate contextual answer
-            context = ""
-            for doc in relevant_docs:
-                context += f"Document: {doc['title']} (ID: {doc['id']})\n{doc['content']}\n\n"
-            
-            prompt = f"""
-            Answer this business question using the provided knowledge base context:
-            
-            Question: {question}
-            
-            Context:
-            {context}
-            
-            Instructions:
-            - Provide a clear, accurate answer based on the context
-            - Reference specific policies or procedures
-            - Include document IDs for verification
-            - If information is incomplete, state what additional details are needed
-            
-            Answer:
-            """
+            prompt = self._knowledge_base_prompt(question, relevant_docs)
             
             try:
-                response = self.model.generate_content(prompt)
-                
                 print("\n✅ KNOWLEDGE BASE ANSWER")
                 print("=" * 50)
-                print(response.text)
+                response_text = self._stream_response('Knowledge Base Q&A', prompt)
                 print("\n📚 Sources:")
                 for doc in relevant_docs:
                     print(f"  - {doc['title']} (ID: {doc['id']}) - Relevance: {doc['similarity']:.3f}")
@@ -519,7 +923,7 @@ class IntelligentBusinessChatbot:
                     'timestamp': datetime.now(),
                     'feature': 'Knowledge Base Q&A',
                     'input': question,
-                    'output': response.text
+                    'output': response_text
                 })
                 
             except Exception as e:
@@ -613,29 +1017,12 @@ class IntelligentBusinessChatbot:
         
         print("\n⏳ Generating business report...")
         
-        prompt = f"""
-        Generate a comprehensive {report_type} business report using these metrics:
-        
-        {json.dumps(metrics, indent=2)}
-        
-        Structure the report with:
-        1. Executive Summary (2-3 sentences)
-        2. Key Performance Highlights
-        3. Areas of Concern
-        4. Trend Analysis (if applicable)
-        5. Strategic Recommendations
-        6. Action Items for Next Period
-        
-        Use professional business language suitable for stakeholders.
-        Include specific insights and actionable recommendations.
-        """
+        prompt = self._business_report_prompt(report_type, metrics)
         
         try:
-            response = self.model.generate_content(prompt)
-            
             print(f"\n✅ {report_type.upper()} BUSINESS REPORT")
             print("=" * 60)
-            print(response.text)
+            response_text = self._stream_response('Business Report Generation', prompt)
             print("=" * 60)
             
             # Save to conversation history
@@ -643,7 +1030,7 @@ class IntelligentBusinessChatbot:
                 'timestamp': datetime.now(),
                 'feature': 'Business Report Generation',
                 'input': f"Type: {report_type}, Metrics: {len(metrics)}",
-                'output': response.text
+                'output': response_text
             })
             
         except Exception as e:
@@ -687,46 +1074,12 @@ class IntelligentBusinessChatbot:
             
             print(f"\n⏳ Analyzing {len(competitor_info)} intelligence items...")
             
-            # Combine all intelligence
-            combined_intel = ""
-            for item in competitor_info:
-                combined_intel += f"Source: {item['source']}\nTitle: {item['title']}\nContent: {item['content']}\n\n"
-            
-            prompt = f"""
-            Analyze this competitive intelligence for strategic insights:
-            
-            {combined_intel}
-            
-            Provide analysis on:
-            1. COMPETITIVE THREATS
-            - New capabilities or advantages
-            - Market expansion moves
-            - Strategic partnerships
-            
-            2. MARKET OPPORTUNITIES
-            - Gaps in competitor offerings
-            - Customer pain points
-            - Underserved segments
-            
-            3. STRATEGIC RECOMMENDATIONS
-            - Immediate response actions
-            - Long-term strategic adjustments
-            - Product development priorities
-            
-            4. MONITORING PRIORITIES
-            - Key areas to watch
-            - Metrics to track
-            - Early warning signals
-            
-            Focus on actionable business intelligence.
-            """
+            prompt = self._competitive_intelligence_prompt(competitor_info)
             
             try:
-                response = self.model.generate_content(prompt)
-                
                 print("\n✅ COMPETITIVE INTELLIGENCE ANALYSIS")
                 print("=" * 60)
-                print(response.text)
+                response_text = self._stream_response('Competitive Intelligence', prompt)
                 print("=" * 60)
                 
                 # Save to conversation history
@@ -734,7 +1087,7 @@ class IntelligentBusinessChatbot:
                     'timestamp': datetime.now(),
                     'feature': 'Competitive Intelligence',
                     'input': f"Items analyzed: {len(competitor_info)}",
-                    'output': response.text
+                    'output': response_text
                 })
                 
             except Exception as e:
@@ -773,35 +1126,12 @@ class IntelligentBusinessChatbot:
             
             print("\n⏳ Analyzing feature comparison...")
             
-            features_text = ""
-            for f in features:
-                features_text += f"Feature: {f['feature']}\nOur capability: {f['our_capability']}\nTheir capability: {f['their_capability']}\n\n"
-            
-            prompt = f"""
-            Compare features between our product and competitor:
-            
-            Our Product: {our_product}
-            Competitor: {competitor_product}
-            
-            Feature Comparison:
-            {features_text}
-            
-            Provide:
-            1. Feature-by-feature analysis
-            2. Our competitive advantages
-            3. Areas where we're behind
-            4. Strategic recommendations
-            5. Product development priorities
-            
-            Focus on competitive positioning and strategy.
-            """
+            prompt = self._feature_comparison_prompt(our_product, competitor_product, features)
             
             try:
-                response = self.model.generate_content(prompt)
-                
                 print("\n✅ FEATURE COMPARISON ANALYSIS")
                 print("=" * 60)
-                print(response.text)
+                response_text = self._stream_response('Competitive Intelligence', prompt)
                 print("=" * 60)
                 
             except Exception as e:
@@ -827,28 +1157,13 @@ class IntelligentBusinessChatbot:
             
             print("⏳ Thinking...")
             
-            # Enhanced business context prompt
-            prompt = f"""
-            You are a senior business consultant and strategist. Answer this business question with expert insight:
-            
-            Question: {query}
-            
-            Provide:
-            - Clear, actionable answer
-            - Relevant business context
-            - Best practices and frameworks
-            - Potential risks and considerations
-            - Next steps or recommendations
-            
-            Use professional business language and provide specific, implementable advice.
-            """
+            # Enhanced business context prompt, with token-budgeted conversation memory
+            prompt = self._business_assistant_prompt(query, self.assistant_memory.build_context(query))
             
             try:
-                response = self.model.generate_content(prompt)
-                
                 print("\n✅ BUSINESS CONSULTANT RESPONSE")
                 print("=" * 50)
-                print(response.text)
+                response_text = self._stream_response('General Business Assistant', prompt)
                 print("=" * 50)
                 
                 # Save to conversation history
@@ -856,14 +1171,25 @@ class IntelligentBusinessChatbot:
                     'timestamp': datetime.now(),
                     'feature': 'General Business Assistant',
                     'input': query,
-                    'output': response.text
+                    'output': response_text
                 })
+                self.assistant_memory.add_turn(query, response_text)
                 
             except Exception as e:
                 print(f"❌ Error generating response: {e}")
     
-    def export_conversation(self):
-        """Export conversation history to file."""
+    def export_conversation(self, fmt=None, compress=False, since_checkpoint=False):
+        """
+        Export conversation history to file.
+        
+        Entries are streamed from the history log as they are written, so
+        exporting a long session does not build the whole export in memory.
+        
+        Args:
+            fmt (str): 'json' or 'jsonl'; asks interactively when None
+            compress (bool): Gzip the export
+            since_checkpoint (bool): Only export interactions added since the last export
+        """
         
         print("\n💾 EXPORT CONVERSATION")
         print("-" * 40)
@@ -872,40 +1198,62 @@ class IntelligentBusinessChatbot:
             print("❌ No conversation history to export!")
             return
         
+        if fmt is None:
+            print("Export Format:")
+            print("1. JSON (default)")
+            print("2. JSONL")
+            print("3. JSONL, gzip-compressed")
+            print("4. JSONL, only changes since last export")
+            
+            format_choice = input("Select format (1-4): ").strip()
+            fmt = 'json' if format_choice in ('', '1') else 'jsonl'
+            compress = format_choice == '3'
+            since_checkpoint = format_choice == '4'
+        
+        start = self.export_checkpoint if since_checkpoint else 0
+        if start >= len(self.conversation_history):
+            print("✅ Nothing new to export since the last checkpoint.")
+            return
+        
         # Generate filename
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"business_chatbot_session_{timestamp}.json"
-        
-        # Prepare export data
-        export_data = {
-            'session_info': {
-                'session_start': self.session_start.isoformat(),
-                'export_time': datetime.now().isoformat(),
-                'total_interactions': len(self.conversation_history)
-            },
-            'conversation_history': [
-                {
-                    'timestamp': item['timestamp'].isoformat(),
-                    'feature': item['feature'],
-                    'input': item['input'],
-                    'output': item['output']
-                }
-                for item in self.conversation_history
-            ]
+        suffix = "_delta" if since_checkpoint else ""
+        filename = f"business_chatbot_session_{timestamp}{suffix}.{fmt}" + (".gz" if compress else "")
+        
+        session_info = {
+            'session_start': self.session_start.isoformat(),
+            'export_time': datetime.now().isoformat(),
+            'total_interactions': len(self.conversation_history) - start
         }
         
         try:
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(export_data, f, indent=2, ensure_ascii=False)
+            end = self.conversation_history.export(filename, fmt=fmt, start=start, session_info=session_info)
+            self.export_checkpoint = end
             
             print(f"✅ Conversation exported to: {filename}")
-            print(f"📊 Total interactions: {len(self.conversation_history)}")
+            print(f"📊 Total interactions: {end - start}")
             
         except Exception as e:
             print(f"❌ Error exporting conversation: {e}")
     
+    def _autosave(self):
+        """Append interactions added since the last autosave to the autosave file."""
+        
+        if not self.autosave_path:
+            return
+        with self._autosave_lock:
+            pending = len(self.conversation_history) - self.autosave_checkpoint
+            if pending < self.autosave_every:
+                return
+            try:
+                self.autosave_checkpoint = self.conversation_history.export(
+                    self.autosave_path, start=self.autosave_checkpoint, append=True
+                )
+            except Exception as e:
+                print(f"Warning: Autosave failed: {e}")
+    
     def show_statistics(self):
-        """Show session statistics."""
+        """Show session statistics from the incrementally maintained metrics."""
         
         print("\n📈 SESSION STATISTICS")
         print("-" * 40)
@@ -915,34 +1263,224 @@ class IntelligentBusinessChatbot:
             return
         
         # Calculate statistics
-        total_interactions = len(self.conversation_history)
+        total_interactions = self.metrics.total_interactions()
         session_duration = datetime.now() - self.session_start
-        
-        # Feature usage statistics
-        feature_usage = {}
-        for item in self.conversation_history:
-            feature = item['feature']
-            feature_usage[feature] = feature_usage.get(feature, 0) + 1
+        feature_stats = self.metrics.summary()
         
         # Most used features
-        sorted_features = sorted(feature_usage.items(), key=lambda x: x[1], reverse=True)
+        sorted_features = sorted(feature_stats.items(), key=lambda x: x[1]['interactions'], reverse=True)
         
         print(f"📊 Session Started: {self.session_start.strftime('%Y-%m-%d %H:%M:%S')}")
         print(f"⏱️  Session Duration: {session_duration}")
         print(f"🔢 Total Interactions: {total_interactions}")
-        print(f"📋 Knowledge Base Documents: {len(self.knowledge_base)}")
+        print(f"📋 Knowledge Base Documents: {len(self.knowledge_base)} ({self.knowledge_base_state})")
+        
+        cache_metrics = self.context_cache.get_metrics()
+        if cache_metrics['cached_calls']:
+            print(f"🗄️  Cached Document Calls: {cache_metrics['cached_calls']} (~{cache_metrics['tokens_saved']:,} tokens saved)")
+        
+        memory_stats = self.assistant_memory.get_stats()
+        if memory_stats['recent_turns']:
+            print(f"🧠 Assistant Memory: {memory_stats['recent_turns']} recent + {memory_stats['archived_turns']} archived turns "
+                  f"(~{memory_stats['summary_tokens']} summary tokens, {memory_stats['token_budget']} token budget)")
         
         print("\n🏆 FEATURE USAGE:")
-        for feature, count in sorted_features:
-            percentage = (count / total_interactions) * 100
-            print(f"  {feature}: {count} times ({percentage:.1f}%)")
+        for feature, stats in sorted_features:
+            if stats['interactions']:
+                percentage = (stats['interactions'] / total_interactions) * 100 if total_interactions else 0.0
+                print(f"  {feature}: {stats['interactions']} times ({percentage:.1f}%)")
+        
+        print("\n⏱️  LATENCY & TOKENS:")
+        for feature, stats in sorted_features:
+            if not stats['calls']:
+                continue
+            print(f"  {feature}: {stats['calls']} calls, {stats['errors']} errors, "
+                  f"{stats['cache_hit_rate']:.0%} cache hits")
+            print(f"    Latency p50/p95/p99: {stats['latency_p50']:.2f}s / {stats['latency_p95']:.2f}s / "
+                  f"{stats['latency_p99']:.2f}s (first token p50: {stats['time_to_first_token_p50']:.2f}s)")
+            print(f"    Tokens: {stats['prompt_tokens']:,} prompt, {stats['response_tokens']:,} response, "
+                  f"{stats['cached_tokens']:,} cached")
         
         print("\n📝 RECENT ACTIVITY:")
-        for item in self.conversation_history[-3:]:
+        for item in self.conversation_history.recent(3):
             print(f"  {item['timestamp'].strftime('%H:%M')} - {item['feature']}")
         
         print("-" * 40)
     
+    def run_feature(self, feature, args):
+        """
+        Run a feature without interactive prompts.
+        
+        Args:
+            feature (str): One of BATCH_FEATURES
+            args (dict): Feature arguments, e.g. {'query': ...} for 'business_assistant'
+        
+        Returns:
+            dict: 'output' text, plus 'sources' for 'kb_qa'
+        
+        Raises:
+            FeatureArgumentError: Unknown feature or missing arguments
+        """
+        
+        if feature not in REQUIRED_ARGS:
+            raise FeatureArgumentError(f"Unknown feature '{feature}'. Available: {', '.join(BATCH_FEATURES)}")
+        missing = [name for name in REQUIRED_ARGS[feature] if name not in args]
+        if feature == 'sentiment' and not (args.get('feedback_items') or 'feedback' in args):
+            missing.append('feedback')
+        if missing:
+            raise FeatureArgumentError(f"Missing argument: {', '.join(missing)}")
+        
+        cache_key = None
+        result = {}
+        
+        if feature == 'marketing_copy':
+            copy_type = args.get('copy_type', 'email')
+            label = 'Marketing Copy Generation'
+            input_summary = f"Product: {args['product_name']}, Type: {copy_type}"
+            prompt = self._marketing_copy_prompt(
+                args['product_name'], args.get('features', []), args.get('target_audience', ''),
+                args.get('value_proposition', ''), copy_type
+            )
+        
+        elif feature == 'document_analysis':
+            document_text = args['document_text']
+            analysis_type = args.get('analysis_type', 'comprehensive')
+            cache_key = self.context_cache.register(document_text)
+            label = 'Document Analysis'
+            input_summary = f"Document length: {len(document_text)} chars, Analysis: {analysis_type}"
+            prompt = self._document_analysis_prompt(
+                CACHED_DOCUMENT_REFERENCE if cache_key else document_text, analysis_type
+            )
+        
+        elif feature == 'sentiment':
+            feedback_items = args.get('feedback_items') or [args['feedback']]
+            label = 'Sentiment Analysis'
+            input_summary = f"Mode: {'2' if len(feedback_items) > 1 else '1'}, Items: {len(feedback_items)}"
+            if len(feedback_items) > 1:
+                prompt = self._batch_sentiment_prompt(feedback_items)
+            else:
+                prompt = self._sentiment_prompt(feedback_items[0])
+        
+        elif feature == 'kb_qa':
+            relevant_docs = self.search_knowledge_base(args['question'], top_k=args.get('top_k', 3))
+            if not self.knowledge_base:
+                raise RuntimeError(f"Knowledge base is unavailable ({self.knowledge_base_state})")
+            if not relevant_docs:
+                raise FeatureArgumentError("No relevant information found in knowledge base")
+            label = 'Knowledge Base Q&A'
+            input_summary = args['question']
+            prompt = self._knowledge_base_prompt(args['question'], relevant_docs)
+            result['sources'] = [
+                {'id': doc['id'], 'title': doc['title'], 'similarity': doc['similarity']}
+                for doc in relevant_docs
+            ]
+        
+        elif feature == 'business_report':
+            report_type = args.get('report_type', 'sales')
+            label = 'Business Report Generation'
+            input_summary = f"Type: {report_type}, Metrics: {len(args['metrics'])}"
+            prompt = self._business_report_prompt(report_type, args['metrics'])
+        
+        elif feature == 'competitive_intelligence':
+            label = 'Competitive Intelligence'
+            input_summary = f"Items analyzed: {len(args['items'])}"
+            prompt = self._competitive_intelligence_prompt(args['items'])
+        
+        elif feature == 'feature_comparison':
+            label = 'Competitive Intelligence'
+            input_summary = f"Feature comparison: {args['our_product']} vs {args['competitor_product']}"
+            prompt = self._feature_comparison_prompt(args['our_product'], args['competitor_product'], args['features'])
+        
+        elif feature == 'business_assistant':
+            label = 'General Business Assistant'
+            input_summary = args['query']
+            prompt = self._business_assistant_prompt(args['query'])
+        
+        output = self._generate(label, prompt, cache_key)
+        
+        self.conversation_history.append({
+            'timestamp': datetime.now(),
+            'feature': label,
+            'input': input_summary,
+            'output': output
+        })
+        
+        self._autosave()
+        
+        result['output'] = output
+        return result
+    
+    def run_batch(self, input_path, output_path, workers=4):
+        """
+        Run a JSONL file of {"feature": ..., "args": {...}} requests headlessly.
+        
+        Requests run concurrently on a bounded worker pool that shares this
+        chatbot's knowledge base and client. Results are written to output_path
+        as JSONL in completion order, each with its request line and latency.
+        
+        Returns:
+            dict: Summary with throughput and per-feature latency
+        """
+        
+        write_lock = threading.Lock()
+        slots = threading.BoundedSemaphore(workers * 2)
+        results = []
+        start_time = time.perf_counter()
+        
+        def execute(line_number, line, out):
+            # Always free the slot, or the producer blocks once a write fails
+            try:
+                started = time.perf_counter()
+                record = {'line': line_number}
+                try:
+                    request = json.loads(line)
+                    record['id'] = request.get('id')
+                    record['feature'] = request.get('feature')
+                    record.update(self.run_feature(request.get('feature'), request.get('args', {})))
+                    record['status'] = 'ok'
+                except Exception as e:
+                    record['status'] = 'failed'
+                    record['error'] = f"{type(e).__name__}: {e}"
+                record['latency_seconds'] = round(time.perf_counter() - started, 3)
+                
+                with write_lock:
+                    out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    out.flush()
+                    results.append(record)
+            finally:
+                slots.release()
+        
+        with open(input_path, 'r', encoding='utf-8') as requests_file, \
+                open(output_path, 'w', encoding='utf-8') as out, \
+                ThreadPoolExecutor(max_workers=workers) as executor:
+            for line_number, line in enumerate(requests_file, 1):
+                if not line.strip():
+                    continue
+                slots.acquire()
+                executor.submit(execute, line_number, line, out)
+        
+        elapsed = time.perf_counter() - start_time
+        per_feature = {}
+        for record in results:
+            per_feature.setdefault(record.get('feature') or 'unknown', []).append(record['latency_seconds'])
+        
+        summary = {
+            'requests': len(results),
+            'succeeded': sum(1 for r in results if r['status'] == 'ok'),
+            'failed': sum(1 for r in results if r['status'] != 'ok'),
+            'elapsed_seconds': round(elapsed, 2),
+            'requests_per_minute': round(len(results) / elapsed * 60, 2) if elapsed else 0.0,
+            'features': {
+                feature: {
+                    'count': len(latencies),
+                    'mean_latency_seconds': round(sum(latencies) / len(latencies), 3),
+                    'max_latency_seconds': max(latencies)
+                }
+                for feature, latencies in per_feature.items()
+            }
+        }
+        return summary
+    
     def run(self):
         """Main chatbot loop."""
         
@@ -1008,6 +1546,9 @@ class IntelligentBusinessChatbot:
                 else:
                     print("❌ Invalid option. Please select 0-9 or type 'help'.")
                 
+                # Periodic autosave only writes the interactions added since the last one
+                self._autosave()
+                
                 # Pause before showing menu again
                 input("\nPress Enter to continue...")
                 
@@ -1022,9 +1563,28 @@ class IntelligentBusinessChatbot:
 
 # Main execution
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Intelligent Business Chatbot")
+    parser.add_argument("--batch", metavar="REQUESTS_JSONL",
+                        help="Run a JSONL file of {\"feature\", \"args\"} requests without prompts")
+    parser.add_argument("--output", default="batch_results.jsonl", help="JSONL results file for --batch")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent requests for --batch")
+    parser.add_argument("--autosave", metavar="PATH", help="Append new interactions to this JSONL(.gz) file")
+    cli_args = parser.parse_args()
+    
     try:
         # Initialize and run the chatbot
-        chatbot = IntelligentBusinessChatbot()
+        chatbot = IntelligentBusinessChatbot(autosave_path=cli_args.autosave)
+        
+        if cli_args.batch:
+            summary = chatbot.run_batch(cli_args.batch, cli_args.output, cli_args.workers)
+            print(f"\n✅ Batch complete: {summary['succeeded']}/{summary['requests']} succeeded "
+                  f"in {summary['elapsed_seconds']}s ({summary['requests_per_minute']} requests/min)")
+            for feature, stats in summary['features'].items():
+                print(f"  {feature}: {stats['count']} requests, "
+                      f"mean {stats['mean_latency_seconds']}s, max {stats['max_latency_seconds']}s")
+            print(f"📄 Results written to: {cli_args.output}")
+            sys.exit(1 if summary['failed'] else 0)
+        
         chatbot.run()
         
     except KeyboardInterrupt:
@@ -1,16 +1,14 @@
-import numpy as np
-import pandas as pd
-from sklearn.metrics.pairwise import cosine_similarity
 import json
 from datetime import datetime
 from config import GeminiConfig
-import google.generativeai as genai
 
 class IntelligentKnowledgeBase:
     def __init__(self):
         self.config = GeminiConfig()
         self.model = self.config.get_generative_model()
         self.embedding_model = self.config.get_embeddings_model()
+        # pandas is imported on first use to keep module import fast
+        import pandas as pd
         self.knowledge_base = pd.DataFrame()
         self.embeddings_cache = {}
     
@@ -22,13 +20,14 @@ class IntelligentKnowledgeBase:
             documents (list): List of dicts with 'id', 'title', 'content', 'category'
         """
         
+        import pandas as pd
+        
         # Convert to DataFrame
         df = pd.DataFrame(documents)
         
         # Generate embeddings for all documents
-        embeddings = genai.embed_content(
-            model=self.embedding_model,
-            content=df['content'].tolist(),
+        embeddings = self.config.embed_content(
+            df['content'].tolist(),
             task_type="RETRIEVAL_DOCUMENT"
         )['embedding']
         
@@ -54,9 +53,8 @@ class IntelligentKnowledgeBase:
             return "Knowledge base is empty. Please add documents first."
         
         # Generate query embedding
-        query_embedding = genai.embed_content(
-            model=self.embedding_model,
-            content=query,
+        query_embedding = self.config.embed_content(
+            query,
             task_type="RETRIEVAL_QUERY"
         )['embedding']
         
@@ -70,6 +68,8 @@ class IntelligentKnowledgeBase:
         if df.empty:
             return f"No documents found in category: {category_filter}"
         
+        import numpy as np
+        
         # Calculate cosine similarity
         df['similarity'] = df['embeddings'].apply(
             lambda x: np.dot(x, query_embedding)
@@ -1,10 +1,229 @@
 from config import GeminiConfig
+import argparse
+import csv
+import hashlib
 import json
+import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from fake_backend import estimate_tokens
+from prompt_templates import PROMPTS
+
+# Template for different campaign types
+CAMPAIGN_TEMPLATES = {
+    "email": {
+        "structure": "Subject line, greeting, value proposition, features, call-to-action",
+        "tone": "professional but engaging",
+        "length": "150-200 words"
+    },
+    "social": {
+        "structure": "Hook, value proposition, call-to-action, hashtags",
+        "tone": "casual and energetic",
+        "length": "50-100 words"
+    },
+    "landing_page": {
+        "structure": "Headline, subheadline, benefits, features, testimonial placeholder, CTA",
+        "tone": "confident and persuasive",
+        "length": "300-400 words"
+    },
+    "ad_copy": {
+        "structure": "Headline, description, call-to-action",
+        "tone": "direct and compelling",
+        "length": "25-50 words"
+    }
+}
+CAMPAIGN_TYPES = tuple(CAMPAIGN_TEMPLATES)
+
+# Output limit of the model; a combined response must fit well inside it
+MAX_OUTPUT_TOKENS = 8192
+# Concurrent single-format calls when a combined response has to be filled in
+MAX_FALLBACK_WORKERS = 4
+
+PRODUCT_BLOCK_PROMPT = PROMPTS.register("marketing_product_block", """
+    Product Information:
+    - Name: {name}
+    - Category: {category}
+    - Key Features: {features}
+    - Target Audience: {target_audience}
+    - Unique Value Proposition: {value_proposition}
+    - Price Point: {price_point}
+    """)
+
+MARKETING_COPY_PROMPT = PROMPTS.register("marketing_copy", """
+    You are a senior marketing copywriter creating {campaign_type} copy for a business product.
+    
+    {product}
+    
+    Requirements:
+    - Structure: {structure}
+    - Tone: {tone}
+    - Length: {length}
+    - Include emotional triggers and urgency where appropriate
+    - Focus on benefits, not just features
+    - Use power words and active voice
+    
+    Generate compelling copy that drives action.
+    """)
+
+MULTI_FORMAT_PROMPT = PROMPTS.register("marketing_multi_format", """
+    You are a senior marketing copywriter creating a multi-channel campaign for a business product.
+    
+    {product}
+    
+    Write one piece of copy for each format below, following its structure, tone and length:
+    {requirements}
+    
+    For every format:
+    - Include emotional triggers and urgency where appropriate
+    - Focus on benefits, not just features
+    - Use power words and active voice
+    
+    Respond with a JSON object with one string field per format.
+    """)
+
+def product_block(product_info):
+    """The product details shared by every marketing copy prompt."""
+    
+    return PRODUCT_BLOCK_PROMPT.render(
+        name=product_info.get('name', 'N/A'),
+        category=product_info.get('category', 'N/A'),
+        features=', '.join(product_info.get('features', [])),
+        target_audience=product_info.get('target_audience', 'N/A'),
+        value_proposition=product_info.get('value_proposition', 'N/A'),
+        price_point=product_info.get('price_point', 'N/A')
+    )
+
+def max_output_tokens(campaign_types):
+    """Upper estimate of the output tokens for the given campaign types (about 4 tokens per 3 words)."""
+    
+    words = sum(int(CAMPAIGN_TEMPLATES[t]['length'].split("-")[1].split()[0]) for t in campaign_types)
+    return words * 4 // 3
+
+WORD_PATTERN = re.compile(r"[a-z0-9$%']+")
+# Feature words too generic to show that a variant covers the feature
+STOP_WORDS = {"a", "an", "and", "the", "of", "for", "to", "in", "on", "with", "by", "your", "based"}
+
+def near_duplicate(text_a, text_b, threshold=0.8):
+    """True if two texts share at least threshold of their word 3-grams (Jaccard)."""
+    
+    def trigrams(text):
+        words = WORD_PATTERN.findall(text.lower())
+        return {tuple(words[i:i + 3]) for i in range(max(1, len(words) - 2))}
+    
+    a, b = trigrams(text_a), trigrams(text_b)
+    return bool(a | b) and len(a & b) / len(a | b) >= threshold
+
+def score_variant(text, product_info, campaign_type):
+    """
+    Cheap local quality score of a copy variant (0-1), no model calls.
+    
+    Half of the score is length fit against the campaign type's target word
+    range (decaying with the relative distance outside it), half is coverage
+    of the product's features (a feature counts when most of its words appear).
+    
+    Returns:
+        dict: 'score', 'words', 'length_fit' and 'feature_coverage'
+    """
+    
+    words = WORD_PATTERN.findall(text.lower())
+    low, high = (int(n) for n in CAMPAIGN_TEMPLATES[campaign_type]['length'].split()[0].split("-"))
+    if low <= len(words) <= high:
+        length_fit = 1.0
+    else:
+        target = low if len(words) < low else high
+        length_fit = max(0.0, 1.0 - abs(len(words) - target) / target)
+    
+    vocabulary = set(words)
+    covered = 0
+    features = product_info.get('features', [])
+    for feature in features:
+        keywords = [w for w in WORD_PATTERN.findall(feature.lower()) if w not in STOP_WORDS]
+        if keywords and sum(w in vocabulary for w in keywords) / len(keywords) >= 0.5:
+            covered += 1
+    feature_coverage = covered / len(features) if features else 1.0
+    
+    return {
+        'score': round(0.5 * length_fit + 0.5 * feature_coverage, 3),
+        'words': len(words),
+        'length_fit': round(length_fit, 3),
+        'feature_coverage': round(feature_coverage, 3)
+    }
+
+def candidate_texts(response):
+    """Texts of all candidates in a response (just response.text if it has none)."""
+    
+    texts = []
+    for candidate in getattr(response, 'candidates', None) or []:
+        parts = getattr(getattr(candidate, 'content', None), 'parts', None) or []
+        text = "".join(getattr(part, 'text', "") for part in parts).strip()
+        if text:
+            texts.append(text)
+    return texts or [response.text]
+
+def iter_products(path):
+    """
+    Stream product dicts from a CSV or JSONL file, one at a time.
+    
+    CSV columns map to product_info keys; the 'features' column may list
+    several features separated by ';' or '|'.
+    
+    Args:
+        path (str): .csv or .jsonl file
+    """
+    
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        if path.lower().endswith(".csv"):
+            for row in csv.DictReader(f):
+                product = {key.strip(): (value or "").strip() for key, value in row.items() if key}
+                features = product.get('features', "").replace("|", ";")
+                product['features'] = [feature.strip() for feature in features.split(";") if feature.strip()]
+                yield product
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+def product_key(product):
+    """
+    Stable identifier of a product: its SKU or id, falling back to its name,
+    and to a hash of the whole product when it has none of them.
+    """
+    
+    for field in ('sku', 'id', 'name'):
+        value = str(product.get(field) or '').strip()
+        if value:
+            return value
+    digest = hashlib.sha256(json.dumps(product, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8"))
+    return f"product-{digest.hexdigest()[:16]}"
+
+class RateLimiter:
+    """Spaces calls evenly so that at most requests_per_minute start each minute."""
+    
+    def __init__(self, requests_per_minute):
+        self.interval = 60.0 / requests_per_minute if requests_per_minute else 0.0
+        self.next_slot = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(self.next_slot, now)
+            self.next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
 
 class MarketingCopyGenerator:
     def __init__(self):
         self.config = GeminiConfig()
         self.model = self.config.get_generative_model()
+        self.last_multi_format_stats = None
+        self.last_variant_stats = None
     
     def generate_marketing_copy(self, product_info, campaign_type="email"):
         """
@@ -15,59 +234,331 @@ class MarketingCopyGenerator:
             campaign_type (str): 'email', 'social', 'landing_page', 'ad_copy'
         """
         
-        # Template for different campaign types
-        templates = {
-            "email": {
-                "structure": "Subject line, greeting, value proposition, features, call-to-action",
-                "tone": "professional but engaging",
-                "length": "150-200 words"
-            },
-            "social": {
-                "structure": "Hook, value proposition, call-to-action, hashtags",
-                "tone": "casual and energetic",
-                "length": "50-100 words"
-            },
-            "landing_page": {
-                "structure": "Headline, subheadline, benefits, features, testimonial placeholder, CTA",
-                "tone": "confident and persuasive",
-                "length": "300-400 words"
-            },
-            "ad_copy": {
-                "structure": "Headline, description, call-to-action",
-                "tone": "direct and compelling",
-                "length": "25-50 words"
-            }
+        response = self.model.generate_content(self._marketing_copy_prompt(product_info, campaign_type))
+        return response.text
+    
+    def _marketing_copy_prompt(self, product_info, campaign_type):
+        """Build the prompt for one campaign type."""
+        
+        template = CAMPAIGN_TEMPLATES.get(campaign_type, CAMPAIGN_TEMPLATES["email"])
+        
+        return MARKETING_COPY_PROMPT.render(
+            campaign_type=campaign_type,
+            product=product_block(product_info),
+            structure=template['structure'],
+            tone=template['tone'],
+            length=template['length']
+        )
+    
+    def _multi_format_prompt(self, product_info, campaign_types):
+        """Build one prompt asking for every campaign type, sharing the product block."""
+        
+        requirements = "\n".join(
+            f"- {campaign_type}: {CAMPAIGN_TEMPLATES[campaign_type]['structure']}; "
+            f"tone {CAMPAIGN_TEMPLATES[campaign_type]['tone']}; {CAMPAIGN_TEMPLATES[campaign_type]['length']}"
+            for campaign_type in campaign_types
+        )
+        return MULTI_FORMAT_PROMPT.render(product=product_block(product_info), requirements=requirements)
+    
+    def generate_multi_format(self, product_info, campaign_types=CAMPAIGN_TYPES, output_token_limit=MAX_OUTPUT_TOKENS):
+        """
+        Generate copy for several campaign types with a single model call.
+        
+        All formats are requested in one structured (JSON schema) response, so
+        the product block is sent once instead of once per format. When the
+        combined output would not fit output_token_limit, or the response
+        cannot be parsed, the missing formats are generated with parallel
+        single-format calls. last_multi_format_stats records the mode, the
+        number of calls and the prompt tokens saved.
+        
+        Args:
+            product_info (dict): Product details
+            campaign_types (tuple): Campaign types to generate
+            output_token_limit (int): Largest combined output to request in one call
+        
+        Returns:
+            dict: Copy text keyed by campaign type
+        """
+        
+        copies, self.last_multi_format_stats = self._generate_multi_format(
+            product_info, campaign_types, output_token_limit
+        )
+        return copies
+    
+    def _generate_multi_format(self, product_info, campaign_types, output_token_limit, limiter=None,
+                               fallback_workers=MAX_FALLBACK_WORKERS):
+        """
+        Shared implementation of generate_multi_format.
+        
+        Args:
+            limiter (RateLimiter): Waited on before every model call, fallback calls included
+            fallback_workers (int): Concurrent single-format fallback calls
+        
+        Returns:
+            tuple: (copy text keyed by campaign type, stats dict)
+        """
+        
+        wait = limiter.wait if limiter else (lambda: None)
+        campaign_types = [t for t in campaign_types if t in CAMPAIGN_TEMPLATES]
+        separate_prompt_tokens = sum(
+            estimate_tokens(self._marketing_copy_prompt(product_info, t)) for t in campaign_types
+        )
+        stats = {
+            'campaign_types': campaign_types,
+            'mode': 'parallel',
+            'calls': 0,
+            'separate_prompt_tokens': separate_prompt_tokens,
+            'prompt_tokens': 0
         }
         
-        template = templates.get(campaign_type, templates["email"])
+        copies = {}
+        if len(campaign_types) > 1 and max_output_tokens(campaign_types) <= output_token_limit:
+            prompt = self._multi_format_prompt(product_info, campaign_types)
+            generation_config = {
+                'response_mime_type': "application/json",
+                'response_schema': {
+                    'type': "object",
+                    'properties': {t: {'type': "string"} for t in campaign_types},
+                    'required': campaign_types
+                },
+                'max_output_tokens': output_token_limit
+            }
+            stats['calls'] += 1
+            stats['prompt_tokens'] += estimate_tokens(prompt)
+            try:
+                wait()
+                response = self.model.generate_content(prompt, generation_config=generation_config)
+                parsed = json.loads(response.text)
+                copies = {
+                    t: parsed[t].strip() for t in campaign_types
+                    if isinstance(parsed.get(t), str) and parsed[t].strip()
+                }
+            except Exception as e:
+                print(f"Warning: Combined marketing copy response unusable, falling back to separate calls: {e}")
+            stats['mode'] = 'single_call' if len(copies) == len(campaign_types) else 'single_call_with_fallback'
+        
+        missing = [t for t in campaign_types if t not in copies]
+        if missing:
+            def generate_one(campaign_type):
+                wait()
+                return self.generate_marketing_copy(product_info, campaign_type)
+            
+            with ThreadPoolExecutor(max_workers=max(1, min(len(missing), fallback_workers))) as executor:
+                texts = list(executor.map(generate_one, missing))
+            copies.update(zip(missing, texts))
+            stats['calls'] += len(missing)
+            stats['prompt_tokens'] += sum(
+                estimate_tokens(self._marketing_copy_prompt(product_info, t)) for t in missing
+            )
         
-        prompt = f"""
-        You are a senior marketing copywriter creating {campaign_type} copy for a business product.
+        stats['saved_prompt_tokens'] = separate_prompt_tokens - stats['prompt_tokens']
+        return {t: copies[t] for t in campaign_types}, stats
+    
+    def generate_variants(self, product_info, campaign_type="email", count=3, temperature=1.0,
+                          duplicate_threshold=0.8):
+        """
+        Generate A/B variants of one piece of copy, deduplicated and ranked locally.
         
-        Product Information:
-        - Name: {product_info.get('name', 'N/A')}
-        - Category: {product_info.get('category', 'N/A')}
-        - Key Features: {', '.join(product_info.get('features', []))}
-        - Target Audience: {product_info.get('target_audience', 'N/A')}
-        - Unique Value Proposition: {product_info.get('value_proposition', 'N/A')}
-        - Price Point: {product_info.get('price_point', 'N/A')}
+        The variants are requested as candidates of a single call
+        (candidate_count). If the model rejects that or returns fewer
+        candidates, the rest are generated with concurrent calls. Near-identical
+        variants are dropped and the rest are ranked by score_variant.
+        last_variant_stats records the number of calls and duplicates removed.
         
-        Requirements:
-        - Structure: {template['structure']}
-        - Tone: {template['tone']}
-        - Length: {template['length']}
-        - Include emotional triggers and urgency where appropriate
-        - Focus on benefits, not just features
-        - Use power words and active voice
+        Args:
+            product_info (dict): Product details
+            campaign_type (str): 'email', 'social', 'landing_page', 'ad_copy'
+            count (int): Number of variants to request
+            temperature (float): Sampling temperature, higher for more diverse variants
+            duplicate_threshold (float): Word 3-gram overlap above which variants are duplicates
         
-        Generate compelling copy that drives action.
+        Returns:
+            list: Dicts with 'text', 'score', 'words', 'length_fit' and 'feature_coverage', best first
         """
         
-        response = self.model.generate_content(prompt)
-        return response.text
+        if campaign_type not in CAMPAIGN_TEMPLATES:
+            campaign_type = "email"
+        prompt = self._marketing_copy_prompt(product_info, campaign_type)
+        stats = {'campaign_type': campaign_type, 'requested': count, 'mode': 'candidates', 'calls': 1}
+        
+        texts = []
+        try:
+            response = self.model.generate_content(
+                prompt, generation_config={'candidate_count': count, 'temperature': temperature}
+            )
+            texts = candidate_texts(response)[:count]
+        except Exception as e:
+            print(f"Warning: Multiple candidates not available, falling back to separate calls: {e}")
+        
+        missing = count - len(texts)
+        if missing:
+            stats['mode'] = 'candidates_with_fallback' if texts else 'parallel'
+            with ThreadPoolExecutor(max_workers=missing) as executor:
+                texts += list(executor.map(
+                    lambda _: self.model.generate_content(prompt, generation_config={'temperature': temperature}).text,
+                    range(missing)
+                ))
+            stats['calls'] += missing
+        
+        unique = []
+        for text in texts:
+            if not any(near_duplicate(text, kept, duplicate_threshold) for kept in unique):
+                unique.append(text)
+        stats['duplicates_removed'] = len(texts) - len(unique)
+        self.last_variant_stats = stats
+        
+        variants = [{'text': text, **score_variant(text, product_info, campaign_type)} for text in unique]
+        return sorted(variants, key=lambda v: v['score'], reverse=True)
+    
+    def generate_catalog(self, products, campaign_types=CAMPAIGN_TYPES, output_path="marketing_catalog.jsonl",
+                         workers=4, requests_per_minute=60, resume=True, single_call=False):
+        """
+        Generate marketing copy for a whole product catalog.
+        
+        Products are streamed from a CSV/JSONL file (or any iterable of dicts)
+        and at most workers * 2 are in memory at a time. Model calls run on a
+        bounded thread pool and are spaced by a shared rate limiter. Each
+        finished product is appended to output_path as one JSONL record and
+        flushed, so the output file is also the checkpoint: with resume=True,
+        products already written successfully are skipped on the next run.
+        
+        Args:
+            products (str or iterable): Path to a .csv/.jsonl file, or product dicts
+            campaign_types (tuple): Campaign types generated for every product
+            output_path (str): JSONL file results are appended to
+            workers (int): Concurrent model calls
+            requests_per_minute (int): Maximum model calls started per minute (0 for no limit)
+            resume (bool): Skip products already completed in output_path
+            single_call (bool): Request all campaign types of a product in one call
+                (see generate_multi_format)
+        
+        Returns:
+            dict: Run summary with counts and items/min
+        """
+        
+        if isinstance(products, str):
+            products = iter_products(products)
+        
+        completed = set()
+        if resume and os.path.exists(output_path):
+            with open(output_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # A line cut short by an interrupted run
+                        continue
+                    if record.get('status') == 'ok':
+                        completed.add(record['key'])
+        
+        limiter = RateLimiter(requests_per_minute)
+        write_lock = threading.Lock()
+        slots = threading.BoundedSemaphore(workers * 2)
+        counts = {'succeeded': 0, 'failed': 0, 'skipped': 0, 'calls': 0, 'saved_prompt_tokens': 0}
+        start_time = time.perf_counter()
+        
+        def generate(key, product, out):
+            # Always free the slot, or the producer blocks once a write fails
+            try:
+                record = {'key': key, 'product': product.get('name', key), 'copy': {}}
+                calls = saved_tokens = 0
+                try:
+                    if single_call:
+                        # Fallback calls run one at a time, so at most `workers` calls are in flight
+                        record['copy'], stats = self._generate_multi_format(
+                            product, campaign_types, MAX_OUTPUT_TOKENS, limiter=limiter, fallback_workers=1
+                        )
+                        calls, saved_tokens = stats['calls'], stats['saved_prompt_tokens']
+                    else:
+                        for campaign_type in campaign_types:
+                            limiter.wait()
+                            calls += 1
+                            record['copy'][campaign_type] = self.generate_marketing_copy(product, campaign_type)
+                    record['status'] = 'ok'
+                except Exception as e:
+                    record['status'] = 'failed'
+                    record['error'] = f"{type(e).__name__}: {e}"
+                record['generated_at'] = datetime.now().isoformat()
+                
+                with write_lock:
+                    out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    out.flush()
+                    counts['succeeded' if record['status'] == 'ok' else 'failed'] += 1
+                    counts['calls'] += calls
+                    counts['saved_prompt_tokens'] += saved_tokens
+                    done = counts['succeeded'] + counts['failed']
+                
+                if done % 100 == 0:
+                    elapsed = time.perf_counter() - start_time
+                    print(f"📝 {done} products ({done / elapsed * 60:.1f} items/min)")
+            finally:
+                slots.release()
+        
+        with open(output_path, 'a', encoding='utf-8') as out, \
+                ThreadPoolExecutor(max_workers=workers) as executor:
+            for product in products:
+                key = product_key(product)
+                if key in completed:
+                    counts['skipped'] += 1
+                    continue
+                slots.acquire()
+                executor.submit(generate, key, product, out)
+        
+        elapsed = time.perf_counter() - start_time
+        processed = counts['succeeded'] + counts['failed']
+        return {
+            'products': processed,
+            'succeeded': counts['succeeded'],
+            'failed': counts['failed'],
+            'skipped_completed': counts['skipped'],
+            'model_calls': counts['calls'],
+            'saved_prompt_tokens': counts['saved_prompt_tokens'],
+            'campaign_types': list(campaign_types),
+            'elapsed_seconds': round(elapsed, 2),
+            'items_per_minute': round(processed / elapsed * 60, 2) if elapsed else 0.0,
+            'output': output_path
+        }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate marketing copy for a CSV/JSONL product catalog.")
+    parser.add_argument("catalog", help="Products as .csv or .jsonl")
+    parser.add_argument("-o", "--output", default="marketing_catalog.jsonl", help="JSONL results (also the checkpoint)")
+    parser.add_argument("-t", "--types", nargs="+", default=list(CAMPAIGN_TYPES), choices=CAMPAIGN_TYPES,
+                        help="Campaign types to generate for every product")
+    parser.add_argument("-w", "--workers", type=int, default=4, help="Concurrent model calls")
+    parser.add_argument("--rpm", type=int, default=60, help="Maximum model calls per minute (0 for no limit)")
+    parser.add_argument("--restart", action="store_true", help="Regenerate products already in the output")
+    parser.add_argument("--single-call", action="store_true", help="One structured call per product for all types")
+    args = parser.parse_args(argv)
+    
+    generator = MarketingCopyGenerator()
+    summary = generator.generate_catalog(
+        args.catalog,
+        campaign_types=args.types,
+        output_path=args.output,
+        workers=args.workers,
+        requests_per_minute=args.rpm,
+        resume=not args.restart,
+        single_call=args.single_call
+    )
+    
+    print("\n📊 CATALOG SUMMARY")
+    print("-" * 40)
+    print(f"Products: {summary['products']} ({summary['succeeded']} succeeded, {summary['failed']} failed, "
+          f"{summary['skipped_completed']} already done)")
+    print(f"Model calls: {summary['model_calls']}")
+    if args.single_call:
+        print(f"Prompt tokens saved: ~{summary['saved_prompt_tokens']}")
+    print(f"Elapsed: {summary['elapsed_seconds']}s")
+    print(f"Throughput: {summary['items_per_minute']} items/min")
+    print(f"Results: {summary['output']}")
+    return 1 if summary['failed'] else 0
 
 # Example usage
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(main())
+    
     generator = MarketingCopyGenerator()
     
     product_info = {
@@ -84,9 +575,20 @@ if __name__ == "__main__":
         "price_point": "Enterprise-level pricing with ROI guarantee"
     }
     
-    # Generate different types of marketing copy
-    for campaign_type in ["email", "social", "landing_page", "ad_copy"]:
+    # Generate all four types of marketing copy with one structured call
+    copies = generator.generate_multi_format(product_info, ["email", "social", "landing_page", "ad_copy"])
+    for campaign_type, copy in copies.items():
         print(f"\n--- {campaign_type.upper()} COPY ---")
-        copy = generator.generate_marketing_copy(product_info, campaign_type)
         print(copy)
-        print("-" * 50)
\ No newline at end of file
+        print("-" * 50)
+    
+    stats = generator.last_multi_format_stats
+    print(f"\n{stats['calls']} call(s) ({stats['mode']}), ~{stats['saved_prompt_tokens']} prompt tokens saved "
+          f"vs {len(copies)} separate calls")
+    
+    # A/B variants of the ad copy, ranked locally
+    print("\n--- AD_COPY VARIANTS ---")
+    for variant in generator.generate_variants(product_info, "ad_copy", count=3):
+        print(f"[{variant['score']:.2f}] {variant['text']}")
+    print(f"{generator.last_variant_stats['calls']} call(s), "
+          f"{generator.last_variant_stats['duplicates_removed']} near-duplicate(s) removed")
\ No newline at end of file
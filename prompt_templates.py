@@ -0,0 +1,130 @@
+import hashlib
+import importlib
+import re
+import string
+import sys
+import textwrap
+from fake_backend import estimate_tokens
+
+BLANK_LINES_PATTERN = re.compile(r"\n{3,}")
+
+def normalize_whitespace(text):
+    """Dedent a template, strip trailing spaces and collapse runs of blank lines."""
+    
+    lines = [line.rstrip() for line in textwrap.dedent(text).splitlines()]
+    return BLANK_LINES_PATTERN.sub("\n\n", "\n".join(lines)).strip()
+
+class RenderedPrompt(str):
+    """A prompt string that remembers which template (and version) produced it."""
+    
+    template_name = None
+    template_version = None
+    template_hash = None
+    
+    @property
+    def cache_key(self):
+        """Template hash plus a digest of the rendered text, e.g. for response caches."""
+        return f"{self.template_hash}:{hashlib.sha256(self.encode('utf-8')).hexdigest()[:16]}"
+
+class PromptTemplate:
+    """
+    A whitespace-normalized, versioned prompt template.
+    
+    The template is parsed once when it is registered; render() only fills in
+    the placeholders with str.format_map.
+    """
+    
+    def __init__(self, name, text, version=1):
+        self.name = name
+        self.version = version
+        self.raw_text = text
+        self.text = normalize_whitespace(text)
+        self.fields = sorted({field for _, field, _, _ in string.Formatter().parse(self.text) if field})
+        # Stable across processes and runs, unlike hash()
+        self.hash = hashlib.sha256(f"{name}:{version}:{self.text}".encode("utf-8")).hexdigest()[:16]
+    
+    def render(self, **values):
+        missing = [field for field in self.fields if field not in values]
+        if missing:
+            raise KeyError(f"Prompt template '{self.name}' v{self.version} is missing values for: {', '.join(missing)}")
+        
+        prompt = RenderedPrompt(self.text.format_map(values))
+        prompt.template_name = self.name
+        prompt.template_version = self.version
+        prompt.template_hash = self.hash
+        return prompt
+    
+    def static_text(self):
+        """The template text without its placeholders (what every call pays for)."""
+        return "".join(literal for literal, _, _, _ in string.Formatter().parse(self.text))
+
+class PromptRegistry:
+    """Prompt templates shared across analyzers, keyed by name and version."""
+    
+    def __init__(self):
+        self.templates = {}
+    
+    def register(self, name, text, version=1):
+        """
+        Register a template; the latest version of a name is used by default.
+        
+        Returns:
+            PromptTemplate: The compiled template
+        """
+        
+        template = PromptTemplate(name, text, version)
+        self.templates.setdefault(name, {})[version] = template
+        return template
+    
+    def get(self, name, version=None):
+        versions = self.templates.get(name)
+        if not versions:
+            raise KeyError(f"Unknown prompt template: {name}")
+        return versions[version if version is not None else max(versions)]
+    
+    def render(self, name, version=None, **values):
+        return self.get(name, version).render(**values)
+    
+    def token_report(self):
+        """
+        Per-template token sizes, for spotting expensive templates.
+        
+        Returns:
+            list: Dicts with the template's name, version, hash, static tokens and
+                the tokens saved per call by whitespace normalization
+        """
+        
+        report = []
+        for name in sorted(self.templates):
+            for version, template in sorted(self.templates[name].items()):
+                raw_static = "".join(literal for literal, _, _, _ in string.Formatter().parse(template.raw_text))
+                tokens = estimate_tokens(template.static_text())
+                report.append({
+                    'name': name,
+                    'version': version,
+                    'hash': template.hash,
+                    'fields': template.fields,
+                    'static_tokens': tokens,
+                    'saved_tokens': estimate_tokens(raw_static) - tokens
+                })
+        return report
+
+# Registry used by the analyzers; templates are registered when their modules are imported
+PROMPTS = PromptRegistry()
+
+def main():
+    # Importing the analyzers registers their templates (in the imported module's
+    # registry, which is not this one when the file is run as a script)
+    for module in ("business_document_analyzer", "marketing_copy_generator"):
+        importlib.import_module(module)
+    registry = importlib.import_module("prompt_templates").PROMPTS
+    
+    print("🧾 PROMPT TEMPLATES")
+    print("-" * 72)
+    print(f"{'Template':<28}{'Ver':>4}  {'Hash':<18}{'Tokens':>8}{'Saved':>8}")
+    for row in registry.token_report():
+        print(f"{row['name']:<28}{row['version']:>4}  {row['hash']:<18}{row['static_tokens']:>8}{row['saved_tokens']:>8}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+import bisect
+import threading
+
+# Upper bounds (seconds) of the latency histogram buckets; the last bucket is open-ended
+LATENCY_BUCKETS = [0.05, 0.1, 0.25, 0.5, 0.75, 1, 1.5, 2, 3, 5, 7.5, 10, 15, 20, 30, 45, 60, 90, 120, float("inf")]
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram with O(1) inserts and approximate percentiles."""
+    
+    def __init__(self):
+        self.counts = [0] * len(LATENCY_BUCKETS)
+        self.total = 0
+        self.sum = 0.0
+        self.max = 0.0
+    
+    def add(self, seconds):
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.total += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+    
+    def percentile(self, p):
+        """Upper bound of the bucket holding the p-th percentile (capped at the max seen)."""
+        
+        if not self.total:
+            return 0.0
+        rank = p / 100 * self.total
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+    
+    def mean(self):
+        return self.sum / self.total if self.total else 0.0
+
+class SessionMetrics:
+    """
+    Per-feature counters maintained on insert.
+    
+    Tracks interactions, model calls, latency and time-to-first-token
+    histograms, prompt/response/cached token counts, cache hits and errors,
+    so statistics can be rendered without scanning the conversation history.
+    """
+    
+    def __init__(self):
+        self.features = {}
+        self._lock = threading.Lock()
+    
+    def _feature(self, feature):
+        if feature not in self.features:
+            self.features[feature] = {
+                'interactions': 0,
+                'calls': 0,
+                'errors': 0,
+                'cache_hits': 0,
+                'prompt_tokens': 0,
+                'response_tokens': 0,
+                'cached_tokens': 0,
+                'latency': LatencyHistogram(),
+                'time_to_first_token': LatencyHistogram()
+            }
+        return self.features[feature]
+    
+    def record_interaction(self, feature):
+        with self._lock:
+            self._feature(feature)['interactions'] += 1
+    
+    def record_call(self, feature, latency, usage=None, cache_hit=False, error=False, time_to_first_token=None):
+        """
+        Record one generate_content call.
+        
+        Args:
+            feature (str): Feature the call belongs to
+            latency (float): Wall-clock seconds for the call
+            usage: Response usage_metadata, if available
+            cache_hit (bool): Whether the call used cached context
+            error (bool): Whether the call failed
+            time_to_first_token (float): Seconds until the first streamed chunk
+        """
+        
+        with self._lock:
+            stats = self._feature(feature)
+            stats['calls'] += 1
+            stats['latency'].add(latency)
+            if time_to_first_token is not None:
+                stats['time_to_first_token'].add(time_to_first_token)
+            if error:
+                stats['errors'] += 1
+            if cache_hit:
+                stats['cache_hits'] += 1
+            if usage is not None:
+                stats['prompt_tokens'] += getattr(usage, 'prompt_token_count', 0) or 0
+                stats['response_tokens'] += getattr(usage, 'candidates_token_count', 0) or 0
+                stats['cached_tokens'] += getattr(usage, 'cached_content_token_count', 0) or 0
+    
+    def total_interactions(self):
+        with self._lock:
+            return sum(stats['interactions'] for stats in self.features.values())
+    
+    def summary(self):
+        """Return a plain-dict snapshot of the per-feature aggregates."""
+        
+        with self._lock:
+            return {
+                feature: {
+                    'interactions': stats['interactions'],
+                    'calls': stats['calls'],
+                    'errors': stats['errors'],
+                    'cache_hit_rate': stats['cache_hits'] / stats['calls'] if stats['calls'] else 0.0,
+                    'prompt_tokens': stats['prompt_tokens'],
+                    'response_tokens': stats['response_tokens'],
+                    'cached_tokens': stats['cached_tokens'],
+                    'latency_p50': stats['latency'].percentile(50),
+                    'latency_p95': stats['latency'].percentile(95),
+                    'latency_p99': stats['latency'].percentile(99),
+                    'latency_mean': stats['latency'].mean(),
+                    'time_to_first_token_p50': stats['time_to_first_token'].percentile(50)
+                }
+                for feature, stats in self.features.items()
+            }
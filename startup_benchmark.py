@@ -0,0 +1,125 @@
+import argparse
+import os
+import subprocess
+import sys
+
+# Entry point modules whose import time is tracked
+ENTRY_MODULES = [
+    "intelligent_business_chatbot",
+    "chatbot_server",
+    "document_batch_runner",
+    "business_document_analyzer",
+    "customer_sentiment_analyzer",
+    "competitive_intelligence_analyzer",
+    "intelligent_knowledge_base",
+    "marketing_copy_generator"
+]
+
+# Measures construction of the chatbot (what a user waits for before the menu appears)
+CHATBOT_STARTUP_SNIPPET = (
+    "import os, time; start = time.perf_counter(); "
+    "from intelligent_business_chatbot import IntelligentBusinessChatbot; "
+    "IntelligentBusinessChatbot(history_path=os.devnull); "
+    "print(time.perf_counter() - start)"
+)
+
+def measure_import(module, python=sys.executable):
+    """
+    Import a module in a fresh interpreter with -X importtime.
+    
+    Returns:
+        dict: Cumulative import time of the module and its heaviest dependencies (ms)
+    """
+    
+    result = subprocess.run(
+        [python, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+    if result.returncode != 0:
+        error = result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "unknown error"
+        return {'module': module, 'error': error}
+    
+    # Lines look like: "import time:       self [us] |  cumulative | imported package"
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        imports.append((name.rstrip(), int(self_us), int(cumulative_us)))
+    
+    # Nesting is shown by indentation and children are listed before their parent,
+    # so the module's direct dependencies are the one-level-deeper lines just above it
+    total_us = 0
+    children = []
+    for name, _, cumulative in imports:
+        depth = len(name) - len(name.lstrip())
+        if depth == 1:
+            if name.strip() == module:
+                total_us = cumulative
+                break
+            children = []
+        elif depth == 3:
+            children.append((name.strip(), cumulative))
+    
+    heaviest = sorted(children, key=lambda x: x[1], reverse=True)[:5]
+    
+    return {
+        'module': module,
+        'import_ms': round(total_us / 1000, 1),
+        'heaviest': [(name, round(us / 1000, 1)) for name, us in heaviest]
+    }
+
+def measure_chatbot_startup(python=sys.executable):
+    """Seconds until IntelligentBusinessChatbot() returns (i.e. until the menu can show)."""
+    
+    result = subprocess.run(
+        [python, "-c", CHATBOT_STARTUP_SNIPPET],
+        capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+    if result.returncode != 0:
+        return None
+    return float(result.stdout.strip().splitlines()[-1])
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report import and startup times of the entry points.")
+    parser.add_argument("modules", nargs="*", default=ENTRY_MODULES, help="Modules to measure")
+    parser.add_argument("--max-import-ms", type=float, default=None,
+                        help="Exit with status 1 if any module takes longer than this to import")
+    parser.add_argument("--max-startup-seconds", type=float, default=None,
+                        help="Exit with status 1 if the chatbot takes longer than this to start")
+    parser.add_argument("--skip-startup", action="store_true", help="Only measure imports")
+    args = parser.parse_args(argv)
+    
+    print("⏱️  IMPORT TIMES (python -X importtime)")
+    print("-" * 60)
+    failures = []
+    for module in args.modules:
+        stats = measure_import(module)
+        if 'error' in stats:
+            print(f"❌ {module}: {stats['error']}")
+            failures.append(module)
+            continue
+        print(f"{module}: {stats['import_ms']:.1f} ms")
+        for name, ms in stats['heaviest']:
+            print(f"    {name}: {ms:.1f} ms")
+        if args.max_import_ms is not None and stats['import_ms'] > args.max_import_ms:
+            print(f"    ⚠️  Over budget ({args.max_import_ms:.0f} ms)")
+            failures.append(module)
+    
+    if not args.skip_startup:
+        print("\n🚀 CHATBOT STARTUP")
+        print("-" * 60)
+        startup = measure_chatbot_startup()
+        if startup is None:
+            print("❌ Chatbot failed to start (is GEMINI_API_KEY set, or GEMINI_BACKEND=fake?)")
+            failures.append("chatbot startup")
+        else:
+            print(f"Time to menu: {startup:.2f}s")
+            if args.max_startup_seconds is not None and startup > args.max_startup_seconds:
+                print(f"    ⚠️  Over budget ({args.max_startup_seconds:.2f}s)")
+                failures.append("chatbot startup")
+    
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
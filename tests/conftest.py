@@ -0,0 +1,6 @@
+import os
+import sys
+
+# Tests run offline against the deterministic fake backend
+os.environ.setdefault("GEMINI_BACKEND", "fake")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
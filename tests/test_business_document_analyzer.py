@@ -0,0 +1,128 @@
+import os
+import threading
+import time
+from business_document_analyzer import (
+    BusinessDocumentAnalyzer, DocumentVersionStore, split_into_sections, parse_action_items,
+    merge_action_items, pre_extract_action_items
+)
+
+def test_split_into_sections_on_headings():
+    text = "Intro line\n\n# Revenue\nRevenue grew 10%.\n\n# Costs\nCosts fell 5%."
+    sections = split_into_sections(text, pack=False)
+    assert [s['title'] for s in sections] == ["Preamble", "Revenue", "Costs"]
+    assert "Costs fell 5%." in sections[-1]['text']
+
+def test_split_into_sections_respects_max_chars():
+    text = "# Big\n" + "\n\n".join("paragraph " * 20 for _ in range(10))
+    sections = split_into_sections(text, max_chars=500)
+    assert len(sections) > 1
+    assert all(len(s['text']) <= 500 for s in sections)
+
+def test_split_into_sections_packs_small_sections():
+    text = "# A\nOne.\n\n# B\nTwo.\n\n# C\nThree."
+    assert len(split_into_sections(text, max_chars=1000)) == 1
+    assert len(split_into_sections(text, max_chars=1000, pack=False)) == 3
+
+def test_parse_action_items_skips_header_only():
+    text = (
+        "Action Item | Owner | Deadline | Priority\n"
+        "---|---|---|---\n"
+        "Action plan for Q3 rollout | Lisa | Q3 2025 | high\n"
+        "Send report | N/A | N/A | urgent\n"
+    )
+    items = parse_action_items(text)
+    assert [i['action'] for i in items] == ["Action plan for Q3 rollout", "Send report"]
+    assert items[0]['priority'] == "High"
+    assert items[1] == {'action': "Send report", 'owner': "", 'deadline': "", 'priority': "Medium"}
+
+def test_merge_action_items_keeps_highest_priority_and_fills_fields():
+    merged = merge_action_items([
+        [{'action': "Send the report.", 'owner': "", 'deadline': "July 25", 'priority': "Low"}],
+        [{'action': "send the report", 'owner': "Mike", 'deadline': "", 'priority': "High"}]
+    ])
+    assert merged == [{'action': "Send the report.", 'owner': "Mike", 'deadline': "July 25", 'priority': "High"}]
+
+def test_pre_extract_action_items_finds_owner_deadline_and_amount():
+    text = (
+        "Attendees: Mike Rodriguez (CFO)\n"
+        "- Mike to provide detailed cost analysis by July 25th for the $50K budget\n"
+    )
+    candidates = pre_extract_action_items(text)
+    assert len(candidates) == 1
+    assert candidates[0]['owner'] == "Mike Rodriguez (CFO)"
+    assert candidates[0]['deadline'] == "July 25th"
+    assert candidates[0]['amounts'] == ["$50K"]
+
+def test_pre_extract_action_items_skips_status_and_recommendation_sentences():
+    text = (
+        "Attendees: Lisa Wang (CTO), John Davis (VP Sales)\n"
+        "- Lisa recommended allocating $200K for system modernization\n"
+        "- Partnership with TechCorp progressing well, contract signing expected by month-end\n"
+        "- Revenue will grow 10% next quarter\n"
+        "- John to implement new customer success program by August 15th\n"
+        "- Board approval needed for additional engineering budget\n"
+    )
+    actions = [c['action'] for c in pre_extract_action_items(text)]
+    assert actions == [
+        "Implement new customer success program",
+        "Board approval needed for additional engineering budget"
+    ]
+
+def test_document_version_store_diff_update_and_save(tmp_path):
+    path = str(tmp_path / "versions.json")
+    store = DocumentVersionStore(path)
+    assert store.update("doc", [{'title': "A"}, {'title': "B"}], ["h1", "h2"]) == 1
+    assert store.update("doc", [{'title': "A"}, {'title': "B"}], ["h1", "h2"]) == 1
+    assert store.diff("doc", ["h1", "h3"]) == {'added': [1], 'unchanged': [0], 'removed': 1}
+    assert store.update("doc", [{'title': "A"}, {'title': "C"}], ["h1", "h3"]) == 2
+    store.set_result("comprehensive", "h1", "notes")
+    store.save()
+    
+    reloaded = DocumentVersionStore(path)
+    assert reloaded.documents["doc"]['version'] == 2
+    assert reloaded.get_result("comprehensive", "h1") == "notes"
+    assert not os.path.exists(path + ".tmp")
+
+def test_document_version_store_evicts_oldest_results():
+    store = DocumentVersionStore(max_results=2)
+    for i in range(3):
+        store.set_result("financial", f"h{i}", str(i))
+    assert store.get_result("financial", "h0") is None
+    assert store.get_result("financial", "h2") == "2"
+
+def test_analyze_document_revision_persists_version_on_cached_result(tmp_path):
+    path = str(tmp_path / "versions.json")
+    analyzer = BusinessDocumentAnalyzer(use_context_cache=False, version_store=DocumentVersionStore(path))
+    text = "# Revenue\nRevenue grew 10%.\n\n# Costs\nCosts fell 5%."
+    analyzer.analyze_document_revision("q3", text)
+    analyzer.analyze_document_revision("q3", text + "\n\n# Hiring\nTwo engineers joined.")
+    # Back to the first text: the full result is cached, but this is still a new version
+    analyzer.analyze_document_revision("q3", text)
+    assert analyzer.last_revision_stats['reanalyzed_sections'] == 0
+    assert DocumentVersionStore(path).documents["q3"]['version'] == 3
+
+def test_analyze_document_multi_shares_one_cached_context_and_runs_concurrently():
+    analyzer = BusinessDocumentAnalyzer(min_cache_tokens=100)
+    document = "# Revenue\n" + "Q3 revenue reached $2.3M, up 18% on Q2. Mike to send the cost analysis by July 25. " * 40
+    generate = analyzer.context_cache.generate
+    lock = threading.Lock()
+    in_flight = []
+    peak = []
+    
+    def slow_generate(key, prompt, **kwargs):
+        with lock:
+            in_flight.append(key)
+            peak.append(len(in_flight))
+        time.sleep(0.1)
+        with lock:
+            in_flight.pop()
+        return generate(key, prompt, **kwargs)
+    
+    analyzer.context_cache.generate = slow_generate
+    results = analyzer.analyze_document_multi(document, types=("financial", "strategic", "operational"))
+    
+    assert set(results) == {"financial", "strategic", "operational", "action_items"}
+    assert all(results.values())
+    metrics = analyzer.get_cache_metrics()
+    assert (metrics['registrations'], metrics['cached_calls']) == (1, 4)
+    assert max(peak) == 4
@@ -0,0 +1,92 @@
+import asyncio
+import json
+import threading
+from chatbot_server import ChatbotServer
+from intelligent_business_chatbot import FeatureArgumentError, IntelligentBusinessChatbot
+
+class StubChatbot:
+    """Just enough of IntelligentBusinessChatbot for the server, with no model calls."""
+    
+    def __init__(self, knowledge_base=(), kb_ready=True):
+        self.knowledge_base = list(knowledge_base)
+        self.knowledge_base_state = 'ready' if knowledge_base else 'failed'
+        self.knowledge_base_ready = threading.Event()
+        if kb_ready:
+            self.knowledge_base_ready.set()
+    
+    def knowledge_base_status(self):
+        return {'state': self.knowledge_base_state, 'documents': len(self.knowledge_base)}
+    
+    def run_feature(self, feature, args):
+        if 'query' not in args and feature == 'business_assistant':
+            raise FeatureArgumentError("Missing argument: query")
+        if args.get('explode'):
+            raise ValueError("internal SDK error")
+        return {'output': f"ran {feature}"}
+
+def request(chatbot, raw):
+    async def go():
+        server = ChatbotServer(chatbot=chatbot)
+        await server.start("127.0.0.1", 0)
+        port = server.server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(raw)
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+        server.server.close()
+        await server.server.wait_closed()
+        head, _, body = response.partition(b"\r\n\r\n")
+        return int(head.split()[1]), json.loads(body)
+    return asyncio.run(go())
+
+def post(path, body):
+    return f"POST {path} HTTP/1.1\r\nContent-Length: {len(body)}\r\n\r\n".encode("latin-1") + body
+
+def test_features_without_knowledge_base_run_when_it_failed():
+    status, payload = request(StubChatbot(), post("/v1/sentiment", b'{"feedback": "Great"}'))
+    assert status == 200 and payload['output'] == "ran sentiment"
+    status, payload = request(StubChatbot(), b"GET /readyz HTTP/1.1\r\n\r\n")
+    assert status == 200 and payload['knowledge_base']['state'] == 'failed'
+
+def test_kb_qa_waits_for_knowledge_base():
+    status, payload = request(StubChatbot(kb_ready=False), post("/v1/kb-qa", b'{"question": "Budget?"}'))
+    assert status == 503 and "loading" in payload['error']
+    status, _ = request(StubChatbot(), post("/v1/kb-qa", b'{"question": "Budget?"}'))
+    assert status == 503
+    status, _ = request(StubChatbot(knowledge_base=[{'id': 1}]), post("/v1/kb-qa", b'{"question": "Budget?"}'))
+    assert status == 200
+
+def test_malformed_requests_get_400():
+    assert request(StubChatbot(), b"GARBAGE\r\n\r\n")[0] == 400
+    assert request(StubChatbot(), b"POST /v1/sentiment HTTP/1.1\r\nContent-Length: abc\r\n\r\n")[0] == 400
+    assert request(StubChatbot(), post("/v1/sentiment", b'{"feedback": "\xff\xfe"}'))[0] == 400
+    assert request(StubChatbot(), post("/v1/sentiment", b'[1, 2]'))[0] == 400
+
+def test_argument_errors_are_400_and_internal_errors_500():
+    assert request(StubChatbot(), post("/v1/business-assistant", b'{}'))[0] == 400
+    status, payload = request(StubChatbot(), post("/v1/sentiment", b'{"feedback": "x", "explode": true}'))
+    assert status == 500 and "ValueError" in payload['error']
+
+def test_real_chatbot_features_through_the_server(tmp_path):
+    chatbot = IntelligentBusinessChatbot(history_path=str(tmp_path / "history.jsonl"),
+                                         kb_snapshot_path=str(tmp_path / "kb.json"))
+    assert chatbot.wait_for_knowledge_base(10)
+    
+    status, payload = request(chatbot, post("/v1/kb-qa", b'{"question": "What is the budget approval process?"}'))
+    assert status == 200 and payload['output']
+    assert "FINANCE-001" in [source['id'] for source in payload['sources']]
+    
+    body = json.dumps({'feedback_items': ["Love the new AI features!", "App crashes on mobile."]}).encode()
+    status, payload = request(chatbot, post("/v1/sentiment", body))
+    assert status == 200 and payload['output']
+    
+    body = json.dumps({'product_name': "DataFlow Pro", 'features': ["Dashboards"], 'copy_type': "email"}).encode()
+    status, payload = request(chatbot, post("/v1/marketing-copy", body))
+    assert status == 200 and payload['output']
+    
+    status, payload = request(chatbot, post("/v1/feature-comparison", b'{"our_product": "DataFlow Pro"}'))
+    assert status == 400 and "competitor_product" in payload['error']
+    assert [entry['feature'] for entry in chatbot.conversation_history] == [
+        'Knowledge Base Q&A', 'Sentiment Analysis', 'Marketing Copy Generation'
+    ]
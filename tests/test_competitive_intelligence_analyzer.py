@@ -0,0 +1,176 @@
+import time
+from datetime import datetime
+import pytest
+from competitive_intelligence_analyzer import (
+    CompetitiveIntelligenceAnalyzer, IntelligenceStore, MetricsStore, compute_metric_trends, fit_items_to_budget,
+    parse_metric_value, run_stage_graph
+)
+from fake_backend import estimate_tokens
+from feed_ingestion import parse_feed
+
+def make_item(title, content="", source="TechCrunch", url=None):
+    return {'source': source, 'title': title, 'date': '2025-04-01', 'content': content, 'url': url}
+
+def test_store_deduplicates_by_content_and_by_source_title():
+    store = IntelligenceStore()
+    first, is_new = store.add(make_item("Acme launches AI", "Acme  launched an AI assistant."))
+    assert is_new
+    assert store.add(make_item("Acme ships assistant", "acme launched an AI assistant.")) == (first, False)
+    assert store.add(make_item("Acme launches AI", "Updated: Acme launched an AI assistant.")) == (first, False)
+
+def test_items_without_content_get_distinct_ids():
+    store = IntelligenceStore()
+    new_ids = store.add_items([
+        make_item("Acme raises Series C", url="https://example.com/a"),
+        make_item("Globex cuts prices", url="https://example.com/b"),
+        make_item("Initech hires CTO", source="Reuters")
+    ])
+    assert len(set(new_ids)) == 3
+
+def test_untitled_items_from_one_source_are_not_duplicates():
+    store = IntelligenceStore()
+    untitled = [make_item("N/A", "Acme opened an office in Berlin."), make_item("N/A", "Acme cut prices by 10%."),
+                make_item("", url="https://example.com/1"), make_item("N/A", url="https://example.com/2")]
+    assert len(store.add_items(untitled)) == 4
+    # The same untitled link is still recognized
+    assert store.add(make_item("N/A", "Different text", url="https://example.com/2"))[1] is False
+
+def test_untitled_feed_entries_are_all_stored():
+    rss = """<rss><channel><title>Wire</title>
+    <item><description>Acme opened an office in Berlin.</description><link>https://example.com/1</link></item>
+    <item><description>Acme cut prices by 10%.</description><link>https://example.com/2</link></item>
+    </channel></rss>"""
+    items = parse_feed(rss, "https://example.com/feed.xml")
+    assert [item['title'] for item in items] == ["N/A", "N/A"]
+    assert len(IntelligenceStore().add_items(items)) == 2
+
+def test_store_round_trips_through_json(tmp_path):
+    path = tmp_path / "intel.json"
+    store = IntelligenceStore(str(path))
+    item_id, _ = store.add(make_item("Acme launches AI", "Acme launched an AI assistant."))
+    store.set_analysis(item_id, {'urgency': 'High', 'finding': 'Launch'})
+    store.save()
+    
+    reloaded = IntelligenceStore(str(path))
+    assert reloaded.get(item_id)['analysis'] == {'urgency': 'High', 'finding': 'Launch'}
+    assert reloaded.add(make_item("Acme launches AI", "Other text")) == (item_id, False)
+
+def test_failed_item_analyses_stay_pending():
+    analyzer = CompetitiveIntelligenceAnalyzer()
+    analyzer.ingest_items([make_item("Acme launches AI", "Acme launched an AI assistant."),
+                           make_item("Globex cuts prices", "Globex cut prices by 20%.")])
+    real_analyze = analyzer.analyze_item
+    
+    def flaky_analyze(item):
+        if "Globex" in item['title']:
+            raise RuntimeError("quota exceeded")
+        return real_analyze(item)
+    
+    analyzer.analyze_item = flaky_analyze
+    assert analyzer.analyze_new_items() == 1
+    assert [failure['title'] for failure in analyzer.last_analysis_failures] == ["Globex cuts prices"]
+    assert [item['title'] for item in analyzer.store.unanalyzed()] == ["Globex cuts prices"]
+    
+    analyzer.analyze_item = real_analyze
+    assert analyzer.analyze_new_items() == 1
+    assert analyzer.store.unanalyzed() == []
+
+def test_parse_metric_value_handles_formatted_strings():
+    assert parse_metric_value(380000) == 380000.0
+    assert parse_metric_value("12%") == 12.0
+    assert parse_metric_value("$2M") == 2_000_000.0
+    assert parse_metric_value("$1,250.5k") == 1_250_500.0
+    assert parse_metric_value("4.2/5") == 4.2
+    assert parse_metric_value("strong") is None
+    assert parse_metric_value(True) is None
+
+def test_metrics_frame_accepts_mixed_timestamp_formats():
+    store = MetricsStore()
+    store.record("RivalCorp", {'users': 100, 'churn': "4%"}, "2025-04-01")
+    store.record("RivalCorp", {'users': 120, 'churn': "3.5%"}, "2025-05-01T09:30:00")
+    store.record("RivalCorp", {'users': 150, 'churn': "3%"})
+    # Older stores may hold unnormalized timestamps
+    store.series["RivalCorp"]['timestamp'][0] = "2025-04-01"
+    
+    frame = store.frame("RivalCorp")
+    assert list(frame['users']) == [100.0, 120.0, 150.0]
+    assert frame.index[-1].date() == datetime.now().date()
+    assert compute_metric_trends(frame)['churn']['latest'] == 3.0
+
+def test_metrics_store_round_trips_through_json(tmp_path):
+    path = tmp_path / "metrics.json"
+    store = MetricsStore(str(path))
+    store.record("RivalCorp", {'users': 100}, "2025-04-01")
+    store.save()
+    store.record("RivalCorp", {'users': 120}, "2025-05-01")
+    store.save()
+    
+    assert list(MetricsStore(str(path)).frame("RivalCorp")['users']) == [100.0, 120.0]
+    assert [p.name for p in tmp_path.iterdir()] == ["metrics.json"]
+
+def test_non_numeric_metrics_reach_the_prompt():
+    analyzer = CompetitiveIntelligenceAnalyzer()
+    prompts = []
+    generate = analyzer.model.generate_content
+    analyzer.model.generate_content = lambda prompt: prompts.append(prompt) or generate(prompt)
+    
+    analyzer.track_competitor_metrics("RivalCorp", {'revenue': "$2M", 'sentiment': "mostly positive"}, "2025-04-01")
+    assert analyzer.last_metric_trends['skipped'] == {'sentiment': "mostly positive"}
+    assert "- revenue: 2,000,000.00" in prompts[0]
+    assert "- sentiment: mostly positive" in prompts[0]
+
+def test_fit_items_to_budget_truncates_an_oversized_cluster():
+    items = [make_item(f"Acme update {i}", "Acme expanded into a new market segment. " * 40) for i in range(3)]
+    kept, block = fit_items_to_budget(items, 500)
+    assert len(kept) == 1 and estimate_tokens(block) <= 500
+    
+    kept, block = fit_items_to_budget(items, 120)
+    assert kept == items[:1] and block.endswith(" ...") and estimate_tokens(block) <= 120
+    assert fit_items_to_budget(items, 5) == ([], "")
+
+def test_clustered_analysis_respects_the_token_budget():
+    analyzer = CompetitiveIntelligenceAnalyzer(cluster_min_items=2)
+    items = [make_item(f"Acme launch coverage {i}", f"Acme launched product line {i}. " * 60) for i in range(4)]
+    analyzer.analyze_clustered_content(items, token_budget=300)
+    stats = analyzer.last_cluster_stats
+    assert stats['prompt_tokens'] <= 300
+    assert stats['analyzed_clusters'] == 1 and stats['truncated_clusters'] == 1
+
+def test_stage_graph_overlaps_independent_stages():
+    spans = {}
+    
+    def stage(name, result):
+        def run(deps):
+            started = time.perf_counter()
+            time.sleep(0.1)
+            spans[name] = (started, time.perf_counter())
+            return result(deps)
+        return run
+    
+    results, timings = run_stage_graph({
+        'analysis': ((), stage('analysis', lambda deps: "analysis")),
+        'insights': (('analysis',), stage('insights', lambda deps: deps['analysis'] + " -> insights")),
+        'summary': (('analysis',), stage('summary', lambda deps: deps['analysis'] + " -> summary"))
+    })
+    
+    assert results == {'analysis': "analysis", 'insights': "analysis -> insights", 'summary': "analysis -> summary"}
+    assert spans['insights'][0] >= spans['analysis'][1] and spans['summary'][0] >= spans['analysis'][1]
+    # The two independent stages run at the same time
+    assert spans['insights'][0] < spans['summary'][1] and spans['summary'][0] < spans['insights'][1]
+    assert set(timings) == {'analysis', 'insights', 'summary'}
+
+def test_stage_graph_rejects_missing_dependencies_and_cycles():
+    with pytest.raises(ValueError, match="unknown stage"):
+        run_stage_graph({'insights': (('analysis',), lambda deps: None)})
+    with pytest.raises(ValueError, match="cycle"):
+        run_stage_graph({
+            'start': ((), lambda deps: None),
+            'a': (('b',), lambda deps: None),
+            'b': (('a',), lambda deps: None)
+        })
+
+def test_competitive_report_records_stage_timings():
+    analyzer = CompetitiveIntelligenceAnalyzer()
+    report = analyzer.generate_competitive_report([make_item("Acme launches AI", "Acme launched an AI assistant.")])
+    assert "Acme launches AI" in report
+    assert set(analyzer.last_stage_timings) == {'analysis', 'insights', 'summary', 'total'}
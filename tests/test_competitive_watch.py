@@ -0,0 +1,72 @@
+from competitive_intelligence_analyzer import CompetitiveIntelligenceAnalyzer
+from competitive_watch import CompetitiveWatch, NoveltyIndex
+
+STORY = "Acme Corp raised a 50 million dollar Series C round led by Example Ventures to expand into Europe"
+
+class StubFetcher:
+    """Serves a fixed list of items per cycle in place of real feeds."""
+    
+    def __init__(self, cycles):
+        self.cycles = list(cycles)
+    
+    async def fetch_all(self, urls):
+        items = self.cycles.pop(0) if self.cycles else []
+        return [{'url': urls[0], 'status': 'ok', 'items': items}]
+    
+    def commit_state(self, results):
+        pass
+
+def make_item(title, content):
+    return {'source': 'Wire', 'title': title, 'date': '2025-04-01', 'content': content, 'url': None}
+
+def make_watch(cycles, tmp_path, **kwargs):
+    return CompetitiveWatch(CompetitiveIntelligenceAnalyzer(), ["https://example.com/feed"], StubFetcher(cycles),
+                            alerts_path=str(tmp_path / "alerts.jsonl"), **kwargs)
+
+def test_novelty_of_reworded_and_unrelated_stories():
+    index = NoveltyIndex()
+    assert index.novelty(STORY) == 1.0
+    index.add(STORY)
+    assert index.novelty(STORY) == 0.0
+    assert index.novelty(STORY.replace("Europe", "Asia")) < 0.2
+    assert index.novelty("Globex cut enterprise pricing by a fifth for new customers") == 1.0
+    assert index.novelty("") == 0.0
+
+def test_repeats_within_a_cycle_are_not_material(tmp_path):
+    watch = make_watch([[make_item("Acme raises Series C", STORY), make_item("Acme funding", STORY + " this year")]], tmp_path)
+    summary = watch.run_once()
+    assert summary['new_items'] == 2
+    assert summary['material_items'] == 1 and summary['alerted']
+
+def test_failed_analyses_are_retried_next_cycle(tmp_path):
+    watch = make_watch([[make_item("Acme raises Series C", STORY)], []], tmp_path)
+    analyze = watch.analyzer.analyze_item
+    
+    def failing(item):
+        raise RuntimeError("quota exceeded")
+    
+    watch.analyzer.analyze_item = failing
+    summary = watch.run_once()
+    assert summary['failed_analyses'] == 1 and not summary['alerted']
+    
+    watch.analyzer.analyze_item = analyze
+    summary = watch.run_once()
+    assert summary['material_items'] == 1 and summary['alerted'] and summary['failed_analyses'] == 0
+    assert watch.analyzer.store.unanalyzed() == []
+
+def test_run_forever_survives_a_failed_cycle_and_bounds_history(tmp_path, monkeypatch):
+    watch = make_watch([], tmp_path, max_cycle_history=2)
+    run_once = watch.run_once
+    calls = []
+    
+    def flaky_run_once():
+        calls.append(1)
+        if len(calls) == 1:
+            raise OSError("store unavailable")
+        return run_once()
+    
+    watch.run_once = flaky_run_once
+    monkeypatch.setattr("competitive_watch.time.sleep", lambda seconds: None)
+    watch.run_forever(interval_seconds=0, max_cycles=4)
+    assert len(calls) == 4
+    assert len(watch.cycles) == 2
@@ -0,0 +1,54 @@
+import threading
+import time
+from context_cache import LocalContextCache, document_key
+from fake_backend import FakeGenerativeModel
+
+DOCUMENT = "Quarterly revenue and cost review. " * 100
+
+class CountingCache(LocalContextCache):
+    def __init__(self, *args, fail=False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.created = 0
+        self.fail = fail
+    
+    def _create(self, document_text):
+        time.sleep(0.05)
+        self.created += 1
+        if self.fail:
+            raise RuntimeError("quota exceeded")
+        return document_text
+
+def test_small_documents_are_not_cached():
+    cache = LocalContextCache(FakeGenerativeModel(), min_tokens=4096)
+    assert cache.register("short") is None
+
+def test_concurrent_registrations_create_one_entry():
+    cache = CountingCache(FakeGenerativeModel(), min_tokens=10)
+    keys = []
+    threads = [threading.Thread(target=lambda: keys.append(cache.register(DOCUMENT))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert keys == [document_key(DOCUMENT)] * 5
+    assert cache.created == 1
+    metrics = cache.get_metrics()
+    assert metrics['registrations'] == 1
+    assert metrics['reused_registrations'] == 4
+
+def test_failed_creation_falls_back_to_inline():
+    cache = CountingCache(FakeGenerativeModel(), min_tokens=10, fail=True)
+    assert cache.register(DOCUMENT) is None
+    assert cache.lookup(DOCUMENT) is None
+    assert cache.get_metrics()['failed_registrations'] == 1
+
+def test_tokens_saved_counts_reads_net_of_upload():
+    cache = LocalContextCache(FakeGenerativeModel(), min_tokens=10)
+    key = cache.register(DOCUMENT)
+    cache.generate(key, "Summarize.")
+    assert cache.get_metrics()['tokens_saved'] == 0
+    cache.generate(key, "List risks.")
+    metrics = cache.get_metrics()
+    assert metrics['cached_calls'] == 2
+    assert metrics['tokens_saved'] == metrics['tokens_uploaded']
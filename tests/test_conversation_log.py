@@ -0,0 +1,37 @@
+import os
+from datetime import datetime
+from conversation_log import ConversationLog
+from session_metrics import SessionMetrics
+
+def test_default_paths_are_unique_within_a_second(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    first, second = ConversationLog(), ConversationLog()
+    assert first.path != second.path
+    first.close()
+    second.close()
+
+def test_continued_log_rebuilds_counters_and_recent_window(tmp_path):
+    path = str(tmp_path / "session.jsonl")
+    log = ConversationLog(path, max_in_memory=2)
+    for feature in ("Sentiment Analysis", "Sentiment Analysis", "Knowledge Base Q&A"):
+        log.append({'timestamp': datetime(2025, 7, 1), 'feature': feature, 'input': "in", 'output': "out"})
+    log.close()
+    
+    metrics = SessionMetrics()
+    reloaded = ConversationLog(path, max_in_memory=2, on_append=lambda e: metrics.record_interaction(e['feature']))
+    assert len(reloaded) == 3
+    assert [e['feature'] for e in reloaded.recent()] == ["Sentiment Analysis", "Knowledge Base Q&A"]
+    assert metrics.total_interactions() == 3
+    assert reloaded.recent()[0]['timestamp'] == datetime(2025, 7, 1)
+    reloaded.close()
+
+def test_export_from_checkpoint(tmp_path):
+    log = ConversationLog(str(tmp_path / "session.jsonl"))
+    for i in range(3):
+        log.append({'timestamp': datetime.now(), 'feature': "F", 'input': str(i), 'output': "o"})
+    out = str(tmp_path / "delta.jsonl")
+    assert log.export(out, start=1) == 3
+    with open(out, encoding='utf-8') as f:
+        assert len(f.readlines()) == 2
+    log.close()
+    assert os.path.exists(log.path)
@@ -0,0 +1,65 @@
+import threading
+import time
+import pytest
+from config import GeminiConfig
+from conversation_memory import ConversationMemory
+from fake_backend import estimate_tokens
+
+def make_memory(generate=lambda prompt: "Summary of earlier budget talk.", **kwargs):
+    return ConversationMemory(GeminiConfig(), generate, **kwargs)
+
+@pytest.mark.parametrize("token_budget", [40, 75, 200, 333, 1500])
+def test_context_stays_within_token_budget(token_budget):
+    memory = make_memory(lambda prompt: "Summary of earlier budget talk. " * 40, token_budget=token_budget,
+                         recent_turns=2, fold_every=2)
+    for i in range(10):
+        memory.add_turn(f"Question {i} about pricing strategy?", f"Answer {i} about pricing tiers. " * 20)
+    memory.flush()
+    context = memory.build_context("pricing tiers")
+    assert estimate_tokens(context) <= token_budget
+    assert "Summary of earlier conversation" in context
+
+def test_context_includes_retrieved_and_recent_turns():
+    memory = make_memory(token_budget=400, recent_turns=1, fold_every=100)
+    memory.add_turn("What discount do resellers get?", "Resellers get a 20% discount on annual plans.")
+    memory.add_turn("How long is onboarding?", "Onboarding takes two weeks.")
+    memory.add_turn("Who signs off on hires?", "The department head.")
+    memory.flush()
+    context = memory.build_context("reseller discount")
+    assert "Relevant earlier exchanges:\nUser: What discount do resellers get?" in context
+    assert context.endswith("Most recent exchanges:\nUser: Who signs off on hires?\nAssistant: The department head.")
+    assert estimate_tokens(context) <= 400
+
+def test_folding_runs_off_the_calling_thread():
+    release = threading.Event()
+    callers = []
+    
+    def slow_generate(prompt):
+        callers.append(threading.current_thread())
+        release.wait(5)
+        return "summary"
+    
+    memory = make_memory(slow_generate, recent_turns=1, fold_every=1)
+    started = time.perf_counter()
+    memory.add_turn("q1", "a1")
+    memory.add_turn("q2", "a2")
+    assert time.perf_counter() - started < 1
+    release.set()
+    memory.flush()
+    assert callers and threading.current_thread() not in callers
+    assert memory.summary == "summary"
+
+def test_archive_is_bounded():
+    memory = make_memory(recent_turns=1, fold_every=100, max_archived_turns=3)
+    for i in range(10):
+        memory.add_turn(f"q{i}", f"a{i}")
+    memory.flush()
+    assert [turn['question'] for turn in memory.archive] == ["q6", "q7", "q8"]
+
+def test_clear_discards_background_work():
+    memory = make_memory(recent_turns=1, fold_every=1)
+    memory.add_turn("q1", "a1")
+    memory.add_turn("q2", "a2")
+    memory.clear()
+    memory.flush()
+    assert memory.get_stats()['archived_turns'] == 0
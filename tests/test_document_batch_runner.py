@@ -0,0 +1,17 @@
+import os
+from document_batch_runner import iter_document_paths, result_filename
+
+def test_result_filename_is_unique_per_input_root(tmp_path):
+    for root in ("a", "b"):
+        (tmp_path / root).mkdir()
+        (tmp_path / root / "q1.txt").write_text("Revenue grew.")
+    
+    documents = list(iter_document_paths([str(tmp_path / "a"), str(tmp_path / "b")]))
+    assert [relative for _, relative in documents] == ["q1.txt", "q1.txt"]
+    names = {result_filename(relative, path) for path, relative in documents}
+    assert len(names) == 2
+
+def test_result_filename_has_no_path_components():
+    name = result_filename(os.path.join("..", "reports", "q1.md"), "/data/reports/q1.md")
+    assert os.sep not in name and "/" not in name and ".." not in name
+    assert name.startswith("___reports__q1.md.") and name.endswith(".json")
@@ -0,0 +1,72 @@
+import pytest
+from competitive_intelligence_analyzer import CompetitiveIntelligenceAnalyzer
+from feed_fixture_server import FixtureFeeds, start_fixture_server
+from feed_ingestion import FeedFetcher, ingest_feeds
+
+@pytest.fixture
+def fixture_feeds():
+    feeds = FixtureFeeds()
+    server, feeds, base_url = start_fixture_server(feeds=feeds)
+    yield feeds, [f"{base_url}{path}" for path in feeds.items]
+    server.shutdown()
+
+def test_unchanged_feeds_are_not_downloaded_again(fixture_feeds, tmp_path):
+    feeds, urls = fixture_feeds
+    analyzer = CompetitiveIntelligenceAnalyzer()
+    fetcher = FeedFetcher(str(tmp_path / "state.json"))
+    
+    first = ingest_feeds(analyzer, urls, fetcher)
+    assert (first['fetched'], first['not_modified'], len(first['new_item_ids'])) == (3, 0, 4)
+    
+    # A new fetcher picks up the persisted validators
+    fetcher = FeedFetcher(str(tmp_path / "state.json"))
+    second = ingest_feeds(analyzer, urls, fetcher)
+    assert (second['fetched'], second['not_modified'], second['items_seen']) == (0, 3, 0)
+    assert feeds.requests['not_modified'] == 3
+    fetcher.close()
+
+def test_only_new_items_are_stored_across_polls(fixture_feeds):
+    feeds, urls = fixture_feeds
+    analyzer = CompetitiveIntelligenceAnalyzer()
+    fetcher = FeedFetcher()
+    ingest_feeds(analyzer, urls, fetcher)
+    
+    feeds.add_item('/rivalcorp/rss.xml', {
+        'title': 'RivalCorp cuts enterprise pricing',
+        'date': '2025-07-20',
+        'content': 'RivalCorp cut enterprise plan prices by 15% for new customers.',
+        'url': 'https://rivalcorp.example/news/pricing'
+    })
+    summary = ingest_feeds(analyzer, urls, fetcher)
+    assert (summary['fetched'], summary['not_modified'], summary['items_seen']) == (1, 2, 3)
+    assert [analyzer.store.get(item_id)['title'] for item_id in summary['new_item_ids']] == ["RivalCorp cuts enterprise pricing"]
+    assert len(analyzer.store.all_items()) == 5
+    fetcher.close()
+
+def test_requests_per_host_are_limited(fixture_feeds):
+    feeds, urls = fixture_feeds
+    feeds.delay = 0.2
+    fetcher = FeedFetcher(per_host_limit=2)
+    ingest_feeds(CompetitiveIntelligenceAnalyzer(), [f"{url}?copy={i}" for url in urls for i in range(2)], fetcher)
+    assert feeds.requests['total'] == 6
+    assert feeds.requests['max_in_flight'] == 2
+    fetcher.close()
+
+def test_validators_are_kept_only_after_items_are_stored(fixture_feeds, tmp_path):
+    feeds, urls = fixture_feeds
+    state_path = tmp_path / "state.json"
+    analyzer = CompetitiveIntelligenceAnalyzer()
+    fetcher = FeedFetcher(str(state_path))
+    
+    def failing_ingest(items):
+        raise OSError("disk full")
+    
+    analyzer.ingest_items = failing_ingest
+    with pytest.raises(OSError):
+        ingest_feeds(analyzer, urls, fetcher)
+    assert fetcher.state == {} and not state_path.exists()
+    
+    del analyzer.ingest_items
+    summary = ingest_feeds(analyzer, urls, fetcher)
+    assert (summary['fetched'], len(summary['new_item_ids'])) == (3, 4)
+    fetcher.close()
@@ -0,0 +1,174 @@
+import json
+import os
+import threading
+import time
+import pytest
+from config import GeminiConfig
+from fake_backend import FakeResponse
+from intelligent_business_chatbot import IntelligentBusinessChatbot
+
+EXAMPLE_REQUESTS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "batch_requests.example.jsonl")
+
+def make_chatbot(tmp_path, snapshot="kb.json"):
+    chatbot = IntelligentBusinessChatbot(history_path=str(tmp_path / "history.jsonl"),
+                                         kb_snapshot_path=str(tmp_path / snapshot))
+    # The refresh holds this lock until the warm-up thread has finished
+    with chatbot._kb_refresh_lock:
+        pass
+    return chatbot
+
+def failing_embed(self, content, task_type="RETRIEVAL_DOCUMENT"):
+    raise RuntimeError("embedding quota exceeded")
+
+def test_snapshot_is_reused_on_the_next_start(tmp_path):
+    first = make_chatbot(tmp_path)
+    assert first.knowledge_base_status()['state'] == 'ready'
+    assert (first.last_kb_refresh['reused'], first.last_kb_refresh['embedded']) == (0, 4)
+    
+    second = make_chatbot(tmp_path)
+    assert (second.last_kb_refresh['reused'], second.last_kb_refresh['embedded']) == (4, 0)
+    assert second.run_feature('kb_qa', {'question': "How many days can I work remotely?"})['sources']
+
+def test_snapshot_from_another_embedding_model_is_rebuilt(tmp_path):
+    make_chatbot(tmp_path)
+    path = tmp_path / "kb.json"
+    snapshot = json.loads(path.read_text(encoding="utf-8"))
+    snapshot['embedding_model'] = "models/older-embedding-model"
+    path.write_text(json.dumps(snapshot), encoding="utf-8")
+    
+    chatbot = make_chatbot(tmp_path)
+    assert (chatbot.last_kb_refresh['reused'], chatbot.last_kb_refresh['embedded']) == (0, 4)
+    assert json.loads(path.read_text(encoding="utf-8"))['embedding_model'] == chatbot.embedding_model
+
+def test_failed_embedding_reports_failure_without_saving_a_snapshot(tmp_path, monkeypatch):
+    monkeypatch.setattr(GeminiConfig, "embed_content", failing_embed)
+    chatbot = make_chatbot(tmp_path)
+    assert chatbot.knowledge_base_status()['state'] == 'failed'
+    assert chatbot.knowledge_base_status()['documents'] == 0
+    assert not (tmp_path / "kb.json").exists()
+    with pytest.raises(RuntimeError, match="unavailable"):
+        chatbot.run_feature('kb_qa', {'question': "What is the budget approval process?"})
+
+def test_partial_refresh_keeps_the_complete_snapshot(tmp_path, monkeypatch):
+    make_chatbot(tmp_path)
+    path = tmp_path / "kb.json"
+    snapshot = json.loads(path.read_text(encoding="utf-8"))
+    snapshot['documents'][0]['content_hash'] = "stale"
+    path.write_text(json.dumps(snapshot), encoding="utf-8")
+    
+    monkeypatch.setattr(GeminiConfig, "embed_content", failing_embed)
+    chatbot = make_chatbot(tmp_path)
+    assert chatbot.knowledge_base_status()['state'] == 'ready'
+    assert chatbot.last_kb_refresh['failed'] == 1 and len(chatbot.knowledge_base) == 3
+    assert json.loads(path.read_text(encoding="utf-8")) == snapshot
+
+def test_empty_snapshot_is_not_served_as_ready(tmp_path, monkeypatch):
+    (tmp_path / "kb.json").write_text(json.dumps({'embedding_model': GeminiConfig().get_embeddings_model(),
+                                                  'documents': []}), encoding="utf-8")
+    monkeypatch.setattr(GeminiConfig, "embed_content", failing_embed)
+    chatbot = make_chatbot(tmp_path)
+    assert chatbot.knowledge_base_status()['state'] == 'failed'
+
+def write_requests(path, lines):
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return str(path)
+
+def test_run_batch_runs_the_example_requests(tmp_path):
+    chatbot = make_chatbot(tmp_path)
+    summary = chatbot.run_batch(EXAMPLE_REQUESTS, str(tmp_path / "results.jsonl"), workers=4)
+    records = [json.loads(line) for line in (tmp_path / "results.jsonl").read_text(encoding="utf-8").splitlines()]
+    
+    assert (summary['requests'], summary['failed']) == (8, 0)
+    # Written in completion order; each record carries its request line and id
+    assert sorted(record['line'] for record in records) == list(range(1, 9))
+    assert {record['line']: record['id'] for record in records}[4] == "kb-1"
+    assert all(record['output'] for record in records)
+
+def test_run_batch_reports_per_request_errors(tmp_path):
+    chatbot = make_chatbot(tmp_path)
+    requests_path = write_requests(tmp_path / "requests.jsonl", [
+        '{"id": "ok", "feature": "business_assistant", "args": {"query": "How do we cut churn?"}}',
+        '{"id": "broken", "feature": ',
+        '',
+        '{"id": "unknown", "feature": "horoscope", "args": {}}',
+        '{"id": "missing", "feature": "kb_qa", "args": {}}'
+    ])
+    summary = chatbot.run_batch(requests_path, str(tmp_path / "results.jsonl"))
+    records = {json.loads(line)['line']: json.loads(line)
+               for line in (tmp_path / "results.jsonl").read_text(encoding="utf-8").splitlines()}
+    
+    assert (summary['requests'], summary['succeeded'], summary['failed']) == (4, 1, 3)
+    assert records[1]['status'] == 'ok'
+    assert records[2]['error'].startswith("JSONDecodeError")
+    assert "Unknown feature 'horoscope'" in records[4]['error']
+    assert "Missing argument: question" in records[5]['error']
+
+def test_run_batch_bounds_work_in_flight(tmp_path):
+    chatbot = make_chatbot(tmp_path)
+    in_flight = []
+    peak = []
+    lock = threading.Lock()
+    
+    def slow_run_feature(feature, args):
+        with lock:
+            in_flight.append(1)
+            peak.append(len(in_flight))
+        time.sleep(0.05)
+        with lock:
+            in_flight.pop()
+        return {'output': args['query']}
+    
+    chatbot.run_feature = slow_run_feature
+    lines = [json.dumps({'feature': 'business_assistant', 'args': {'query': f"q{i}"}}) for i in range(10)]
+    summary = chatbot.run_batch(write_requests(tmp_path / "requests.jsonl", lines), str(tmp_path / "results.jsonl"),
+                                workers=3)
+    assert summary['succeeded'] == 10
+    assert max(peak) == 3
+
+def test_run_batch_survives_failed_result_writes(tmp_path):
+    chatbot = make_chatbot(tmp_path)
+    # Results that cannot be serialized make every write raise
+    chatbot.run_feature = lambda feature, args: {'output': object()}
+    lines = [json.dumps({'feature': 'business_assistant', 'args': {'query': f"q{i}"}}) for i in range(6)]
+    finished = threading.Event()
+    
+    def run():
+        chatbot.run_batch(write_requests(tmp_path / "requests.jsonl", lines), str(tmp_path / "results.jsonl"), workers=1)
+        finished.set()
+    
+    threading.Thread(target=run, daemon=True).start()
+    assert finished.wait(10)
+
+def test_stream_response_records_time_to_first_token(tmp_path):
+    chatbot = make_chatbot(tmp_path)
+    text = chatbot._stream_response('General Business Assistant', "Summarize our pricing options")
+    timing = chatbot.last_response_timing
+    
+    assert text.endswith("Summarize our pricing options")
+    assert 0 < timing['time_to_first_token'] <= timing['total_time']
+    summary = chatbot.metrics.summary()['General Business Assistant']
+    assert (summary['calls'], summary['errors']) == (1, 0)
+    assert summary['time_to_first_token_p50'] > 0
+
+def test_interrupted_stream_keeps_the_partial_answer(tmp_path):
+    chatbot = make_chatbot(tmp_path)
+    
+    def broken_stream(prompt, **kwargs):
+        def chunks():
+            yield FakeResponse("Raise prices", None)
+            yield FakeResponse(" by 5%", None)
+            raise ConnectionError("stream reset")
+        return chunks()
+    
+    chatbot.model.generate_content = broken_stream
+    text = chatbot._stream_response('General Business Assistant', "How should we price?")
+    assert text == "Raise prices by 5%\n[response interrupted]"
+    assert chatbot.last_response_timing['interrupted']
+    assert chatbot.metrics.summary()['General Business Assistant']['errors'] == 1
+    
+    def dead_stream(prompt, **kwargs):
+        raise ConnectionError("no connection")
+    
+    chatbot.model.generate_content = dead_stream
+    with pytest.raises(ConnectionError):
+        chatbot._stream_response('General Business Assistant', "How should we price?")
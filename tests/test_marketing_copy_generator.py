@@ -0,0 +1,164 @@
+import json
+import threading
+from fake_backend import FakeResponse
+from marketing_copy_generator import (MarketingCopyGenerator, RateLimiter, iter_products, near_duplicate,
+                                      product_key, score_variant)
+
+PRODUCT = {
+    'name': "DataFlow Pro",
+    'category': "Business Analytics Software",
+    'features': ["Real-time dashboards", "Automated reports"],
+    'target_audience': "Data analysts",
+    'value_proposition': "Insights 10x faster"
+}
+
+def break_combined_responses(generator):
+    """Make structured (multi-format) responses unparseable; single-format calls still work."""
+    
+    generate = generator.model.generate_content
+    
+    def generate_content(prompt, **kwargs):
+        if kwargs.get('generation_config'):
+            return FakeResponse('{"email": "truncated', None)
+        return generate(prompt, **kwargs)
+    
+    generator.model.generate_content = generate_content
+
+def test_product_key_prefers_sku_id_then_name():
+    assert product_key({'sku': 'DF-1', 'id': 7, 'name': 'DataFlow'}) == 'DF-1'
+    assert product_key({'id': 7, 'name': 'DataFlow'}) == '7'
+    assert product_key({'sku': ' ', 'name': 'DataFlow'}) == 'DataFlow'
+
+def test_product_key_hashes_products_without_identifiers():
+    first = {'category': 'Analytics', 'features': ['Dashboards']}
+    second = {'category': 'Security', 'features': ['SSO']}
+    assert product_key(first) != product_key(second)
+    assert product_key(first) == product_key({'features': ['Dashboards'], 'category': 'Analytics'})
+
+def test_resume_skips_only_completed_products(tmp_path):
+    catalog = tmp_path / "catalog.csv"
+    catalog.write_text("name,category,features\nDataFlow,Analytics,Dashboards\n,Security,SSO\n,Storage,Backups\n",
+                       encoding="utf-8")
+    output = tmp_path / "out.jsonl"
+    generator = MarketingCopyGenerator()
+    real_generate = generator.generate_marketing_copy
+    
+    def flaky_generate(product, campaign_type):
+        if product.get('category') == 'Storage':
+            raise RuntimeError("quota exceeded")
+        return real_generate(product, campaign_type)
+    
+    generator.generate_marketing_copy = flaky_generate
+    summary = generator.generate_catalog(str(catalog), campaign_types=["email"], output_path=str(output),
+                                         workers=2, requests_per_minute=0)
+    assert (summary['succeeded'], summary['failed']) == (2, 1)
+    
+    generator.generate_marketing_copy = real_generate
+    summary = generator.generate_catalog(str(catalog), campaign_types=["email"], output_path=str(output),
+                                         workers=2, requests_per_minute=0)
+    assert (summary['succeeded'], summary['skipped_completed']) == (1, 2)
+    
+    records = [json.loads(line) for line in output.read_text(encoding="utf-8").splitlines()]
+    done = {record['key'] for record in records if record['status'] == 'ok'}
+    assert done == {product_key(product) for product in iter_products(str(catalog))}
+
+def test_multi_format_uses_one_structured_call():
+    generator = MarketingCopyGenerator()
+    copies = generator.generate_multi_format(PRODUCT, ["email", "social", "ad_copy"])
+    stats = generator.last_multi_format_stats
+    assert list(copies) == ["email", "social", "ad_copy"]
+    assert all(copies.values())
+    assert (stats['mode'], stats['calls']) == ('single_call', 1)
+    assert stats['saved_prompt_tokens'] > 0
+
+def test_multi_format_falls_back_to_one_call_per_format():
+    generator = MarketingCopyGenerator()
+    break_combined_responses(generator)
+    copies = generator.generate_multi_format(PRODUCT, ["email", "social"])
+    stats = generator.last_multi_format_stats
+    assert (stats['mode'], stats['calls']) == ('single_call_with_fallback', 3)
+    assert all(text.startswith("[") for text in copies.values())
+
+def test_catalog_fallback_calls_are_rate_limited(tmp_path, monkeypatch):
+    waits = []
+    wait = RateLimiter.wait
+    monkeypatch.setattr(RateLimiter, "wait", lambda self: waits.append(1) or wait(self))
+    generator = MarketingCopyGenerator()
+    break_combined_responses(generator)
+    summary = generator.generate_catalog([dict(PRODUCT, sku="A"), dict(PRODUCT, sku="B")],
+                                         campaign_types=["email", "social"], output_path=str(tmp_path / "out.jsonl"),
+                                         workers=2, requests_per_minute=6000, single_call=True)
+    assert summary['model_calls'] == 6
+    assert len(waits) == 6
+
+def test_failed_result_writes_do_not_block_the_catalog(tmp_path):
+    generator = MarketingCopyGenerator()
+    # A name that cannot be serialized makes every result write raise
+    products = [dict(PRODUCT, sku=f"S{i}", name={"DataFlow"}) for i in range(6)]
+    finished = threading.Event()
+    
+    def run():
+        generator.generate_catalog(products, campaign_types=["email"], output_path=str(tmp_path / "out.jsonl"),
+                                   workers=1, requests_per_minute=0)
+        finished.set()
+    
+    threading.Thread(target=run, daemon=True).start()
+    assert finished.wait(10)
+
+STRONG_AD = ("DataFlow Pro turns raw numbers into real-time dashboards and automated reports, so data analysts "
+             "spend their week on insights instead of spreadsheets. Start a free trial today and see results "
+             "ten times faster.")
+WEAK_AD = "Try DataFlow Pro now."
+
+def script_candidates(generator, texts, support_candidate_count=True):
+    """Answer candidate_count calls with the given texts; other calls get the fake model's default."""
+    
+    generate = generator.model.generate_content
+    calls = []
+    
+    def generate_content(prompt, generation_config=None, **kwargs):
+        calls.append(generation_config or {})
+        if 'candidate_count' in (generation_config or {}):
+            if not support_candidate_count:
+                raise ValueError("candidate_count is not supported")
+            return FakeResponse(texts[0], None, texts)
+        return generate(prompt, **kwargs)
+    
+    generator.model.generate_content = generate_content
+    return calls
+
+def test_near_duplicate_compares_word_trigrams():
+    assert near_duplicate(STRONG_AD, STRONG_AD + " Limited offer.")
+    assert not near_duplicate(STRONG_AD, WEAK_AD)
+
+def test_score_variant_rewards_length_fit_and_feature_coverage():
+    strong = score_variant(STRONG_AD, PRODUCT, "ad_copy")
+    weak = score_variant(WEAK_AD, PRODUCT, "ad_copy")
+    assert (strong['length_fit'], strong['feature_coverage']) == (1.0, 1.0)
+    assert weak['length_fit'] < 1.0 and weak['feature_coverage'] == 0.0
+    assert strong['score'] > weak['score']
+
+def test_variants_are_deduplicated_and_ranked():
+    generator = MarketingCopyGenerator()
+    script_candidates(generator, [WEAK_AD, STRONG_AD, STRONG_AD + " Limited offer."])
+    variants = generator.generate_variants(PRODUCT, "ad_copy", count=3)
+    stats = generator.last_variant_stats
+    assert [v['text'] for v in variants] == [STRONG_AD, WEAK_AD]
+    assert variants[0]['score'] > variants[1]['score']
+    assert (stats['mode'], stats['calls'], stats['duplicates_removed']) == ('candidates', 1, 1)
+
+def test_variants_fall_back_to_separate_calls_without_candidate_count():
+    generator = MarketingCopyGenerator()
+    calls = script_candidates(generator, [STRONG_AD], support_candidate_count=False)
+    variants = generator.generate_variants(PRODUCT, "ad_copy", count=3, duplicate_threshold=1.1)
+    stats = generator.last_variant_stats
+    assert (stats['mode'], stats['calls']) == ('parallel', 4)
+    assert len(calls) == 4 and sum('candidate_count' in config for config in calls) == 1
+    assert len(variants) == 3
+
+def test_variants_top_up_missing_candidates():
+    generator = MarketingCopyGenerator()
+    script_candidates(generator, [STRONG_AD])
+    generator.generate_variants(PRODUCT, "ad_copy", count=3, duplicate_threshold=1.1)
+    stats = generator.last_variant_stats
+    assert (stats['mode'], stats['calls']) == ('candidates_with_fallback', 3)
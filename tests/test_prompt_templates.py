@@ -0,0 +1,45 @@
+import importlib
+import pytest
+from prompt_templates import PROMPTS, PromptRegistry, normalize_whitespace
+
+def test_normalize_whitespace_dedents_and_collapses_blank_lines():
+    text = """
+        Summarize:   
+        
+        
+        {document}
+    """
+    assert normalize_whitespace(text) == "Summarize:\n\n{document}"
+
+def test_registry_serves_the_latest_version_by_default():
+    registry = PromptRegistry()
+    registry.register("summary", "Summarize {document}")
+    second = registry.register("summary", "Summarize {document} for {audience}", version=2)
+    assert registry.get("summary") is second
+    assert registry.render("summary", version=1, document="Q3 report") == "Summarize Q3 report"
+    
+    prompt = registry.render("summary", document="Q3 report", audience="executives")
+    assert (prompt.template_name, prompt.template_version, prompt.template_hash) == ("summary", 2, second.hash)
+    assert prompt.cache_key != registry.render("summary", document="Q4 report", audience="executives").cache_key
+
+def test_render_reports_missing_values_and_unknown_templates():
+    registry = PromptRegistry()
+    registry.register("summary", "Summarize {document} for {audience}")
+    with pytest.raises(KeyError, match="audience"):
+        registry.render("summary", document="Q3 report")
+    with pytest.raises(KeyError, match="Unknown prompt template"):
+        registry.get("missing")
+
+def test_template_hash_is_stable_and_version_sensitive():
+    first = PromptRegistry().register("summary", "Summarize {document}")
+    assert first.hash == PromptRegistry().register("summary", "  Summarize {document}  ").hash
+    assert first.hash != PromptRegistry().register("summary", "Summarize {document}", version=2).hash
+
+def test_token_report_covers_registered_analyzer_templates():
+    # The analyzers register their templates when imported
+    for module in ("business_document_analyzer", "marketing_copy_generator"):
+        importlib.import_module(module)
+    
+    report = {row['name']: row for row in PROMPTS.token_report()}
+    assert {"document_analysis", "action_items", "marketing_copy"} <= set(report)
+    assert all(row['static_tokens'] > 0 and row['saved_tokens'] >= 0 for row in report.values())
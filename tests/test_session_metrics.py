@@ -0,0 +1,32 @@
+from fake_backend import FakeUsageMetadata
+from session_metrics import LatencyHistogram, SessionMetrics
+
+def test_percentiles_report_bucket_upper_bounds():
+    histogram = LatencyHistogram()
+    for seconds in [0.2] * 90 + [1.2] * 9 + [4.0]:
+        histogram.add(seconds)
+    assert histogram.percentile(50) == 0.25
+    assert histogram.percentile(95) == 1.5
+    assert histogram.percentile(99) == 1.5
+    assert histogram.percentile(100) == 4.0
+    assert round(histogram.mean(), 3) == round((0.2 * 90 + 1.2 * 9 + 4.0) / 100, 3)
+
+def test_percentiles_are_capped_at_the_largest_latency():
+    histogram = LatencyHistogram()
+    assert histogram.percentile(99) == 0.0
+    histogram.add(0.6)
+    histogram.add(400)
+    assert histogram.percentile(50) == 0.75
+    assert histogram.percentile(99) == 400
+
+def test_session_metrics_summary():
+    metrics = SessionMetrics()
+    metrics.record_interaction("assistant")
+    metrics.record_call("assistant", 0.4, FakeUsageMetadata(120, 30, 100), cache_hit=True)
+    metrics.record_call("assistant", 2.5, error=True)
+    summary = metrics.summary()['assistant']
+    assert (summary['interactions'], summary['calls'], summary['errors']) == (1, 2, 1)
+    assert summary['cache_hit_rate'] == 0.5
+    assert (summary['prompt_tokens'], summary['response_tokens'], summary['cached_tokens']) == (120, 30, 100)
+    assert summary['latency_p50'] == 0.5 and summary['latency_p99'] == 2.5
+    assert metrics.total_interactions() == 1